@@ -1,4 +1,5 @@
 import functools
+import logging
 import time
 import timeit
 from statistics import mean
@@ -13,20 +14,33 @@ from pyquery import PyQuery as pq
 from selectolax.parser import HTMLParser
 
 from scrapling import Adaptor
+from scrapling.core.utils import log
 
 large_html = '<html><body>' + '<div class="item">' * 5000 + '</div>' * 5000 + '</body></html>'
+# The same 500 products before and after the website changed its structure
+original_products_html = '<div class="list">' + ''.join(
+    f'<article class="product" id="p{i}"><h3>Product {i}</h3><p class="description">Description {i}</p></article>'
+    for i in range(500)
+) + '</div>'
+changed_products_html = '<div class="new-list"><section>' + ''.join(
+    f'<article class="product new-class" data-id="p{i}"><div><h3>Product {i}</h3><p class="new-description">Description {i}</p></div></article>'
+    for i in range(500)
+) + '</section></div>'
 
 
-def benchmark(func):
+def benchmark(func=None, *, repeat=100):
+    if func is None:
+        return functools.partial(benchmark, repeat=repeat)
+
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
         benchmark_name = func.__name__.replace('test_', '').replace('_', ' ')
         print(f"-> {benchmark_name}", end=" ", flush=True)
         # Warm-up phase
         timeit.repeat(lambda: func(*args, **kwargs), number=2, repeat=2, globals=globals())
-        # Measure time (1 run, repeat 100 times, take average)
+        # Measure time (1 run, repeat `repeat` times, take average)
         times = timeit.repeat(
-            lambda: func(*args, **kwargs), number=1, repeat=100, globals=globals(), timer=time.process_time
+            lambda: func(*args, **kwargs), number=1, repeat=repeat, globals=globals(), timer=time.process_time
         )
         min_time = round(mean(times) * 1000, 2)  # Convert to milliseconds
         print(f"average execution time: {min_time} ms")
@@ -86,12 +100,37 @@ def test_selectolax():
     return [node.text() for node in HTMLParser(large_html).css('.item')]
 
 
-def display(results):
+def _relocation_targets():
+    original_page = Adaptor(original_products_html, auto_match=False)
+    return [original_page.css_first(selector) for selector in ('#p250', '#p250 h3', '#p499 p')]
+
+
+@benchmark(repeat=10)
+def test_scrapling_relocate_indexed(targets):
+    page = Adaptor(changed_products_html, auto_match=False)
+    return [page.relocate(target, adaptor_type=False) for target in targets]
+
+
+@benchmark(repeat=10)
+def test_scrapling_relocate_exhaustive(targets):
+    page = Adaptor(changed_products_html, auto_match=False)
+    # Relocation scores every element while debugging, the logger is disabled so nothing gets printed
+    level, disabled = log.level, log.disabled
+    log.setLevel(logging.DEBUG)
+    log.disabled = True
+    try:
+        return [page.relocate(target, adaptor_type=False) for target in targets]
+    finally:
+        log.setLevel(level)
+        log.disabled = disabled
+
+
+def display(results, baseline='Scrapling'):
     # Sort and display results
     sorted_results = sorted(results.items(), key=lambda x: x[1])  # Sort by time
-    scrapling_time = results['Scrapling']
+    scrapling_time = results[baseline]
     print("\nRanked Results (fastest to slowest):")
-    print(f" i. {'Library tested':<18} | {'avg. time (ms)':<15} | vs Scrapling")
+    print(f" i. {'Library tested':<18} | {'avg. time (ms)':<15} | vs {baseline}")
     print('-' * 50)
     for i, (test_name, test_time) in enumerate(sorted_results, 1):
         compare = round(test_time / scrapling_time, 3)
@@ -138,3 +177,11 @@ if __name__ == "__main__":
         "AutoScraper": test_autoscraper(req.text),
     }
     display(results2)
+    print('\n' + "="*25)
+    print(' Benchmark: Speed of relocating 3 elements in 500 products after the page structure changed\n')
+    relocation_targets = _relocation_targets()
+    results3 = {
+        "Indexed": test_scrapling_relocate_indexed(relocation_targets),
+        "Exhaustive": test_scrapling_relocate_exhaustive(relocation_targets),
+    }
+    display(results3, baseline='Indexed')
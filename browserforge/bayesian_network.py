@@ -1,7 +1,26 @@
+import hashlib
+import os
+import pickle
 import random
+import stat
+import threading
 import zipfile
+from bisect import bisect_right
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, TypeVar, Union
+from typing import (
+    Any,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+import numpy as np
 
 try:
     import orjson as json
@@ -94,28 +113,419 @@ class BayesianNode:
         return self.node_definition.get('possibleValues', [])
 
 
+# Below this number of samples walking the compiled tables in pure Python is faster than NumPy's overhead
+_SCALAR_SAMPLES = 4
+# How many times samples that hit a dead end are drawn again before falling back to backtracking
+_REDRAW_ROUNDS = 10
+# The directory of the binary network cache, it's only used if this environment variable is set
+CACHE_DIR_ENV = 'BROWSERFORGE_CACHE_DIR'
+# Bumped when the compiled classes change so older cache files are ignored
+_CACHE_VERSION = 1
+
+
+class _LeafTable:
+    """
+    The distributions at the leaves of a node's conditional probability tree, concatenated in flat arrays.
+    The cumulative sums of each leaf are offset by the leaf's index so one `searchsorted` samples from any mix of leaves.
+    """
+
+    __slots__ = ('offsets', 'values', 'probabilities', 'alive', 'within', 'cumulative', '_lists')
+
+    def __init__(self, offsets: np.ndarray, values: np.ndarray, probabilities: np.ndarray) -> None:
+        self.offsets = offsets
+        self.values = values
+        self.probabilities = probabilities
+        lengths = np.diff(offsets)
+        leaf_of_entry = np.repeat(np.arange(len(lengths)), lengths)
+        totals = np.bincount(leaf_of_entry, weights=probabilities, minlength=len(lengths))
+        # Leaves with no probability (no values or all of them banned by the constraints) are dead ends
+        self.alive = totals > 0
+        running = np.cumsum(probabilities / np.where(self.alive, totals, 1.0)[leaf_of_entry])
+        self.within = running - np.concatenate(([0.0], running))[offsets[:-1]][leaf_of_entry]
+        self.cumulative = self.within + leaf_of_entry
+        self._lists: Optional[Tuple[List[int], List[int], List[float], List[bool]]] = None
+
+    def masked(self, allowed: np.ndarray) -> '_LeafTable':
+        """
+        A copy of the table where the values that aren't allowed have no probability
+        """
+        return _LeafTable(self.offsets, self.values, self.probabilities * allowed[self.values])
+
+    def lists(self) -> Tuple[List[int], List[int], List[float], List[bool]]:
+        """
+        The table as Python lists for sampling one value at a time
+        """
+        if self._lists is None:
+            self._lists = (
+                self.offsets.tolist(), self.values.tolist(), self.within.tolist(), self.alive.tolist()
+            )
+        return self._lists
+
+    def draw(self, leaves: np.ndarray) -> np.ndarray:
+        """
+        Sample a value code from each of the given (alive) leaves
+        """
+        positions = np.searchsorted(self.cumulative, leaves + np.random.random(len(leaves)), side='right')
+        # Rounding can leave the last cumulative value slightly under 1 so the position is kept inside the leaf
+        return self.values[np.minimum(positions, self.offsets[leaves + 1] - 1)]
+
+    def draw_one(self, leaf: int) -> int:
+        """
+        Sample a value code from one (alive) leaf
+        """
+        offsets, values, within, _ = self.lists()
+        end = offsets[leaf + 1]
+        return values[min(bisect_right(within, random.random(), offsets[leaf], end), end - 1)]
+
+
+class CompiledNode:
+    """
+    A node with its values coded as integers and its conditional probability tree flattened into arrays:
+    a table per parent level mapping (tree node, parent value code) to the tree node of the next level, with the `skip` branch as the fallback.
+    """
+
+    __slots__ = ('name', 'values', 'value_codes', 'parents', 'levels', 'level_lists', 'leaves', '_masked_leaves')
+
+    def __init__(
+        self, node: BayesianNode, node_indices: Dict[str, int], value_codes: List[Dict[str, int]]
+    ) -> None:
+        self.name = node.name
+        self.value_codes: Dict[str, int] = value_codes[node_indices[node.name]]
+        self.values: List[Any] = list(self.value_codes)
+        self.parents = [node_indices[parent_name] for parent_name in node.parent_names]
+
+        # Walk the tree level by level
+        level_trees: List[Any] = [node.node_definition['conditionalProbabilities']]
+        self.levels: List[Tuple[np.ndarray, np.ndarray]] = []
+        for parent in self.parents:
+            parent_codes = value_codes[parent]
+            next_table = np.full((len(level_trees), max(len(parent_codes), 1)), -1, dtype=np.int64)
+            skip = np.full(len(level_trees), -1, dtype=np.int64)
+            next_trees: List[Any] = []
+            for tree_index, tree in enumerate(level_trees):
+                for parent_value, subtree in tree.get('deeper', {}).items():
+                    next_table[tree_index, parent_codes[parent_value]] = len(next_trees)
+                    next_trees.append(subtree)
+                if 'skip' in tree:
+                    skip[tree_index] = len(next_trees)
+                    next_trees.append(tree['skip'])
+            self.levels.append((next_table, skip))
+            level_trees = next_trees
+        self.level_lists = [(next_table.tolist(), skip.tolist()) for next_table, skip in self.levels]
+
+        offsets = [0]
+        codes: List[int] = []
+        probabilities: List[float] = []
+        for leaf in level_trees:
+            for value, probability in leaf.items():
+                codes.append(self.value_codes[value])
+                probabilities.append(probability)
+            offsets.append(len(codes))
+        self.leaves = _LeafTable(
+            np.array(offsets, dtype=np.int64),
+            np.array(codes, dtype=np.int64),
+            np.array(probabilities, dtype=np.float64),
+        )
+        self._masked_leaves: Dict[FrozenSet[int], _LeafTable] = {}
+
+    def find_leaves(self, codes: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """
+        Walk the tree for the given rows of the samples' value codes, -1 means the walk hit a missing branch
+        """
+        trees = np.zeros(len(rows), dtype=np.int64)
+        for parent, (next_table, skip) in zip(self.parents, self.levels):
+            parent_codes = codes[rows, parent]
+            children = np.full(len(rows), -1, dtype=np.int64)
+            known = (trees >= 0) & (parent_codes >= 0)
+            children[known] = next_table[trees[known], parent_codes[known]]
+            missing = (trees >= 0) & (children < 0)
+            children[missing] = skip[trees[missing]]
+            trees = children
+        return trees
+
+    def find_leaf(self, codes: Sequence[int]) -> int:
+        """
+        Scalar version of `find_leaves` for one sample
+        """
+        tree = 0
+        for parent, (next_table, skip) in zip(self.parents, self.level_lists):
+            parent_code = codes[parent]
+            child = next_table[tree][parent_code] if parent_code >= 0 else -1
+            tree = child if child >= 0 else skip[tree]
+            if tree < 0:
+                return -1
+        return tree
+
+    def leaves_for(self, allowed: Optional[FrozenSet[int]]) -> _LeafTable:
+        """
+        The leaf table restricted to the allowed value codes, restricted tables are kept for the next calls with the same constraint
+        """
+        if allowed is None:
+            return self.leaves
+        table = self._masked_leaves.get(allowed)
+        if table is None:
+            mask = np.zeros(len(self.values), dtype=np.float64)
+            mask[list(allowed)] = 1.0
+            table = self.leaves.masked(mask)
+            if len(self._masked_leaves) >= 256:
+                self._masked_leaves.clear()
+            self._masked_leaves[allowed] = table
+        return table
+
+
+class CompiledNetwork:
+    """
+    A bayesian network compiled into integer-coded arrays that samples many values at once with NumPy
+    """
+
+    def __init__(self, nodes: List[BayesianNode]) -> None:
+        self.names = [node.name for node in nodes]
+        self.node_indices = {name: index for index, name in enumerate(self.names)}
+
+        # Every value a node can take, including any that only appear in its probability tables
+        value_codes: List[Dict[str, int]] = []
+        for node in nodes:
+            codes = {value: code for code, value in enumerate(node.possible_values)}
+            for value in _leaf_values(
+                node.node_definition['conditionalProbabilities'], len(node.parent_names)
+            ):
+                codes.setdefault(value, len(codes))
+            value_codes.append(codes)
+
+        self.nodes = [CompiledNode(node, self.node_indices, value_codes) for node in nodes]
+        # The extra None is what unknown input values (code -1) decode to before the input values are put back
+        self._decoders = [np.array(node.values + [None], dtype=object) for node in self.nodes]
+
+    def _allowed_codes(self, constraints: Dict[str, Iterable[str]]) -> List[Optional[FrozenSet[int]]]:
+        allowed: List[Optional[FrozenSet[int]]] = [None] * len(self.nodes)
+        for name, values in constraints.items():
+            index = self.node_indices.get(name)
+            if index is not None:
+                codes = self.nodes[index].value_codes
+                allowed[index] = frozenset(codes[value] for value in values if value in codes)
+        return allowed
+
+    def _input_codes(self, input_values: Dict[str, Any]) -> Tuple[List[int], List[bool]]:
+        codes, fixed = [-1] * len(self.nodes), [False] * len(self.nodes)
+        for name, value in input_values.items():
+            index = self.node_indices.get(name)
+            if index is not None:
+                fixed[index] = True
+                codes[index] = self.nodes[index].value_codes.get(value, -1)
+        return codes, fixed
+
+    def _draw(
+        self, codes: np.ndarray, fixed: np.ndarray, rows: np.ndarray, allowed: List[Optional[FrozenSet[int]]]
+    ) -> np.ndarray:
+        """
+        Sample the nodes of the given rows in place, node by node, and return the rows that hit a dead end
+        """
+        dead = np.zeros(len(codes), dtype=bool)
+        pending = np.zeros(len(codes), dtype=bool)
+        pending[rows] = True
+        for index, node in enumerate(self.nodes):
+            node_rows = np.flatnonzero(pending & ~fixed[:, index] & ~dead)
+            if not len(node_rows):
+                continue
+            table = node.leaves_for(allowed[index])
+            leaves = node.find_leaves(codes, node_rows)
+            alive = leaves >= 0
+            alive[alive] = table.alive[leaves[alive]]
+            codes[node_rows[alive], index] = table.draw(leaves[alive])
+            dead[node_rows[~alive]] = True
+        return np.flatnonzero(dead)
+
+    def _draw_one(self, codes: List[int], fixed: List[bool], allowed: List[Optional[FrozenSet[int]]]) -> bool:
+        """
+        Scalar version of `_draw` for one sample, returns whether it didn't hit a dead end
+        """
+        for index, node in enumerate(self.nodes):
+            if fixed[index]:
+                continue
+            leaf = node.find_leaf(codes)
+            table = node.leaves_for(allowed[index])
+            if leaf < 0 or not table.lists()[3][leaf]:
+                return False
+            codes[index] = table.draw_one(leaf)
+        return True
+
+    def _backtrack(
+        self, codes: List[int], fixed: List[bool], allowed: List[Optional[FrozenSet[int]]], depth: int = 0
+    ) -> bool:
+        """
+        Fill the sample's codes node by node, trying other values of earlier nodes when a node has no valid value left.
+        Same as `BayesianNetwork.recursively_generate_consistent_sample_when_possible` but on the compiled tables.
+        """
+        if depth == len(self.nodes):
+            return True
+        if fixed[depth]:
+            return self._backtrack(codes, fixed, allowed, depth + 1)
+
+        node = self.nodes[depth]
+        leaf = node.find_leaf(codes)
+        if leaf < 0:
+            return False
+        offsets, values, _, _ = node.leaves.lists()
+        probabilities = node.leaves.probabilities
+        candidates = [
+            (values[position], float(probabilities[position]))
+            for position in range(offsets[leaf], offsets[leaf + 1])
+            if probabilities[position] > 0 and (allowed[depth] is None or values[position] in allowed[depth])
+        ]
+        while candidates:
+            anchor = random.random() * sum(probability for _, probability in candidates)
+            chosen = len(candidates) - 1
+            for position, (_, probability) in enumerate(candidates):
+                anchor -= probability
+                if anchor < 0:
+                    chosen = position
+                    break
+            codes[depth] = candidates.pop(chosen)[0]
+            if self._backtrack(codes, fixed, allowed, depth + 1):
+                return True
+        codes[depth] = -1
+        return False
+
+    def _complete(
+        self, codes: List[int], fixed: List[bool], allowed: List[Optional[FrozenSet[int]]], rounds: int
+    ) -> Optional[List[int]]:
+        """
+        Draw a sample again up to `rounds` times then fall back to backtracking, `None` means no sample is consistent with the restrictions
+        """
+        initial = [code if is_fixed else -1 for code, is_fixed in zip(codes, fixed)]
+        for _ in range(rounds):
+            codes = list(initial)
+            if self._draw_one(codes, fixed, allowed):
+                return codes
+        codes = list(initial)
+        return codes if self._backtrack(codes, fixed, allowed) else None
+
+    def _decode(self, codes: Sequence[int], input_values: Dict[str, Any]) -> Dict[str, Any]:
+        return {**{node.name: node.values[code] for node, code in zip(self.nodes, codes)}, **input_values}
+
+    def generate_samples(
+        self,
+        n: int,
+        constraints: Optional[Dict[str, Iterable[str]]] = None,
+        input_values: Optional[Union[Dict[str, Any], List[Dict[str, Any]]]] = None,
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Sample n values of every node at once. The samples are drawn node by node with the values restricted to the constraints,
+        the ones that hit a dead end are drawn again and the ones that still can't be drawn are completed with backtracking.
+
+        Parameters:
+            n: The number of samples, ignored if `input_values` is a list.
+            constraints: The allowed values of some of the nodes.
+            input_values: Known values of some of the nodes, one dictionary for all samples or a dictionary per sample.
+
+        Returns:
+            A list of samples where a sample that isn't consistent with the restrictions is None.
+        """
+        if input_values is None or isinstance(input_values, dict):
+            inputs: List[Dict[str, Any]] = [input_values or {}] * n
+        else:
+            inputs = list(input_values)
+        allowed = self._allowed_codes(constraints or {})
+
+        if len(inputs) < _SCALAR_SAMPLES:
+            samples: List[Optional[Dict[str, Any]]] = []
+            for values in inputs:
+                codes, fixed = self._input_codes(values)
+                if not self._draw_one(codes, fixed, allowed):
+                    codes = self._complete(codes, fixed, allowed, _REDRAW_ROUNDS - 1)
+                samples.append(None if codes is None else self._decode(codes, values))
+            return samples
+
+        rows_codes, rows_fixed = zip(*(self._input_codes(values) for values in inputs))
+        codes_array = np.array(rows_codes, dtype=np.int64)
+        fixed_array = np.array(rows_fixed, dtype=bool)
+        initial = codes_array.copy()
+        dead = self._draw(codes_array, fixed_array, np.arange(len(inputs)), allowed)
+        for _ in range(_REDRAW_ROUNDS - 1):
+            if not len(dead):
+                break
+            codes_array[dead] = initial[dead]
+            dead = self._draw(codes_array, fixed_array, dead, allowed)
+
+        columns = [decoder[codes_array[:, index]] for index, decoder in enumerate(self._decoders)]
+        samples = [{**dict(zip(self.names, row)), **values} for row, values in zip(zip(*columns), inputs)]
+        impossible = False
+        for row in dead.tolist():
+            # Samples without input values have nothing that makes them differ so if one can't be completed none can
+            if impossible and not inputs[row]:
+                samples[row] = None
+                continue
+            codes = list(rows_codes[row])
+            completed = self._backtrack(codes, list(rows_fixed[row]), allowed)
+            impossible = impossible or (not completed and not inputs[row])
+            samples[row] = self._decode(codes, inputs[row]) if completed else None
+        return samples
+
+
+def _leaf_values(tree: Dict[str, Any], depth: int) -> Iterable[str]:
+    """
+    The values in the leaves of a conditional probability tree with the given number of parent levels
+    """
+    if depth == 0:
+        yield from tree
+        return
+    for subtree in tree.get('deeper', {}).values():
+        yield from _leaf_values(subtree, depth - 1)
+    if 'skip' in tree:
+        yield from _leaf_values(tree['skip'], depth - 1)
+
+
 class BayesianNetwork:
     """
     Implementation of a bayesian network capable of randomly sampling from its distribution
     """
 
     def __init__(self, path: Path) -> None:
-        network_definition = extract_json(path)
-        self.nodes_in_sampling_order = [
-            BayesianNode(node_def) for node_def in network_definition['nodes']
-        ]
+        cached = _read_cache(path)
+        if cached is not None:
+            self.nodes_in_sampling_order, self._compiled = cached
+        else:
+            network_definition = extract_json(path)
+            self.nodes_in_sampling_order = [
+                BayesianNode(node_def) for node_def in network_definition['nodes']
+            ]
+            self._compiled = None
         self.nodes_by_name = {node.name: node for node in self.nodes_in_sampling_order}
+        self._compile_lock = threading.Lock()
+        if cached is None and _cache_path(path) is not None:
+            _write_cache(path, self.nodes_in_sampling_order, self.compiled)
+
+    @property
+    def compiled(self) -> CompiledNetwork:
+        """
+        The network compiled into arrays, compiled on first use
+        """
+        if self._compiled is None:
+            with self._compile_lock:
+                if self._compiled is None:
+                    self._compiled = CompiledNetwork(self.nodes_in_sampling_order)
+        return self._compiled
+
+    def generate_samples(
+        self,
+        n: int,
+        constraints: Optional[Dict[str, Iterable[str]]] = None,
+        input_values: Optional[Union[Dict[str, Any], List[Dict[str, Any]]]] = None,
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Randomly samples n times from the distribution represented by the bayesian network at once,
+        making sure each sample is consistent with the restrictions on value possibilities.
+        Samples that can't be generated are None. Check `CompiledNetwork.generate_samples` for the parameters.
+        """
+        return self.compiled.generate_samples(n, constraints, input_values)
 
     def generate_sample(self, input_values: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Randomly samples from the distribution represented by the bayesian network.
         """
-        if input_values is None:
-            input_values = {}
-        sample = input_values.copy()
-        for node in self.nodes_in_sampling_order:
-            if node.name not in sample:
-                sample[node.name] = node.sample(sample)
+        sample = self.generate_samples(1, input_values=input_values or {})[0]
+        if sample is None:
+            raise ValueError('No sample can be generated for the given input values.')
         return sample
 
     def generate_consistent_sample_when_possible(
@@ -126,7 +536,7 @@ class BayesianNetwork:
         making sure the sample is consistent with the provided restrictions on value possibilities.
         Returns None if no such sample can be generated.
         """
-        return self.recursively_generate_consistent_sample_when_possible({}, value_possibilities, 0)
+        return self.generate_samples(1, value_possibilities)[0]
 
     def recursively_generate_consistent_sample_when_possible(
         self,
@@ -161,6 +571,107 @@ class BayesianNetwork:
         return None
 
 
+# Networks shared by every generator in the process, keyed by their resolved path
+_networks: Dict[Path, BayesianNetwork] = {}
+_networks_lock = threading.Lock()
+
+
+def get_network(path: Path) -> BayesianNetwork:
+    """
+    Returns the network of the given file, it's loaded once per process and shared by all callers.
+
+    Parameters:
+        path: The path to the zip file or JSON file of the network.
+    """
+    path = Path(path).resolve()
+    network = _networks.get(path)
+    if network is None:
+        with _networks_lock:
+            network = _networks.get(path)
+            if network is None:
+                network = _networks[path] = BayesianNetwork(path)
+    return network
+
+
+class SharedNetwork:
+    """
+    A class attribute that loads its network on first access through `get_network` instead of when the class is defined,
+    so importing a generator doesn't decode networks the process never uses.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+
+    def __get__(self, instance: Any, owner: Any = None) -> BayesianNetwork:
+        return get_network(self.path)
+
+
+def _cache_path(path: Path) -> Optional[Path]:
+    """
+    The binary cache file of a network, named after the hash of the network's file so an updated file gets a new cache.
+    None if the cache is disabled or the network's file can't be read.
+    """
+    directory = os.environ.get(CACHE_DIR_ENV)
+    if not directory:
+        return None
+    try:
+        digest = hashlib.sha256(Path(path).read_bytes()).hexdigest()
+    except OSError:
+        return None
+    return Path(directory).expanduser() / f'{Path(path).stem}-{digest}-v{_CACHE_VERSION}.pickle'
+
+
+def _read_cache(path: Path) -> Optional[Tuple[List[BayesianNode], CompiledNetwork]]:
+    """
+    Loads the decoded nodes and the compiled network from the binary cache if it's enabled and has them
+    """
+    cache_path = _cache_path(path)
+    if cache_path is None:
+        return None
+    try:
+        with open(cache_path, 'rb') as file:
+            if not _is_private_file(os.fstat(file.fileno())):
+                return None
+            # Only a file this user wrote is unpickled, anyone else able to change it could already run code as this user
+            nodes, compiled = pickle.load(file)  # nosec B301
+    except Exception:
+        # Missing, broken, or written by incompatible versions, then it's replaced with a new one
+        return None
+    if not isinstance(compiled, CompiledNetwork):
+        return None
+    return nodes, compiled
+
+
+def _is_private_file(file_stat: os.stat_result) -> bool:
+    """
+    Checks that a cache file is owned by the current user and only writable by them, on systems with file owners
+    """
+    if hasattr(os, 'getuid') and file_stat.st_uid != os.getuid():
+        return False
+    return not file_stat.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+
+def _write_cache(path: Path, nodes: List[BayesianNode], compiled: CompiledNetwork) -> None:
+    """
+    Saves the decoded nodes and the compiled network to the binary cache, atomically so concurrent processes can share it
+    """
+    cache_path = _cache_path(path)
+    if cache_path is None:
+        return
+    temporary_path = cache_path.with_name(f'{cache_path.name}.{os.getpid()}.tmp')
+    try:
+        cache_path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        with open(os.open(temporary_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'wb') as file:
+            pickle.dump((nodes, compiled), file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_path, cache_path)
+    except OSError:
+        # The cache is only an optimization so a read-only directory just means it's not used
+        try:
+            os.remove(temporary_path)
+        except OSError:
+            pass
+
+
 def array_intersection(a: Sequence[T], b: Sequence[T]) -> List[T]:
     """
     Performs a set "intersection" on the given (flat) arrays
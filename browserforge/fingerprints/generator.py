@@ -1,8 +1,8 @@
 from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, cast
 
-from browserforge.bayesian_network import BayesianNetwork, get_possible_values
+from browserforge.bayesian_network import SharedNetwork, get_possible_values
 from browserforge.headers import HeaderGenerator
 from browserforge.headers.utils import get_user_agent
 
@@ -128,7 +128,7 @@ class Screen:
 class FingerprintGenerator:
     """Generates realistic browser fingerprints"""
 
-    fingerprint_generator_network = BayesianNetwork(DATA_DIR / "fingerprint-network.zip")
+    fingerprint_generator_network = SharedNetwork(DATA_DIR / "fingerprint-network.zip")
 
     def __init__(
         self,
@@ -216,6 +216,69 @@ class FingerprintGenerator:
             # This seems to be an issue with some Mac and Linux systems
             filtered_values = {}
 
+        return self._build_fingerprint(fingerprint, headers, mock_webrtc, slim)
+
+    def generate_many(
+        self,
+        n: int,
+        *,
+        screen: Optional[Screen] = None,
+        strict: Optional[bool] = None,
+        mock_webrtc: Optional[bool] = None,
+        slim: Optional[bool] = None,
+        **header_kwargs,
+    ) -> List[Fingerprint]:
+        """
+        Generates n fingerprints at once. The headers are generated together, then the fingerprints
+        of the headers that share the same User-Agent are sampled from the network together.
+        Takes the same parameters as `generate`.
+        """
+        filtered_values: Dict[str, str] = {}
+        screen = _first(screen, self.screen)
+        strict = _first(strict, self.strict)
+
+        partial_csp = self.partial_csp(
+            strict=strict, screen=screen, filtered_values=filtered_values
+        )
+        if partial_csp:
+            header_kwargs['user_agent'] = partial_csp['userAgent']
+        all_headers = self.header_generator.generate_many(n, **header_kwargs)
+
+        indices_by_user_agent: Dict[str, List[int]] = {}
+        for index, headers in enumerate(all_headers):
+            user_agent = get_user_agent(headers)
+            if user_agent is None:
+                raise ValueError("Failed to find User-Agent in generated response")
+            indices_by_user_agent.setdefault(user_agent, []).append(index)
+
+        fingerprints: List[Optional[Fingerprint]] = [None] * n
+        for user_agent, indices in indices_by_user_agent.items():
+            samples = self.fingerprint_generator_network.generate_samples(
+                len(indices), {**filtered_values, 'userAgent': (user_agent,)}
+            )
+            for index, sample in zip(indices, samples):
+                if sample is None:
+                    # Same relaxation as `generate`
+                    fingerprints[index] = self.generate(
+                        screen=screen, strict=strict, mock_webrtc=mock_webrtc, slim=slim,
+                        **{**header_kwargs, 'user_agent': user_agent},
+                    )
+                    continue
+                fingerprints[index] = self._build_fingerprint(
+                    sample, all_headers[index], mock_webrtc, slim
+                )
+        return cast(List[Fingerprint], fingerprints)
+
+    def _build_fingerprint(
+        self,
+        fingerprint: Dict[str, Any],
+        headers: Dict[str, str],
+        mock_webrtc: Optional[bool],
+        slim: Optional[bool],
+    ) -> Fingerprint:
+        """
+        Turns a sample of the fingerprint network and its headers into a `Fingerprint`
+        """
         # Delete any missing attributes and unpack any object/array-like attributes
         # that have been packed together to make the underlying network simpler
         for attribute in list(fingerprint.keys()):
@@ -1,8 +1,9 @@
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Literal, Optional, Tuple, Union
+from typing import (Any, Dict, Iterable, List, Literal, Optional, Tuple, Union,
+                    cast)
 
-from browserforge.bayesian_network import BayesianNetwork, get_possible_values
+from browserforge.bayesian_network import SharedNetwork, get_possible_values
 
 from .utils import get_browser, get_user_agent, pascalize_headers, tuplify
 
@@ -82,9 +83,9 @@ class HeaderGenerator:
 
     relaxation_order: Tuple[str, ...] = ('locales', 'devices', 'operatingSystems', 'browsers')
 
-    # Initialize networks
-    input_generator_network = BayesianNetwork(DATA_DIR / "input-network.zip")
-    header_generator_network = BayesianNetwork(DATA_DIR / "header-network.zip")
+    # Networks loaded on first use
+    input_generator_network = SharedNetwork(DATA_DIR / "input-network.zip")
+    header_generator_network = SharedNetwork(DATA_DIR / "header-network.zip")
 
     def __init__(
         self,
@@ -146,6 +147,46 @@ class HeaderGenerator:
             strict (Optional[bool], optional): If true, throws an error if it cannot generate headers based on the input.
         """
 
+        options = self._generation_options(
+            browser, os, device, locale, http_version, user_agent, strict, request_dependent_headers
+        )
+        generated: Dict[str, str] = self._get_headers(**options)
+        if (options.get('http_version') or self.options['http_version']) == '2':
+            return pascalize_headers(generated)
+        return generated
+
+    def generate_many(
+        self,
+        n: int,
+        *,
+        browser: Optional[Iterable[Union[str, Browser]]] = None,
+        os: Optional[ListOrString] = None,
+        device: Optional[ListOrString] = None,
+        locale: Optional[ListOrString] = None,
+        http_version: Optional[Literal[1, 2]] = None,
+        user_agent: Optional[ListOrString] = None,
+        strict: Optional[bool] = None,
+        request_dependent_headers: Optional[Dict[str, str]] = None,
+    ) -> List[Dict[str, str]]:
+        """
+        Generates n sets of headers at once, sampling all of them from the networks together.
+        Takes the same parameters as `generate`.
+        """
+        options = self._generation_options(
+            browser, os, device, locale, http_version, user_agent, strict, request_dependent_headers
+        )
+        generated = self._get_headers_many(n, **options)
+        if (options.get('http_version') or self.options['http_version']) == '2':
+            return [pascalize_headers(headers) for headers in generated]
+        return generated
+
+    @staticmethod
+    def _generation_options(
+        browser, os, device, locale, http_version, user_agent, strict, request_dependent_headers
+    ) -> Dict[str, Any]:
+        """
+        The options passed to `generate` that override the default ones
+        """
         options = {
             'browsers': tuplify(browser),
             'os': tuplify(os),
@@ -156,12 +197,7 @@ class HeaderGenerator:
             'user_agent': tuplify(user_agent),
             'request_dependent_headers': request_dependent_headers,
         }
-        generated: Dict[str, str] = self._get_headers(
-            **{k: v for k, v in options.items() if v is not None}
-        )
-        if (options['http_version'] or self.options['http_version']) == '2':
-            return pascalize_headers(generated)
-        return generated
+        return {k: v for k, v in options.items() if v is not None}
 
     def _get_headers(
         self,
@@ -183,6 +219,72 @@ class HeaderGenerator:
         if request_dependent_headers is None:
             request_dependent_headers = {}
 
+        header_options, constraints = self._get_input_constraints(user_agent, options)
+        input_sample = self.input_generator_network.generate_consistent_sample_when_possible(
+            constraints
+        )
+        if not input_sample:
+            if header_options['http_version'] == '1':
+                headers2 = self._get_headers(
+                    request_dependent_headers, user_agent, **options, http_version='2'
+                )
+                return self.order_headers(pascalize_headers(headers2))
+
+            relaxation_index = next(
+                (i for i, key in enumerate(self.relaxation_order) if key in options), -1
+            )
+            if header_options['strict'] or relaxation_index == -1:
+                raise ValueError(
+                    'No headers based on this input can be generated. Please relax or change some of the requirements you specified.'
+                )
+
+            relaxed_options = {**options}
+            del relaxed_options[self.relaxation_order[relaxation_index]]
+            return self._get_headers(request_dependent_headers, user_agent, **relaxed_options)
+
+        generated_sample = self.header_generator_network.generate_sample(input_sample)
+        return self._finalize_headers(generated_sample, header_options, request_dependent_headers)
+
+    def _get_headers_many(
+        self,
+        n: int,
+        request_dependent_headers: Optional[Dict[str, str]] = None,
+        user_agent: Optional[Iterable[str]] = None,
+        **options: Any,
+    ) -> List[Dict[str, str]]:
+        """
+        Batch version of `_get_headers` that samples the input and header networks n times at once.
+        Falls back to generating the headers one by one when the constraints need to be relaxed.
+        """
+        if request_dependent_headers is None:
+            request_dependent_headers = {}
+        if user_agent and not isinstance(user_agent, (tuple, list)):
+            user_agent = tuple(user_agent)
+
+        header_options, constraints = self._get_input_constraints(user_agent, options)
+        input_samples = self.input_generator_network.generate_samples(n, constraints)
+        if any(sample is None for sample in input_samples):
+            return [
+                self._get_headers(request_dependent_headers, user_agent, **options) for _ in range(n)
+            ]
+
+        generated_samples = self.header_generator_network.generate_samples(n, input_values=input_samples)
+        return [
+            self._finalize_headers(
+                cast(Dict[str, Any], generated_sample), header_options, request_dependent_headers
+            )
+            for generated_sample in generated_samples
+        ]
+
+    def _get_input_constraints(
+        self, user_agent: Optional[Iterable[str]], options: Dict[str, Any]
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Merges the options with the default ones and computes the constraints of the input network from them.
+
+        Returns:
+            The merged options and the input network constraints.
+        """
         # Process new options
         if 'browsers' in options or (
             # if a unique http_version was passed
@@ -208,30 +310,17 @@ class HeaderGenerator:
         constraints = self._prepare_constraints(
             possible_attribute_values, http1_values, http2_values
         )
+        return header_options, constraints
 
-        input_sample = self.input_generator_network.generate_consistent_sample_when_possible(
-            constraints
-        )
-        if not input_sample:
-            if header_options['http_version'] == '1':
-                headers2 = self._get_headers(
-                    request_dependent_headers, user_agent, **options, http_version='2'
-                )
-                return self.order_headers(pascalize_headers(headers2))
-
-            relaxation_index = next(
-                (i for i, key in enumerate(self.relaxation_order) if key in options), -1
-            )
-            if header_options['strict'] or relaxation_index == -1:
-                raise ValueError(
-                    'No headers based on this input can be generated. Please relax or change some of the requirements you specified.'
-                )
-
-            relaxed_options = {**options}
-            del relaxed_options[self.relaxation_order[relaxation_index]]
-            return self._get_headers(request_dependent_headers, user_agent, **relaxed_options)
-
-        generated_sample = self.header_generator_network.generate_sample(input_sample)
+    def _finalize_headers(
+        self,
+        generated_sample: Dict[str, Any],
+        header_options: Dict[str, Any],
+        request_dependent_headers: Dict[str, str],
+    ) -> Dict[str, str]:
+        """
+        Turns a sample of the header network into the final ordered headers
+        """
         generated_http_and_browser = self._prepare_http_browser_object(
             generated_sample['*BROWSER_HTTP']
         )
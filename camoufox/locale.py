@@ -1,5 +1,8 @@
+import threading
+import time
 import xml.etree.ElementTree as ET  # nosec
-from dataclasses import dataclass
+from collections import OrderedDict
+from dataclasses import dataclass, replace
 from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union, cast
 
 import numpy as np
@@ -9,6 +12,7 @@ from camoufox.pkgman import LOCAL_DATA, GitHubDownloader, rprint, webdl
 from camoufox.warnings import LeakWarning
 
 from .exceptions import (
+    InvalidIP,
     InvalidLocale,
     MissingRelease,
     NotInstalledGeoIPExtra,
@@ -20,6 +24,7 @@ from .ip import validate_ip
 
 try:
     import geoip2.database  # type: ignore
+    import geoip2.errors  # type: ignore
 except ImportError:
     ALLOW_GEOIP = False
 else:
@@ -218,6 +223,79 @@ def geoip_allowed() -> None:
         )
 
 
+# How many IPs are kept in the geolocation cache and for how many seconds
+GEOLOCATION_CACHE_SIZE = 1024
+GEOLOCATION_CACHE_TTL = 3600.0
+
+_reader: Optional[Any] = None
+_reader_lock = threading.RLock()
+
+
+def _close_reader() -> None:
+    """
+    Closes the shared GeoIP reader so the next lookup opens the current database file.
+    """
+    global _reader
+    with _reader_lock:
+        if _reader is not None:
+            _reader.close()
+            _reader = None
+    GEOLOCATION_CACHE.clear()
+
+
+def get_reader() -> Any:
+    """
+    Gets the GeoIP reader shared by the whole process, the database is memory-mapped once and downloaded if it's missing.
+    """
+    global _reader
+    if _reader is None:
+        with _reader_lock:
+            if _reader is None:
+                # Check if the database is downloaded
+                if not MMDB_FILE.exists():
+                    download_mmdb()
+                _reader = geoip2.database.Reader(str(MMDB_FILE), mode=geoip2.database.MODE_MMAP)
+    return _reader
+
+
+class GeolocationCache:
+    """
+    A thread-safe cache of IP to Geolocation, bounded in size and in the time each entry is kept.
+    The least recently used IP is dropped when it's full.
+    """
+
+    def __init__(self, max_size: int = GEOLOCATION_CACHE_SIZE, ttl: float = GEOLOCATION_CACHE_TTL) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: 'OrderedDict[str, Tuple[float, Geolocation]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, ip: str) -> Optional[Geolocation]:
+        with self._lock:
+            entry = self._entries.get(ip)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[ip]
+                return None
+            self._entries.move_to_end(ip)
+            return entry[1]
+
+    def set(self, ip: str, geolocation: Geolocation) -> None:
+        with self._lock:
+            self._entries[ip] = (time.monotonic() + self.ttl, geolocation)
+            self._entries.move_to_end(ip)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+GEOLOCATION_CACHE = GeolocationCache()
+
+
 def download_mmdb() -> None:
     """
     Downloads the MaxMind GeoIP2 database.
@@ -232,6 +310,8 @@ def download_mmdb() -> None:
             desc='Downloading GeoIP database',
             buffer=f,
         )
+    # The shared reader still has the old file mapped
+    _close_reader()
 
 
 def remove_mmdb() -> None:
@@ -242,39 +322,81 @@ def remove_mmdb() -> None:
         rprint("GeoIP database not found.")
         return
 
+    _close_reader()
     MMDB_FILE.unlink()
     rprint("GeoIP database removed.")
 
 
-def get_geolocation(ip: str) -> Geolocation:
+def _lookup(ip: str) -> Tuple[str, Any]:
     """
-    Gets the geolocation for an IP address.
+    Looks up the country code and the location of an IP address in the GeoIP database.
     """
-    # Check if the database is downloaded
-    if not MMDB_FILE.exists():
-        download_mmdb()
-
     # Validate the IP address
     validate_ip(ip)
 
-    with geoip2.database.Reader(str(MMDB_FILE)) as reader:
-        resp = reader.city(ip)
-        iso_code = cast(str, resp.registered_country.iso_code).upper()
-        location = resp.location
+    resp = get_reader().city(ip)
+    location = resp.location
 
-        # Check if any required attributes are missing
-        if any(not getattr(location, attr) for attr in ('longitude', 'latitude', 'time_zone')):
-            raise UnknownIPLocation(f"Unknown IP location: {ip}")
+    # Check if any required attributes are missing
+    if any(not getattr(location, attr) for attr in ('longitude', 'latitude', 'time_zone')):
+        raise UnknownIPLocation(f"Unknown IP location: {ip}")
+    return cast(str, resp.registered_country.iso_code).upper(), location
 
-        # Get a statistically correct locale based on the country code
-        locale = SELECTOR.from_region(iso_code)
 
-        return Geolocation(
-            locale=locale,
-            longitude=cast(float, resp.location.longitude),
-            latitude=cast(float, resp.location.latitude),
-            timezone=cast(str, resp.location.time_zone),
-        )
+def _as_geolocation(locale: Locale, location: Any) -> Geolocation:
+    return Geolocation(
+        locale=locale,
+        longitude=cast(float, location.longitude),
+        latitude=cast(float, location.latitude),
+        timezone=cast(str, location.time_zone),
+    )
+
+
+def get_geolocation(ip: str) -> Geolocation:
+    """
+    Gets the geolocation for an IP address.
+    The result is cached for `GEOLOCATION_CACHE_TTL` seconds so browsers launched behind the same IP get the same geolocation.
+    """
+    geolocation = GEOLOCATION_CACHE.get(ip)
+    if geolocation is not None:
+        return geolocation
+
+    iso_code, location = _lookup(ip)
+    # Get a statistically correct locale based on the country code
+    geolocation = _as_geolocation(SELECTOR.from_region(iso_code), location)
+    GEOLOCATION_CACHE.set(ip, geolocation)
+    return geolocation
+
+
+def get_geolocations(ips: Iterable[str]) -> Dict[str, Geolocation]:
+    """
+    Gets the geolocations of many IP addresses at once, like warming the cache with the IPs of a proxy list.
+    The locales of the IPs in the same country are drawn in one batch.
+    Returns a dictionary of each IP to its geolocation, IPs that are invalid or have no known location are left out.
+    """
+    geolocations: Dict[str, Geolocation] = {}
+    by_country: Dict[str, List[Tuple[str, Any]]] = {}
+    for ip in dict.fromkeys(ips):
+        geolocation = GEOLOCATION_CACHE.get(ip)
+        if geolocation is not None:
+            geolocations[ip] = geolocation
+            continue
+        try:
+            iso_code, location = _lookup(ip)
+        except (InvalidIP, UnknownIPLocation, geoip2.errors.AddressNotFoundError):
+            continue
+        by_country.setdefault(iso_code, []).append((ip, location))
+
+    for iso_code, located in by_country.items():
+        try:
+            locales = SELECTOR.sample(len(located), region=iso_code)
+        except (UnknownTerritory, ValueError):
+            continue
+        for (ip, location), locale in zip(located, locales):
+            geolocations[ip] = _as_geolocation(locale, location)
+            GEOLOCATION_CACHE.set(ip, geolocations[ip])
+
+    return geolocations
 
 
 """
@@ -300,66 +422,129 @@ def _as_float(element: ET.Element, attr: str) -> float:
     return float(element.get(attr, 0))
 
 
+@dataclass(frozen=True)
+class _Distribution:
+    """
+    Stores the values of a territory or a language with their probabilities.
+    """
+
+    values: np.ndarray
+    probabilities: np.ndarray
+    cumulative: np.ndarray
+
+    def draw(self, n: int) -> np.ndarray:
+        """
+        Draws n random values at once.
+        """
+        positions = np.searchsorted(self.cumulative, np.random.random(n), side='right')
+        # Rounding can leave the last cumulative value slightly under 1
+        return self.values[np.minimum(positions, len(self.values) - 1)]
+
+
 class StatisticalLocaleSelector:
     """
     Selects a random locale based on statistical data.
     Takes either a territory code or a language code, and generates a Locale object.
+
+    The probabilities of every territory and language are precomputed in one pass over territoryInfo.xml on first use,
+    so each selection is a lookup and an array draw.
     """
 
     def __init__(self):
-        self.root = get_unicode_info()
+        self._root: Optional[ET.Element] = None
+        self._territories: Optional[Dict[str, Optional[_Distribution]]] = None
+        self._languages: Optional[Dict[str, Optional[_Distribution]]] = None
+        self._locales: Dict[str, Locale] = {}
+        self._lock = threading.Lock()
 
-    def _load_territory_data(self, iso_code: str) -> Tuple[np.ndarray, np.ndarray]:
+    @property
+    def root(self) -> ET.Element:
         """
-        Calculates a random language based on the territory code,
-        based on the probability that a person speaks the language in the territory.
+        The territoryInfo.xml data, loaded on first use.
         """
-        territory = self.root.find(f"territory[@type='{iso_code}']")
-        if territory is None:
-            raise UnknownTerritory(f"Unknown territory: {iso_code}")
+        if self._root is None:
+            self._root = get_unicode_info()
+        return self._root
 
-        lang_populations = territory.findall('languagePopulation')
-        if not lang_populations:
+    def _build_index(self) -> None:
+        """
+        Precomputes the language probabilities of every territory and the region probabilities of every language.
+        """
+        with self._lock:
+            if self._territories is not None:
+                return
+
+            territories: Dict[str, Optional[_Distribution]] = {}
+            language_regions: Dict[str, Tuple[List[str], List[float]]] = {}
+            for territory in self.root.iter('territory'):
+                region = territory.get('type')
+                if region is None:
+                    continue
+
+                languages, percentages = [], []
+                for lang_pop in territory.findall('languagePopulation'):
+                    language = lang_pop.get('type')
+                    languages.append(language)
+                    percentages.append(_as_float(lang_pop, 'populationPercent'))
+                    regions, speakers = language_regions.setdefault(language, ([], []))
+                    regions.append(region)
+                    speakers.append(
+                        _as_float(lang_pop, 'populationPercent')
+                        * _as_float(territory, 'literacyPercent')
+                        / 10_000
+                        * _as_float(territory, 'population')
+                    )
+                territories.setdefault(region, self._distribution(languages, percentages))
+
+            self._languages = {
+                language: self._distribution(regions, speakers)
+                for language, (regions, speakers) in language_regions.items()
+            }
+            self._territories = territories
+
+    def _distribution(self, values: List[Any], freq: List[float]) -> Optional[_Distribution]:
+        """
+        Builds the distribution of the values, None if there are no values with a probability.
+        """
+        if not values or not sum(freq) > 0:
+            return None
+        values_array, probabilities = self.normalize_probabilities(np.array(values), np.array(freq))
+        return _Distribution(values_array, probabilities, np.cumsum(probabilities))
+
+    def _territory_distribution(self, iso_code: str) -> _Distribution:
+        if self._territories is None:
+            self._build_index()
+        territories = cast(Dict[str, Optional[_Distribution]], self._territories)
+        if iso_code not in territories:
+            raise UnknownTerritory(f"Unknown territory: {iso_code}")
+        distribution = territories[iso_code]
+        if distribution is None:
             raise ValueError(f"No language data found for region: {iso_code}")
+        return distribution
 
-        languages = np.array([lang.get('type') for lang in lang_populations])
-        percentages = np.array([_as_float(lang, 'populationPercent') for lang in lang_populations])
+    def _language_distribution(self, language: str) -> _Distribution:
+        if self._languages is None:
+            self._build_index()
+        distribution = cast(Dict[str, Optional[_Distribution]], self._languages).get(language)
+        if distribution is None:
+            raise UnknownLanguage(f"No region data found for language: {language}")
+        return distribution
 
-        return self.normalize_probabilities(languages, percentages)
+    def _load_territory_data(self, iso_code: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Calculates a random language based on the territory code,
+        based on the probability that a person speaks the language in the territory.
+        """
+        distribution = self._territory_distribution(iso_code)
+        return distribution.values, distribution.probabilities
 
     def _load_language_data(self, language: str) -> Tuple[np.ndarray, np.ndarray]:
         """
         Calculates a random region for a language
         based on the total speakers of the language in that region.
         """
-        territories = self.root.findall(f'.//territory/languagePopulation[@type="{language}"]/..')
-        if not territories:
-            raise UnknownLanguage(f"No region data found for language: {language}")
-
-        regions = []
-        percentages = []
-
-        for terr in territories:
-            region = terr.get('type')
-            if region is None:
-                continue  # Skip if region is not found
-
-            lang_pop = terr.find(f'languagePopulation[@type="{language}"]')
-            if lang_pop is None:
-                continue  # This shouldn't happen due to our XPath, but just in case
-
-            regions.append(region)
-            percentages.append(
-                _as_float(lang_pop, 'populationPercent')
-                * _as_float(terr, 'literacyPercent')
-                / 10_000
-                * _as_float(terr, 'population')
-            )
-
-        if not regions:
-            raise ValueError(f"No valid region data found for language: {language}")
-
-        return self.normalize_probabilities(np.array(regions), np.array(percentages))
+        distribution = self._language_distribution(language)
+        return distribution.values, distribution.probabilities
 
     def normalize_probabilities(
         self, languages: np.ndarray, freq: np.ndarray
@@ -370,23 +555,45 @@ class StatisticalLocaleSelector:
         total = np.sum(freq)
         return languages, freq / total
 
+    def _normalized(self, locale: str) -> Locale:
+        """
+        Normalizes the locale once and returns copies of it afterwards.
+        """
+        normalized = self._locales.get(locale)
+        if normalized is None:
+            normalized = self._locales[locale] = normalize_locale(locale)
+        return replace(normalized)
+
+    def sample(
+        self, n: int, region: Optional[str] = None, language: Optional[str] = None
+    ) -> List[Locale]:
+        """
+        Get n random locales at once based on either the territory ISO code or the language.
+        Returns as a list of Locale objects.
+        """
+        if (region is None) == (language is None):
+            raise ValueError('Either a region or a language is required.')
+
+        if region is not None:
+            languages = self._territory_distribution(region).draw(n)
+            return [self._normalized(f"{value.replace('_', '-')}-{region}") for value in languages]
+
+        regions = self._language_distribution(cast(str, language)).draw(n)
+        return [self._normalized(f"{language}-{value}") for value in regions]
+
     def from_region(self, region: str) -> Locale:
         """
         Get a random locale based on the territory ISO code.
         Returns as a Locale object.
         """
-        languages, probabilities = self._load_territory_data(region)
-        language = np.random.choice(languages, p=probabilities).replace('_', '-')
-        return normalize_locale(f"{language}-{region}")
+        return self.sample(1, region=region)[0]
 
     def from_language(self, language: str) -> Locale:
         """
         Get a random locale based on the language.
         Returns as a Locale object.
         """
-        regions, probabilities = self._load_language_data(language)
-        region = np.random.choice(regions, p=probabilities)
-        return normalize_locale(f"{language}-{region}")
+        return self.sample(1, language=language)[0]
 
 
 SELECTOR = StatisticalLocaleSelector()
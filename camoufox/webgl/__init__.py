@@ -1,3 +1,3 @@
-from .sample import sample_webgl
+from .sample import WebGLSampler, sample_webgl, sample_webgl_many
 
-__all__ = ['sample_webgl']
+__all__ = ['WebGLSampler', 'sample_webgl', 'sample_webgl_many']
@@ -1,5 +1,6 @@
 import sqlite3
 from pathlib import Path
+from threading import Lock
 from typing import Dict, List, Optional, Tuple
 
 import numpy as np
@@ -11,6 +12,121 @@ from camoufox.pkgman import OS_ARCH_MATRIX
 DB_PATH = Path(__file__).parent / 'webgl_data.db'
 
 
+class _OSTable:
+    """
+    The vendor/renderer pairs of one OS with their cumulative probabilities.
+    The JSON data of each pair is kept as it is and only decoded when that pair is drawn.
+    """
+
+    __slots__ = ('pairs', 'data', 'cumulative', 'index')
+
+    def __init__(self, rows: List[Tuple[str, str, str, float]]) -> None:
+        self.pairs: List[Tuple[str, str]] = [(vendor, renderer) for vendor, renderer, _, _ in rows]
+        self.data: List[str] = [data for _, _, data, _ in rows]
+        probs = np.array([prob for _, _, _, prob in rows], dtype=np.float64)
+        self.cumulative: np.ndarray = np.cumsum(probs / probs.sum())
+        self.index: Dict[Tuple[str, str], int] = {pair: i for i, pair in enumerate(self.pairs)}
+
+    def draw(self, n: int) -> np.ndarray:
+        """
+        Draw the indices of n pairs based on their probabilities.
+        """
+        # The last value can be slightly under 1 from the rounding so it's clipped to stay in range
+        return np.minimum(
+            np.searchsorted(self.cumulative, np.random.random(n), side='right'), len(self.data) - 1
+        )
+
+
+class WebGLSampler:
+    """
+    Samples WebGL vendor/renderer combinations and their data from an in-memory copy of the database.
+    Each OS's table is read from the database once, on its first use. Safe to share between threads.
+    """
+
+    def __init__(self, db_path: Path = DB_PATH) -> None:
+        self.db_path = db_path
+        self._tables: Dict[str, _OSTable] = {}
+        self._lock = Lock()
+
+    def _table(self, os: str) -> _OSTable:
+        """
+        Get the table of an OS, loading it from the database if it's not loaded yet.
+        """
+        table = self._tables.get(os)
+        if table is not None:
+            return table
+
+        # Check that the OS is valid (avoid SQL injection)
+        if os not in OS_ARCH_MATRIX:
+            raise ValueError(f'Invalid OS: {os}. Must be one of: win, mac, lin')
+
+        with self._lock:
+            if os not in self._tables:
+                conn = sqlite3.connect(self.db_path)
+                try:
+                    rows = conn.execute(
+                        f'SELECT vendor, renderer, data, {os} FROM webgl_fingerprints WHERE {os} > 0'  # nosec
+                    ).fetchall()
+                finally:
+                    conn.close()
+
+                if not rows:
+                    raise ValueError(f'No WebGL data found for OS: {os}')
+                self._tables[os] = _OSTable(rows)
+            return self._tables[os]
+
+    def _pair_exists(self, vendor: str, renderer: str) -> bool:
+        """
+        Check if a vendor/renderer pair is in the database for any OS.
+        """
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return (
+                conn.execute(
+                    'SELECT 1 FROM webgl_fingerprints WHERE vendor = ? AND renderer = ?',
+                    (vendor, renderer),
+                ).fetchone()
+                is not None
+            )
+        finally:
+            conn.close()
+
+    def sample(
+        self, os: str, vendor: Optional[str] = None, renderer: Optional[str] = None
+    ) -> Dict[str, str]:
+        """
+        Sample a random WebGL vendor/renderer combination and its data based on OS probabilities.
+        Optionally use a specific vendor/renderer pair. Check `sample_webgl` for the arguments.
+        """
+        table = self._table(os)
+        if not (vendor and renderer):
+            return orjson.loads(table.data[table.draw(1)[0]])
+
+        idx = table.index.get((vendor, renderer))
+        if idx is None:
+            if not self._pair_exists(vendor, renderer):
+                raise ValueError(
+                    f'No WebGL data found for vendor "{vendor}" and renderer "{renderer}"'
+                )
+            raise ValueError(
+                f'Vendor "{vendor}" and renderer "{renderer}" combination not valid for {os.title()}.\n'
+                f'Possible pairs: {", ".join(str(pair) for pair in table.pairs)}'
+            )
+        return orjson.loads(table.data[idx])
+
+    def sample_many(self, os: str, n: int) -> List[Dict[str, str]]:
+        """
+        Sample n random WebGL vendor/renderer combinations and their data at once based on OS probabilities.
+        Useful to pre-generate many fingerprints.
+        """
+        table = self._table(os)
+        return [orjson.loads(table.data[idx]) for idx in table.draw(n)]
+
+
+# The sampler shared by the whole process
+_sampler = WebGLSampler()
+
+
 def sample_webgl(
     os: str, vendor: Optional[str] = None, renderer: Optional[str] = None
 ) -> Dict[str, str]:
@@ -29,62 +145,21 @@ def sample_webgl(
     Raises:
         ValueError: If invalid OS provided or no data found for OS/vendor/renderer
     """
-    # Check that the OS is valid (avoid SQL injection)
-    if os not in OS_ARCH_MATRIX:
-        raise ValueError(f'Invalid OS: {os}. Must be one of: win, mac, lin')
-
-    # Connect to database
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-
-    if vendor and renderer:
-        # Get specific vendor/renderer pair and verify it exists for this OS
-        cursor.execute(
-            f'SELECT vendor, renderer, data, {os} FROM webgl_fingerprints '  # nosec
-            'WHERE vendor = ? AND renderer = ?',
-            (vendor, renderer),
-        )
-        result = cursor.fetchone()
-
-        if not result:
-            raise ValueError(f'No WebGL data found for vendor "{vendor}" and renderer "{renderer}"')
-
-        if result[3] <= 0:  # Check OS-specific probability
-            # Get a list of possible (vendor, renderer) pairs for this OS
-            cursor.execute(
-                f'SELECT DISTINCT vendor, renderer FROM webgl_fingerprints WHERE {os} > 0'  # nosec
-            )
-            possible_pairs = cursor.fetchall()
-            raise ValueError(
-                f'Vendor "{vendor}" and renderer "{renderer}" combination not valid for {os.title()}.\n'
-                f'Possible pairs: {", ".join(str(pair) for pair in possible_pairs)}'
-            )
-
-        conn.close()
-        return orjson.loads(result[2])
-
-    # Get all vendor/renderer pairs and their probabilities for this OS
-    cursor.execute(
-        f'SELECT vendor, renderer, data, {os} FROM webgl_fingerprints WHERE {os} > 0'  # nosec
-    )
-    results = cursor.fetchall()
-    conn.close()
-
-    if not results:
-        raise ValueError(f'No WebGL data found for OS: {os}')
+    return _sampler.sample(os, vendor, renderer)
 
-    # Split into separate arrays
-    _, _, data_strs, probs = map(list, zip(*results))
 
-    # Convert probabilities to numpy array and normalize
-    probs_array = np.array(probs, dtype=np.float64)
-    probs_array = probs_array / probs_array.sum()
+def sample_webgl_many(os: str, n: int) -> List[Dict[str, str]]:
+    """
+    Sample n random WebGL vendor/renderer combinations and their data based on OS probabilities.
 
-    # Sample based on probabilities
-    idx = np.random.choice(len(probs_array), p=probs_array)
+    Args:
+        os: Operating system ('win', 'mac', or 'lin')
+        n: Number of samples to draw
 
-    # Parse the JSON data string
-    return orjson.loads(data_strs[idx])
+    Returns:
+        List of dicts containing WebGL data, each one is a separate copy
+    """
+    return _sampler.sample_many(os, n)
 
 
 def get_possible_pairs() -> Dict[str, List[Tuple[str, str]]]:
@@ -3,10 +3,6 @@ import json
 from language_tags import data
 
 
-index = data.get('index')
-registry = data.get('registry')
-
-
 class Subtag:
     def __init__(self, subtag, type):
 
@@ -33,6 +29,7 @@ class Subtag:
             def __str__(self):
                 return repr("%s: %s" % (self.code, self.message))
 
+        index = data.index()
         if subtag not in index:
             raise Error(self.ERR_NONEXISTENT, 'Non-existent subtag %s.' % subtag)
         types = index[subtag]
@@ -41,7 +38,7 @@ class Subtag:
             raise Error(self.ERR_NONEXISTENT, 'Non-existent subtag %s of type %s.' % (subtag, type))
         i = types[type]
 
-        record = registry[i]
+        record = data.record(i)
         if 'Subtag' not in record:
             raise Error(self.ERR_TAG, '%s is a %s tag' % (subtag, type))
 
@@ -3,11 +3,7 @@ import json
 
 
 from language_tags.Subtag import Subtag
-from language_tags import data
-
-
-index = data.get('index')
-registry = data.get('registry')
+from language_tags import data as registry
 
 
 class Tag:
@@ -22,12 +18,13 @@ class Tag:
 
         self.data = {'tag': tag}
 
+        index = registry.index()
         if tag in index:
             types = index[tag]
             # Check if the input tag is grandfathered or redundant.
             if 'grandfathered' in types or 'redundant' in types:
-                self.data['record'] = registry[types['grandfathered']] if 'grandfathered' in types \
-                    else registry[types['redundant']]
+                self.data['record'] = registry.record(types['grandfathered']) if 'grandfathered' in types \
+                    else registry.record(types['redundant'])
 
         # Include errror codes
         self.ERR_DEPRECATED = 1
@@ -148,6 +145,7 @@ class Tag:
             The return list can be empty.
         """
         data = self.data
+        index = registry.index()
         subtags = []
 
         # if tag is grandfathered return no subtags
@@ -264,6 +262,7 @@ class Tag:
         """
         errors = []
         data = self.data
+        index = registry.index()
         error = self.error
 
         # Check if the tag is grandfathered and if the grandfathered tag is deprecated (e.g. no-nyn).
@@ -1,13 +1,20 @@
 import os
 import json
+import threading
+from array import array
 from io import open
 
-__all__ = ['get']
+__all__ = ['get', 'index', 'record', 'build_registry_offsets']
 
 parent_dir = os.path.dirname(__file__)
 data_dir = 'json/'
+# The byte offset of each record in registry.json followed by the file's size, as little-endian unsigned 32-bit integers
+registry_offsets_file = 'registry.offsets'
 
 cache = {}
+records = {}
+_registry_offsets = None
+_lock = threading.Lock()
 
 
 def get(name):
@@ -16,3 +23,81 @@ def get(name):
             cache[name] = json.load(f)
 
     return cache[name]
+
+
+def index():
+    """
+    Get the index of the subtags and tags in the registry, mapping each of them to its types and their record numbers.
+    """
+    return get('index')
+
+
+def _scan_registry_offsets(content):
+    """
+    Find where each record of the pretty-printed registry.json starts, they are the only lines that start with a tab then `{`.
+    """
+    offsets = array('I')
+    position = content.find(b'\n\t{')
+    while position != -1:
+        offsets.append(position + 1)
+        position = content.find(b'\n\t{', position + 3)
+    offsets.append(len(content))
+    return offsets
+
+
+def build_registry_offsets():
+    """
+    Write the prebuilt offsets file of registry.json, it has to be run again whenever the registry is updated.
+    """
+    with open(os.path.join(parent_dir, data_dir, 'registry.json'), 'rb') as f:
+        offsets = _scan_registry_offsets(f.read())
+    if array('I').itemsize != 4:
+        raise RuntimeError('The offsets file needs 4 bytes unsigned integers.')
+    with open(os.path.join(parent_dir, data_dir, registry_offsets_file), 'wb') as f:
+        f.write(offsets.tobytes())
+
+
+def _load_registry_offsets():
+    global _registry_offsets
+    registry_path = os.path.join(parent_dir, data_dir, 'registry.json')
+    offsets = array('I')
+    try:
+        with open(os.path.join(parent_dir, data_dir, registry_offsets_file), 'rb') as f:
+            offsets.frombytes(f.read())
+    except (OSError, ValueError):
+        offsets = None
+
+    # The prebuilt offsets are only used if they still match the registry otherwise they are found again
+    if not offsets or offsets.itemsize != 4 or offsets[-1] != os.path.getsize(registry_path):
+        with open(registry_path, 'rb') as f:
+            offsets = _scan_registry_offsets(f.read())
+    _registry_offsets = offsets
+
+
+def record(i):
+    """
+    Get the record of the registry at the given position, only that record is read and decoded.
+    Records are kept once decoded since the same few are looked up every time a tag is checked.
+
+    :param int i: the position of the record in the registry.
+    :return: the record's dictionary.
+    """
+    if 'registry' in cache:
+        return cache['registry'][i]
+
+    result = records.get(i)
+    if result is None:
+        with _lock:
+            if _registry_offsets is None:
+                _load_registry_offsets()
+        start, end = _registry_offsets[i], _registry_offsets[i + 1]
+        with open(os.path.join(parent_dir, data_dir, 'registry.json'), 'rb') as f:
+            f.seek(start)
+            chunk = f.read(end - start)
+        # The chunk of the last record ends with the closing bracket of the array
+        chunk = chunk.rstrip()
+        if i == len(_registry_offsets) - 2 and chunk.endswith(b']'):
+            chunk = chunk[:-1].rstrip()
+        result = records[i] = json.loads(chunk.rstrip(b',').decode('utf-8'))
+
+    return result
@@ -1,13 +1,11 @@
 # -*- coding: utf-8 -*-
+from functools import lru_cache
+
 from language_tags.Subtag import Subtag
 from language_tags.Tag import Tag
 from language_tags import data
 
 
-index = data.get('index')
-registry = data.get('registry')
-
-
 class tags():
 
     @staticmethod
@@ -21,9 +19,11 @@ class tags():
         return Tag(tag)
 
     @staticmethod
+    @lru_cache(maxsize=1024)
     def check(tag):
         """
         Check if a string (hyphen-separated) tag is valid.
+        The result is kept per tag string since the same few tags are checked over and over.
 
         :param str tag: (hyphen-separated) tag.
         :return: bool -- True if valid.
@@ -39,6 +39,7 @@ class tags():
         :param str subtag: subtag.
         :return: list of types. The return list can be empty.
         """
+        index = data.index()
         if subtag in index:
             types = index[subtag]
             return [type for type in types.keys() if type != 'redundant' or type != 'grandfathered']
@@ -103,7 +104,7 @@ class tags():
             def test(record):
                 return description.search(', '.join(record['Description'])) is not None
 
-        records = filter(lambda r: False if ('Subtag' not in r and not all) else test(r), registry)
+        records = filter(lambda r: False if ('Subtag' not in r and not all) else test(r), data.get('registry'))
         records = list(records)
         # Sort by matched description string length. This is a quick way to push precise matches towards the top.
         results = sorted(records, key=lambda r: min([abs(len(r_description) - len(description))
@@ -143,7 +144,7 @@ class tags():
         macrolanguage_data = data.get('macrolanguage')
         if macrolanguage not in macrolanguage_data:
             raise Exception('\'' + macrolanguage + '\' is not a macrolanguage.')
-        for registry_item in registry:
+        for registry_item in data.get('registry'):
             record = registry_item
             if 'Macrolanguage' in record:
                 if record['Macrolanguage'] == macrolanguage:
@@ -161,6 +162,7 @@ class tags():
         :return: :class:`language_tags.Subtag.Subtag` if exists, otherwise None.
         """
         subtag = subtag.lower()
+        index = data.index()
         if subtag in index:
             types = index[subtag]
             if type in types:
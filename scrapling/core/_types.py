@@ -2,9 +2,9 @@
 Type definitions for type checking purposes.
 """
 
-from typing import (TYPE_CHECKING, Any, Callable, Dict, Generator, Iterable,
-                    List, Literal, Optional, Pattern, Tuple, Type, TypeVar,
-                    Union)
+from typing import (TYPE_CHECKING, Any, AsyncGenerator, Awaitable, Callable,
+                    Dict, Generator, Iterable, List, Literal, Optional,
+                    Pattern, Set, Tuple, Type, TypeVar, Union)
 
 SelectorWaitStates = Literal["attached", "detached", "hidden", "visible"]
 
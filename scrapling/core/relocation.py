@@ -0,0 +1,402 @@
+"""
+A per-document index of elements and the scoring backends used to speed up relocating elements in auto-matching
+"""
+from lxml import html
+
+from scrapling.core._types import Any, Callable, Dict, Generator, List, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    ALLOW_NUMPY = False
+else:
+    ALLOW_NUMPY = True
+
+# The number of buckets characters/tags are hashed into for the vectorized scoring
+_BUCKETS = 32
+
+
+def _length_bound(first_length: int, second_length: int) -> float:
+    """The highest `SequenceMatcher.ratio()` possible between two sequences with these lengths (Same as `real_quick_ratio`)"""
+    total = first_length + second_length
+    return 2.0 * min(first_length, second_length) / total if total else 1.0
+
+
+class RelocationIndex:
+    """Indexes all elements under a root by tag, attribute keys, class tokens, and depth in one pass.
+
+    It's used by `Adaptor.relocate` to score the elements most likely to match the original element first,
+    then skip the rest of elements that can't reach the highest score found without calculating their full score.
+    The pruning is based on upper bounds of the score so the result is the same as scoring all elements.
+    """
+    __slots__ = (
+        'nodes', 'tags', 'depths', 'attributes', 'text_lengths', 'parents', 'siblings_counts',
+        'by_tag', 'by_class', 'by_attribute_key', 'root', 'backends_data'
+    )
+
+    def __init__(self, root: html.HtmlElement):
+        self.root = root
+        # For scoring backends to keep what they compute for the document once, by the backend name
+        self.backends_data: Dict[str, Any] = {}
+        self.nodes: List[html.HtmlElement] = []
+        self.tags: List[str] = []
+        self.depths: List[int] = []  # The length of the element path (The same as `len(element_to_dict(node)['path'])`)
+        self.attributes: List[Dict] = []
+        self.text_lengths: List[int] = []
+        # For each element: its parent's tag, number of attributes, and text length
+        self.parents: List[Tuple[str, int, int]] = []
+        self.siblings_counts: List[int] = []
+        self.by_tag: Dict[str, List[int]] = {}
+        self.by_class: Dict[str, List[int]] = {}
+        self.by_attribute_key: Dict[str, List[int]] = {}
+
+        # Pre-order traversal to keep the same order of `root.xpath('.//*')`
+        root_depth = sum(1 for _ in root.iterancestors()) + 1
+        stack = [(child, root_depth + 1, self.__parent_data(root)) for child in reversed(root) if isinstance(child.tag, str)]
+        while stack:
+            node, depth, parent = stack.pop()
+            self.__add(node, depth, parent)
+            if len(node):
+                node_data = self.__parent_data(node)
+                stack.extend((child, depth + 1, node_data) for child in reversed(node) if isinstance(child.tag, str))
+
+    @staticmethod
+    def __parent_data(node: html.HtmlElement) -> Tuple[str, int, int, int]:
+        # Same as `parent_name`, `parent_attribs`, `parent_text`, and `siblings` in `_StorageTools.element_to_dict`
+        return str(node.tag), len(node.attrib), len(node.text.strip()) if node.text else 0, len(node) - 1
+
+    def __add(self, node: html.HtmlElement, depth: int, parent: Tuple[str, int, int, int]) -> None:
+        position = len(self.nodes)
+        tag = str(node.tag)
+        # Same cleaning done by `_StorageTools.element_to_dict`
+        attributes = {k: v.strip() for k, v in node.attrib.items() if v and v.strip()}
+
+        self.nodes.append(node)
+        self.tags.append(tag)
+        self.depths.append(depth)
+        self.attributes.append(attributes)
+        self.text_lengths.append(len(node.text.strip()) if node.text else 0)
+        self.parents.append(parent[:3])
+        self.siblings_counts.append(parent[3])
+
+        self.by_tag.setdefault(tag, []).append(position)
+        for key in attributes:
+            self.by_attribute_key.setdefault(key, []).append(position)
+        for token in set(attributes.get('class', '').split()):
+            self.by_class.setdefault(token, []).append(position)
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def nodes_at(self, positions: List[int]) -> List[html.HtmlElement]:
+        """Return the elements at these positions in the same order they are in the page"""
+        return [self.nodes[position] for position in sorted(positions)]
+
+    def candidates(self, original: Dict) -> Generator[int, None, None]:
+        """Yield the positions of all elements, starting with the ones with the same tag that share a class token or an attribute key
+        with the original element, so the highest scores are found as early as possible.
+
+        :param original: The original element in the form of the dictionary generated from `element_to_dict` function
+        """
+        likely = set()
+        for token in original['attributes'].get('class', '').split():
+            likely.update(self.by_class.get(token, ()))
+        for key in original['attributes']:
+            likely.update(self.by_attribute_key.get(key, ()))
+
+        same_tag = self.by_tag.get(original['tag'], [])
+        first = sorted(likely.intersection(same_tag)) if likely else same_tag
+        yield from first
+
+        first = set(first)
+        for position in range(len(self.nodes)):
+            if position not in first:
+                yield position
+
+    def score_bound(self, original: Dict) -> Callable[[int], float]:
+        """Return a function that takes a position and returns the highest percentage the element there can get
+        with `Adaptor.__calculate_similarity_score` against the original element, without calculating the score itself.
+
+        :param original: The original element in the form of the dictionary generated from `element_to_dict` function
+        """
+        original_attributes = original['attributes']
+        original_text_length = len(original['text']) if original['text'] else 0
+        original_path_length = len(original['path'])
+        compared_attributes = tuple(
+            (attrib, len(original_attributes[attrib])) for attrib in ('class', 'id', 'href', 'src',) if original_attributes.get(attrib)
+        )
+        parent_name = original.get('parent_name')
+        parent_attributes_count = len(original.get('parent_attribs') or {})
+        parent_text_length = len(original['parent_text']) if parent_name and original['parent_text'] else 0
+        siblings_count = len(original.get('siblings') or ())
+
+        checks = 3 + (1 if original_text_length else 0) + len(compared_attributes)
+        if parent_name:
+            checks += 2 + (1 if parent_text_length else 0)
+        if siblings_count:
+            checks += 1
+
+        def bound(position: int) -> float:
+            attributes = self.attributes[position]
+            score = 1 if self.tags[position] == original['tag'] else 0
+            if original_text_length:
+                score += _length_bound(original_text_length, self.text_lengths[position])
+
+            score += _length_bound(len(original_attributes), len(attributes))
+            for attrib, length in compared_attributes:
+                score += _length_bound(length, len(attributes.get(attrib) or ''))
+
+            score += _length_bound(original_path_length, self.depths[position])
+            if parent_name:
+                candidate_parent_name, candidate_parent_attributes_count, candidate_parent_text_length = self.parents[position]
+                score += _length_bound(len(parent_name), len(candidate_parent_name))
+                score += _length_bound(parent_attributes_count, candidate_parent_attributes_count)
+                if parent_text_length:
+                    score += _length_bound(parent_text_length, candidate_parent_text_length)
+
+            if siblings_count:
+                score += _length_bound(siblings_count, self.siblings_counts[position])
+            # Rounded the same way so a bound can't be lower than the score it's bounding
+            return round((score / checks) * 100, 2)
+
+        return bound
+
+
+class ScoringBackend:
+    """The base class of backends that score the elements of the page against the original element for `Adaptor.relocate`.
+
+    To replace the scoring, subclass it then set an instance of your class to `Adaptor.scoring_backend`.
+    """
+
+    def score_table(
+            self, original: Dict, index: RelocationIndex, exact_score: Callable[[Dict, html.HtmlElement], float],
+            percentage: int = 0, exhaustive: bool = False
+    ) -> Dict[float, List[int]]:
+        """Score the elements of the index against the original element.
+
+        :param original: The original element in the form of the dictionary generated from `element_to_dict` function
+        :param index: The `RelocationIndex` of the page.
+        :param exact_score: The function that calculates the exact score of an element against the original element.
+        :param percentage: Elements that can't reach this score can be skipped.
+        :param exhaustive: If enabled, all elements must be scored (Used while debugging to log the top scores).
+        :return: A dictionary of each score and the positions of the elements that got it in the index.
+            It must have all the elements with the highest score.
+        """
+        raise NotImplementedError
+
+
+class PythonScoringBackend(ScoringBackend):
+    """Calculates the exact score of each element one by one, skipping elements that can't reach the best score found so far"""
+
+    def score_table(
+            self, original: Dict, index: RelocationIndex, exact_score: Callable[[Dict, html.HtmlElement], float],
+            percentage: int = 0, exhaustive: bool = False
+    ) -> Dict[float, List[int]]:
+        score_table = {}
+        score_bound = index.score_bound(original)
+        best_score = percentage
+        for position in index.candidates(original):
+            # The code doesn't stop even if the score was 100% because there might be another element(s) left in page with the same score.
+            # Elements that can't reach the best score found so far are skipped without calculating their full score.
+            if not exhaustive and score_bound(position) < best_score:
+                continue
+
+            score = exact_score(original, index.nodes[position])
+            best_score = max(best_score, score)
+            score_table.setdefault(score, []).append(position)
+
+        return score_table
+
+
+class NumpyScoringBackend(ScoringBackend):
+    """Scores all elements of the page in one NumPy batch with features computed once per page.
+
+    Each `SequenceMatcher` ratio of the exact score is replaced with the ratio of the items both sides share regardless of their order
+    (Like `SequenceMatcher.quick_ratio`) over characters/tags hashed into buckets. So the approximate score of an element is never lower than
+    its exact score, the difference comes from characters/tags that changed their order and hash collisions.
+
+    With `exact` enabled (the default), elements are then scored exactly from the highest approximate score down until the approximate
+    score can't reach the best exact score, so the result is the same as scoring all elements exactly.
+    With `exact` disabled, the approximate scores are used directly without any `SequenceMatcher` calls, which is much faster on big pages.
+    The tolerance in that case: an approximate score is never lower than the exact score (minus 0.005 of rounding) and it was up to ~8 percentage points
+    higher in our benchmarks, so elements whose exact scores are that close to the best score can be ranked differently than the exact scoring.
+    """
+
+    def __init__(self, exact: bool = True):
+        """
+        :param exact: If enabled, the elements that can have the highest score get their exact score calculated.
+        """
+        if not ALLOW_NUMPY:
+            raise ImportError('NumPy is required for `NumpyScoringBackend`, install it with `pip install numpy`')
+        self.exact = exact
+
+    def score_table(
+            self, original: Dict, index: RelocationIndex, exact_score: Callable[[Dict, html.HtmlElement], float],
+            percentage: int = 0, exhaustive: bool = False
+    ) -> Dict[float, List[int]]:
+        if not len(index):
+            return {}
+
+        features = index.backends_data.get('numpy')
+        if features is None:
+            features = index.backends_data['numpy'] = _PageFeatures(index)
+        approximate_scores = features.approximate_scores(original)
+
+        score_table = {}
+        if self.exact:
+            best_score = percentage
+            for position in np.argsort(-approximate_scores, kind='stable').tolist():
+                # Exact scores are rounded to 2 decimal places so this is the lowest bound that can still be rounded up to the best score
+                if not exhaustive and approximate_scores[position] < best_score - 0.005 - 1e-6:
+                    break
+
+                score = exact_score(original, index.nodes[position])
+                best_score = max(best_score, score)
+                score_table.setdefault(score, []).append(position)
+
+            return score_table
+
+        approximate_scores = np.round(approximate_scores, 2)
+        if exhaustive:
+            for position, score in enumerate(approximate_scores.tolist()):
+                score_table.setdefault(score, []).append(position)
+        else:
+            highest_score = approximate_scores.max()
+            score_table[float(highest_score)] = np.flatnonzero(approximate_scores == highest_score).tolist()
+
+        return score_table
+
+
+def _bucket(token: Any) -> int:
+    return hash(token) % _BUCKETS
+
+
+def _chars_matrix(strings: List[str]) -> Tuple['np.ndarray', 'np.ndarray']:
+    """Count the characters of each string in buckets, one row per string, and return the counts with the lengths of the strings"""
+    lengths = np.fromiter(map(len, strings), dtype=np.int64, count=len(strings))
+    codes = np.frombuffer(''.join(strings).encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+    rows = np.repeat(np.arange(len(strings)), lengths)
+    counts = np.bincount(rows * _BUCKETS + codes % _BUCKETS, minlength=len(strings) * _BUCKETS)
+    return counts.reshape(-1, _BUCKETS).astype(np.uint32), lengths
+
+
+def _tokens_matrix(tokens_lists: List[List[Any]]) -> Tuple['np.ndarray', 'np.ndarray']:
+    """Count the tokens (tags, attribute keys/values) of each list in buckets, one row per list, and return the counts with the lengths of the lists"""
+    lengths = np.fromiter(map(len, tokens_lists), dtype=np.int64, count=len(tokens_lists))
+    buckets = np.fromiter((_bucket(token) for tokens in tokens_lists for token in tokens), dtype=np.int64, count=int(lengths.sum()))
+    rows = np.repeat(np.arange(len(tokens_lists)), lengths)
+    counts = np.bincount(rows * _BUCKETS + buckets, minlength=len(tokens_lists) * _BUCKETS)
+    return counts.reshape(-1, _BUCKETS).astype(np.uint32), lengths
+
+
+def _ratios(counts: 'np.ndarray', lengths: 'np.ndarray', original: Tuple['np.ndarray', 'np.ndarray']) -> 'np.ndarray':
+    """The ratio of shared items between each row and the original, it's an upper bound of `SequenceMatcher.ratio()` for each row"""
+    original_counts, original_length = original[0][0], original[1][0]
+    total = lengths + original_length
+    shared = np.minimum(counts, original_counts).sum(axis=1)
+    return np.where(total > 0, 2.0 * shared / np.maximum(total, 1), 1.0)
+
+
+class _PageFeatures:
+    """The features of all elements in the index used by `NumpyScoringBackend`, computed in one pass"""
+    __slots__ = (
+        'tag_ids', 'tags_ids_map', 'parent_rows', 'text', 'attributes', 'attribute_keys', 'attribute_values', 'paths', 'siblings',
+        'parent_names', 'parent_texts', 'parent_attribute_keys', 'parent_attribute_values',
+    )
+
+    def __init__(self, index: RelocationIndex):
+        nodes = index.nodes
+        self.tags_ids_map = {}
+        self.tag_ids = np.fromiter(
+            (self.tags_ids_map.setdefault(tag, len(self.tags_ids_map)) for tag in index.tags), dtype=np.int64, count=len(nodes)
+        )
+        # Same data of `_StorageTools.element_to_dict` for each element
+        self.text = _chars_matrix([node.text.strip() if node.text else '' for node in nodes])
+        self.attributes = {
+            attrib: _chars_matrix([attributes.get(attrib) or '' for attributes in index.attributes])
+            for attrib in ('class', 'id', 'href', 'src',)
+        }
+        self.attribute_keys = _tokens_matrix([list(attributes.keys()) for attributes in index.attributes])
+        self.attribute_values = _tokens_matrix([list(attributes.values()) for attributes in index.attributes])
+
+        # Elements are in pre-order so each parent comes before its children
+        positions = {node: position for position, node in enumerate(nodes)}
+        parents, parents_rows, parent_rows = [], {}, []
+        paths = np.zeros((len(nodes), _BUCKETS), dtype=np.uint32)
+        root_path = np.zeros(_BUCKETS, dtype=np.uint32)
+        for ancestor in [index.root, *index.root.iterancestors()]:
+            root_path[_bucket(ancestor.tag)] += 1
+
+        for position, node in enumerate(nodes):
+            parent = node.getparent()
+            row = parents_rows.get(parent)
+            if row is None:
+                row = parents_rows[parent] = len(parents)
+                parents.append(parent)
+            parent_rows.append(row)
+
+            parent_position = positions.get(parent)
+            paths[position] = root_path if parent_position is None else paths[parent_position]
+            paths[position, _bucket(node.tag)] += 1
+
+        self.paths = (paths, np.asarray(index.depths, dtype=np.int64))
+        self.parent_rows = np.asarray(parent_rows, dtype=np.int64)
+        self.parent_names = _chars_matrix([str(parent.tag) for parent in parents])
+        self.parent_texts = _chars_matrix([parent.text.strip() if parent.text else '' for parent in parents])
+        self.parent_attribute_keys = _tokens_matrix([list(parent.attrib.keys()) for parent in parents])
+        self.parent_attribute_values = _tokens_matrix([list(parent.attrib.values()) for parent in parents])
+
+        # The siblings of an element are the children of its parent without itself
+        children, children_lengths = _tokens_matrix([[child.tag for child in parent] for parent in parents])
+        siblings = children[self.parent_rows].astype(np.int64)
+        siblings[np.arange(len(nodes)), [_bucket(tag) for tag in index.tags]] -= 1
+        self.siblings = (siblings, children_lengths[self.parent_rows] - 1)
+
+    def __parents(self, feature: Tuple['np.ndarray', 'np.ndarray']) -> Tuple['np.ndarray', 'np.ndarray']:
+        return feature[0][self.parent_rows], feature[1][self.parent_rows]
+
+    def approximate_scores(self, original: Dict) -> 'np.ndarray':
+        """Return the approximate percentage score of each element against the original element, it's never lower than the exact score"""
+        attributes = original['attributes']
+        tag_id = self.tags_ids_map.get(original['tag'], -1)
+        score = (self.tag_ids == tag_id).astype(np.float64)
+        checks = 1
+
+        if original['text']:
+            score += _ratios(*self.text, _chars_matrix([original['text']]))
+            checks += 1
+
+        score += _ratios(*self.attribute_keys, _tokens_matrix([list(attributes.keys())])) * 0.5
+        score += _ratios(*self.attribute_values, _tokens_matrix([list(attributes.values())])) * 0.5
+        checks += 1
+
+        for attrib in ('class', 'id', 'href', 'src',):
+            if attributes.get(attrib):
+                score += _ratios(*self.attributes[attrib], _chars_matrix([attributes[attrib]]))
+                checks += 1
+
+        score += _ratios(*self.paths, _tokens_matrix([list(original['path'])]))
+        checks += 1
+
+        if original.get('parent_name'):
+            # All elements in the index have a parent
+            score += _ratios(*self.__parents(self.parent_names), _chars_matrix([original['parent_name']]))
+            parent_attributes = original.get('parent_attribs') or {}
+            score += _ratios(*self.__parents(self.parent_attribute_keys), _tokens_matrix([list(parent_attributes.keys())])) * 0.5
+            score += _ratios(*self.__parents(self.parent_attribute_values), _tokens_matrix([list(parent_attributes.values())])) * 0.5
+            checks += 2
+
+            if original['parent_text']:
+                score += _ratios(*self.__parents(self.parent_texts), _chars_matrix([original['parent_text']]))
+                checks += 1
+
+        if original.get('siblings'):
+            score += _ratios(*self.siblings, _tokens_matrix([list(original['siblings'])]))
+            checks += 1
+
+        return (score / checks) * 100
+
+
+def default_scoring_backend() -> ScoringBackend:
+    """Return the NumPy backend if NumPy is installed, otherwise the Python one"""
+    return NumpyScoringBackend() if ALLOW_NUMPY else PythonScoringBackend()
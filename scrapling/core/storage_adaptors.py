@@ -1,13 +1,14 @@
 import sqlite3
 import threading
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 from hashlib import sha256
 
 import orjson
 from lxml import html
 from tldextract import extract as tld
 
-from scrapling.core._types import Dict, Optional, Union
+from scrapling.core._types import Dict, Iterable, List, Optional, Tuple, Union
 from scrapling.core.utils import _StorageTools, log, lru_cache
 
 
@@ -50,6 +51,19 @@ class StorageSystemMixin(ABC):
         """
         raise NotImplementedError('Storage system must implement `save` method')
 
+    def retrieve_many(self, identifiers: Iterable[str]) -> Dict[str, Dict]:
+        """Retrieve the unique properties of many elements at once, override it if your storage can do it in one query
+
+        :param identifiers: The identifiers that will be used to retrieve the elements from the storage.
+        :return: A dictionary of each found identifier and the unique properties of its element
+        """
+        results = {}
+        for identifier in identifiers:
+            element_data = self.retrieve(identifier)
+            if element_data:
+                results[identifier] = element_data
+        return results
+
     @staticmethod
     @lru_cache(128, typed=True)
     def _get_hash(identifier: str) -> str:
@@ -68,14 +82,41 @@ class SQLiteStorageSystem(StorageSystemMixin):
     """The recommended system to use, it's race condition safe and thread safe.
     Mainly built so the library can run in threaded frameworks like scrapy or threaded tools
     > It's optimized for threaded applications but running it without threads shouldn't make it slow."""
-    def __init__(self, storage_file: str, url: Union[str, None] = None):
+    def __init__(
+            self, storage_file: str, url: Union[str, None] = None, write_behind: bool = False,
+            flush_size: int = 100, flush_interval: int = 1000, cache_size: int = 256
+    ):
         """
         :param storage_file: File to be used to store elements
         :param url: URL of the website we are working on to separate it from other websites data
+        :param write_behind: If enabled, saved elements are kept in memory then written together in one transaction
+            every `flush_size` elements or `flush_interval` milliseconds, whichever comes first. Pending elements are written on `close()` too.
+        :param flush_size: The number of pending elements that triggers writing them in write-behind mode. The default is 100.
+        :param flush_interval: The maximum milliseconds an element stays pending in write-behind mode. The default is 1000.
+        :param cache_size: The maximum number of retrieved elements kept in memory so retrieving them again doesn't touch the storage file,
+            use `cache_stats()` to size it. The default is 256, and 0 disables it.
 
         """
         super().__init__(url)
         self.storage_file = storage_file
+        self.write_behind = write_behind
+        self.flush_size = max(flush_size, 1)
+        self.flush_interval = flush_interval
+        # Elements waiting to be written in write-behind mode, the last save of the same element wins
+        self._pending: Dict[Tuple[str, str], bytes] = {}
+        # The hash of the data of each element stored (or pending) so saving the same data again can be skipped
+        self._stored_hashes: Dict[Tuple[str, str], bytes] = {}
+        self._flush_timer: Optional[threading.Timer] = None
+        # Read-through LRU cache of retrieved elements by (base url, identifier), with its own lock so it doesn't wait for writes
+        self.cache_size = max(cache_size, 0)
+        self._cache: OrderedDict = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._cache_hits = self._cache_misses = 0
+        # Increased with each save so reads that started before a save don't put old data in the cache
+        self._saves_count = 0
+        # Each thread reads through its own connection so WAL readers run in parallel without the writes lock
+        self._readers: Dict[threading.Thread, sqlite3.Connection] = {}
+        self._closed = False
         # We use a threading.Lock to ensure thread-safety instead of relying on thread-local storage.
         self.lock = threading.Lock()
         # >SQLite default mode in earlier version is 1 not 2 (1=thread-safe 2=serialized)
@@ -86,7 +127,7 @@ class SQLiteStorageSystem(StorageSystemMixin):
         self.cursor = self.connection.cursor()
         self._setup_database()
         log.debug(
-            f'Storage system loaded with arguments (storage_file="{storage_file}", url="{url}")'
+            f'Storage system loaded with arguments (storage_file="{storage_file}", url="{url}", write_behind={write_behind})'
         )
 
     def _setup_database(self) -> None:
@@ -109,14 +150,57 @@ class SQLiteStorageSystem(StorageSystemMixin):
             the docs for more info.
         """
         url = self._get_base_url()
-        element_data = _StorageTools.element_to_dict(element)
+        element_data = orjson.dumps(_StorageTools.element_to_dict(element))
+        key, data_hash = (url, identifier), self.__data_hash(element_data)
         with self.lock:
+            if self._stored_hashes.get(key) == data_hash:
+                # The same data is already stored or pending
+                return
+
+            if self.write_behind:
+                self._pending[key] = element_data
+                self._stored_hashes[key] = data_hash
+                self.__invalidate(key)
+                if len(self._pending) >= self.flush_size:
+                    self.__flush()
+                elif self._flush_timer is None:
+                    self._flush_timer = threading.Timer(self.flush_interval / 1000, self.flush)
+                    self._flush_timer.start()
+                return
+
             self.cursor.execute("""
                 INSERT OR REPLACE INTO storage (url, identifier, element_data)
                 VALUES (?, ?, ?)
-            """, (url, identifier, orjson.dumps(element_data)))
+            """, (url, identifier, element_data))
             self.cursor.fetchall()
             self.connection.commit()
+            self._stored_hashes[key] = data_hash
+            self.__invalidate(key)
+
+    @staticmethod
+    def __data_hash(element_data: Union[bytes, str]) -> bytes:
+        if isinstance(element_data, str):
+            element_data = element_data.encode('utf-8')
+        return sha256(element_data).digest()
+
+    def __flush(self) -> None:
+        """Write all pending elements in one transaction, the lock must be acquired before calling it"""
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+
+        if self._pending:
+            self.cursor.executemany("""
+                INSERT OR REPLACE INTO storage (url, identifier, element_data)
+                VALUES (?, ?, ?)
+            """, [(url, identifier, element_data) for (url, identifier), element_data in self._pending.items()])
+            self.connection.commit()
+            self._pending.clear()
+
+    def flush(self) -> None:
+        """Write all elements pending in write-behind mode to the storage file now"""
+        with self.lock:
+            self.__flush()
 
     def retrieve(self, identifier: str) -> Optional[Dict]:
         """Using the identifier, we search the storage and return the unique properties of the element
@@ -126,22 +210,134 @@ class SQLiteStorageSystem(StorageSystemMixin):
         :return: A dictionary of the unique properties
         """
         url = self._get_base_url()
-        with self.lock:
-            self.cursor.execute(
-                "SELECT element_data FROM storage WHERE url = ? AND identifier = ?",
-                (url, identifier)
+        key = (url, identifier)
+        element_data = self.__cache_get(key)
+        if element_data is not None:
+            return element_data
+
+        saves_count = self._saves_count
+        # No lock needed, pending elements are removed only after they are written
+        pending = self._pending.get(key)
+        if pending is not None:
+            return orjson.loads(pending)
+
+        result = self.__read("SELECT element_data FROM storage WHERE url = ? AND identifier = ?", (url, identifier))
+        if result:
+            self.__remember_hashes({key: self.__data_hash(result[0][0])}, saves_count)
+            element_data = orjson.loads(result[0][0])
+            self.__cache_set(key, element_data, saves_count)
+            return element_data
+        return None
+
+    def retrieve_many(self, identifiers: Iterable[str]) -> Dict[str, Dict]:
+        """Retrieve the unique properties of many elements with one query
+
+        :param identifiers: The identifiers that will be used to retrieve the elements from the storage.
+        :return: A dictionary of each found identifier and the unique properties of its element
+        """
+        url = self._get_base_url()
+        results = {}
+        saves_count = self._saves_count
+        missing = []
+        for identifier in dict.fromkeys(identifiers):
+            element_data = self.__cache_get((url, identifier))
+            if element_data is None:
+                pending = self._pending.get((url, identifier))
+                element_data = orjson.loads(pending) if pending is not None else None
+
+            if element_data is not None:
+                results[identifier] = element_data
+            else:
+                missing.append(identifier)
+
+        # Chunked to stay under SQLite's limit of variables in one query on old versions
+        for start in range(0, len(missing), 500):
+            chunk = missing[start:start + 500]
+            rows = self.__read(
+                f"SELECT identifier, element_data FROM storage WHERE url = ? AND identifier IN ({', '.join('?' * len(chunk))})",
+                (url, *chunk)
             )
-            result = self.cursor.fetchone()
-            if result:
-                return orjson.loads(result[0])
-            return None
+            self.__remember_hashes({(url, identifier): self.__data_hash(element_data) for identifier, element_data in rows}, saves_count)
+            for identifier, element_data in rows:
+                results[identifier] = orjson.loads(element_data)
+                self.__cache_set((url, identifier), results[identifier], saves_count)
+        return results
+
+    def __remember_hashes(self, hashes: Dict[Tuple[str, str], bytes], saves_count: int) -> None:
+        """Record the hashes of stored elements read from the storage file unless a save happened since the read started"""
+        with self.lock:
+            if saves_count == self._saves_count:
+                self._stored_hashes.update(hashes)
+
+    def __read(self, query: str, parameters: Tuple) -> List[Tuple]:
+        """Run a read query through the connection of the current thread"""
+        if self.storage_file == ':memory:':
+            # Each connection to `:memory:` is a separate database so reads go through the main connection
+            with self.lock:
+                self.cursor.execute(query, parameters)
+                return self.cursor.fetchall()
+
+        thread = threading.current_thread()
+        connection = self._readers.get(thread)
+        if connection is None:
+            connection = sqlite3.connect(self.storage_file, check_same_thread=False)
+            connection.execute("PRAGMA query_only = ON")
+            with self._cache_lock:
+                # Connections of finished threads are closed here so short-lived threads don't leave connections open
+                for finished_thread in [t for t in self._readers if not t.is_alive()]:
+                    self._readers.pop(finished_thread).close()
+                self._readers[thread] = connection
+
+        return connection.execute(query, parameters).fetchall()
+
+    def __cache_get(self, key: Tuple[str, str]) -> Optional[Dict]:
+        with self._cache_lock:
+            element_data = self._cache.get(key)
+            if element_data is not None:
+                self._cache.move_to_end(key)
+                self._cache_hits += 1
+            else:
+                self._cache_misses += 1
+            return element_data
+
+    def __cache_set(self, key: Tuple[str, str], element_data: Dict, saves_count: int) -> None:
+        with self._cache_lock:
+            if not self.cache_size or saves_count != self._saves_count:
+                return
+
+            self._cache[key] = element_data
+            self._cache.move_to_end(key)
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def __invalidate(self, key: Tuple[str, str]) -> None:
+        with self._cache_lock:
+            self._saves_count += 1
+            self._cache.pop(key, None)
+
+    def cache_stats(self) -> Dict[str, int]:
+        """Return the hits/misses counters of the retrieve cache with its current and maximum sizes"""
+        with self._cache_lock:
+            return {
+                'hits': self._cache_hits, 'misses': self._cache_misses, 'size': len(self._cache), 'max_size': self.cache_size
+            }
 
     def close(self):
-        """Close all connections, will be useful when with some things like scrapy Spider.closed() function/signal"""
+        """Write pending elements then close all connections, will be useful when with some things like scrapy Spider.closed() function/signal"""
         with self.lock:
+            if self._closed:
+                return
+
+            self.__flush()
             self.connection.commit()
             self.cursor.close()
             self.connection.close()
+            self._closed = True
+
+        with self._cache_lock:
+            for connection in self._readers.values():
+                connection.close()
+            self._readers.clear()
 
     def __del__(self):
         """To ensure all connections are closed when the object is destroyed."""
@@ -14,6 +14,7 @@ from cssselect import HTMLTranslator as OriginalHTMLTranslator
 from cssselect.parser import Element, FunctionalPseudoElement, PseudoElement
 from cssselect.xpath import ExpressionError
 from cssselect.xpath import XPathExpr as OriginalXPathExpr
+from lxml import etree
 from w3lib.html import HTML5_WHITESPACE
 
 from scrapling.core._types import Any, Optional, Protocol, Self
@@ -145,3 +146,12 @@ class HTMLTranslator(TranslatorMixin, OriginalHTMLTranslator):
 
 
 translator_instance = HTMLTranslator()
+
+
+@lru_cache(maxsize=1024)
+def compile_xpath(selector: str) -> etree.XPath:
+    """Compile the XPath selector once so libxml2 doesn't recompile it with each call on each element.
+    XPath variables are bound while calling the compiled object so one object serves all the variables' values.
+    Use `compile_xpath.cache_info()` to check the hits/misses counters.
+    """
+    return etree.XPath(selector)
@@ -1,7 +1,10 @@
 from .camo import CamoufoxEngine
 from .constants import DEFAULT_DISABLED_RESOURCES, DEFAULT_STEALTH_FLAGS
+from .handoff import AsyncHandoffSession, SessionHandle
+from .pool import (AsyncBrowserPool, AsyncContextPool, BrowserPool,
+                   RecyclePolicy)
 from .pw import PlaywrightEngine
-from .static import StaticEngine
+from .static import AsyncFetcherSession, FetcherSession, StaticEngine
 from .toolbelt import check_if_engine_usable
 
 __all__ = ['CamoufoxEngine', 'PlaywrightEngine']
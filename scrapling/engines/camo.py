@@ -1,16 +1,33 @@
-from camoufox import DefaultAddons
-from camoufox.async_api import AsyncCamoufox
-from camoufox.sync_api import Camoufox
+import asyncio
+from functools import partial
 
-from scrapling.core._types import (Callable, Dict, List, Literal, Optional,
-                                   SelectorWaitStates, Union)
+from camoufox import DefaultAddons
+from camoufox.async_api import AsyncNewBrowser
+from camoufox.sync_api import NewBrowser
+from camoufox.utils import async_attach_vd, sync_attach_vd
+from camoufox.virtdisplay import VirtualDisplay
+from playwright.async_api import async_playwright
+from playwright.sync_api import sync_playwright
+
+from scrapling.core._types import (Any, Callable, Dict, List, Literal,
+                                   Optional, Pattern, SelectorWaitStates,
+                                   Union)
 from scrapling.core.utils import log
-from scrapling.engines.toolbelt import (Response, StatusText,
+from scrapling.engines.handoff import SessionHandle, compile_api_pattern
+from scrapling.engines.toolbelt import (NetworkCapture, Response, StatusText,
+                                        StorageStateCache, async_fetch_in_page,
                                         async_intercept_route,
+                                        async_is_restored_state_valid,
+                                        async_save_page_state,
                                         check_type_validity,
-                                        construct_proxy_dict,
+                                        compile_capture_rules,
+                                        construct_proxy_dict, fetch_in_page,
                                         generate_convincing_referer,
-                                        get_os_name, intercept_route)
+                                        get_launch_profiles, get_os_name,
+                                        get_storage_state_cache,
+                                        intercept_route,
+                                        is_restored_state_valid,
+                                        save_page_state)
 
 
 class CamoufoxEngine:
@@ -20,8 +37,10 @@ class CamoufoxEngine:
             timeout: Optional[float] = 30000, page_action: Callable = None, wait_selector: Optional[str] = None, addons: Optional[List[str]] = None,
             wait_selector_state: SelectorWaitStates = 'attached', google_search: bool = True, extra_headers: Optional[Dict[str, str]] = None,
             proxy: Optional[Union[str, Dict[str, str]]] = None, os_randomize: bool = False, disable_ads: bool = False,
-            geoip: bool = False,
-            adaptor_arguments: Dict = None,
+            geoip: bool = False, handoff: Union[bool, str, Pattern] = False, network_capture: Optional[Any] = None,
+            page_requests: Optional[List[Union[str, Dict]]] = None, page_requests_concurrency: int = 10,
+            storage_state_cache: Optional[Any] = None, storage_state_label: str = 'default', storage_state_probe: Optional[Callable] = None,
+            launch_profiles: Optional[Any] = None, adaptor_arguments: Dict = None,
             additional_arguments: Dict = None
     ):
         """An engine that utilizes Camoufox library, check the `StealthyFetcher` class for more documentation.
@@ -49,6 +68,21 @@ class CamoufoxEngine:
         :param google_search: Enabled by default, Scrapling will set the referer header to be as if this request came from a Google search for this website's domain name.
         :param extra_headers: A dictionary of extra headers to add to the request. _The referer set by the `google_search` argument takes priority over the referer set here if used together._
         :param proxy: The proxy to be used with requests, it can be a string or a dictionary with the keys 'server', 'username', and 'password' only.
+        :param handoff: If enabled, the response gets a `session_handle` attribute with the browser's cookies and user agent to continue the session with `AsyncFetcher` requests.
+            Pass a regex of URLs instead of `True` to also capture the headers sent with the page's XHR/fetch requests to these URLs like API keys and tokens.
+        :param network_capture: Capture the responses of the page's XHR/fetch requests whose URLs match these rules and put them in the `captured` attribute of the response.
+            Takes a regex, a `CaptureRule` for more control, or a list of them. Each captured response has its headers, timing, and body which `json()` parses on demand.
+            Bodies of responses that don't match are never read.
+        :param page_requests: URLs or dictionaries of requests to do from inside the page after it loads, with the browser's TLS fingerprint and cookies.
+            They run in batches of single `evaluate` calls and their results are put in the `page_results` attribute of the response.
+        :param page_requests_concurrency: The number of `page_requests` running at the same time inside the page. The default is 10.
+        :param storage_state_cache: A directory or a `StorageStateCache` to save the cookies, localStorage, and sessionStorage in after a successful request,
+            then the next requests with the same `storage_state_label` start with them restored and skip `page_action` which is treated as the warm-up.
+        :param storage_state_label: The label the state is saved under, like the store or account it was warmed up for. The default is `default`.
+        :param storage_state_probe: A function that takes the `page` with a restored state and returns whether it's still valid, like checking the selected ZIP code.
+            When it returns `False`, `page_action` runs to warm the page up again and the new state replaces the saved one.
+        :param launch_profiles: A directory or a `LaunchProfiles` to pick the browser's fingerprint and config from instead of generating them with each launch.
+            The profiles of the current options get generated on the first launch then are reused by the next launches and processes.
         :param adaptor_arguments: The arguments that will be passed in the end while creating the final Adaptor's class.
         :param additional_arguments: Additional arguments to be passed to Camoufox as additional settings and it takes higher priority than Scrapling's settings.
         """
@@ -62,6 +96,20 @@ class CamoufoxEngine:
         self.os_randomize = bool(os_randomize)
         self.disable_ads = bool(disable_ads)
         self.geoip = bool(geoip)
+        self.handoff = bool(handoff)
+        self.handoff_api_pattern = compile_api_pattern(handoff)
+        self.capture_rules = compile_capture_rules(network_capture)
+        self.page_requests = list(page_requests or [])
+        self.page_requests_concurrency = check_type_validity(page_requests_concurrency, [int], 10, param_name='page_requests_concurrency')
+        self.storage_state_cache = get_storage_state_cache(storage_state_cache)
+        self.storage_state_label = check_type_validity(storage_state_label, [str], 'default', param_name='storage_state_label')
+        self.storage_state_probe = None
+        if storage_state_probe is not None:
+            if callable(storage_state_probe):
+                self.storage_state_probe = storage_state_probe
+            else:
+                log.error('[Ignored] Argument "storage_state_probe" must be callable')
+        self.launch_profiles = get_launch_profiles(launch_profiles)
         self.extra_headers = extra_headers or {}
         self.additional_arguments = additional_arguments or {}
         self.proxy = construct_proxy_dict(proxy)
@@ -164,9 +212,76 @@ class CamoufoxEngine:
 
         return history
 
-    def fetch(self, url: str) -> Response:
-        """Opens up the browser and do your request based on your chosen options.
+    @staticmethod
+    def _playwright_manager():
+        """Return the sync playwright context manager that Camoufox browsers are launched through"""
+        return sync_playwright()
+
+    @staticmethod
+    def _async_playwright_manager():
+        """Return the async playwright context manager that Camoufox browsers are launched through"""
+        return async_playwright()
 
+    def _launch_browser(self, playwright):
+        """Launch a new Camoufox browser with the current options on a started playwright instance
+
+        :param playwright: A started sync playwright instance
+        :return: The launched browser
+        """
+        if self.launch_profiles is None:
+            return NewBrowser(playwright, **self._get_camoufox_options())
+
+        virtual_display = VirtualDisplay() if self.headless == 'virtual' else None
+        launch_options = self.launch_profiles.launch_options(self._get_camoufox_options(), virtual_display.get() if virtual_display else None)
+        return sync_attach_vd(playwright.firefox.launch(**launch_options), virtual_display)
+
+    async def _async_launch_browser(self, playwright):
+        """Launch a new Camoufox browser with the current options on a started async playwright instance
+
+        :param playwright: A started async playwright instance
+        :return: The launched browser
+        """
+        if self.launch_profiles is None:
+            return await AsyncNewBrowser(playwright, **self._get_camoufox_options())
+
+        virtual_display = VirtualDisplay() if self.headless == 'virtual' else None
+        # Loading the profiles the first time reads a file or generates them so it's kept off the event loop
+        launch_options = await asyncio.to_thread(
+            self.launch_profiles.launch_options, self._get_camoufox_options(), virtual_display.get() if virtual_display else None
+        )
+        return await async_attach_vd(await playwright.firefox.launch(**launch_options), virtual_display)
+
+    def _api_headers_catcher(self, api_headers: Dict[str, str]) -> Callable:
+        """Return a `request` event handler that collects the headers of the page's API requests matching the handoff pattern"""
+        def catch_api_headers(request):
+            if request.resource_type in ('xhr', 'fetch') and self.handoff_api_pattern.search(request.url):
+                api_headers.update(request.headers)
+
+        return catch_api_headers
+
+    async def _refresh_session_handle(self, url: str) -> SessionHandle:
+        return (await self.async_fetch(url)).session_handle
+
+    async def _refresh_session_handle_in_thread(self, url: str) -> SessionHandle:
+        # The handle came from the sync API so `page_action` is most likely sync too which the async API can't run
+        return (await asyncio.to_thread(self.fetch, url)).session_handle
+
+    def _new_context(self, browser, saved_state: Optional[Dict] = None):
+        """Create a new context in the browser with the current options and the saved state restored in it"""
+        if saved_state is None:
+            return browser.new_context()
+
+        context = browser.new_context(storage_state=saved_state['storage_state'])
+        session_storage_script = StorageStateCache.session_storage_script(saved_state)
+        if session_storage_script:
+            context.add_init_script(script=session_storage_script)
+        return context
+
+    def _fetch_with_context(self, context, url: str, restored: bool = False) -> Response:
+        """Do your request in a new page of an already created browser context then close that page, the context is left open
+        so its cookies and storage are kept for the next requests done with it.
+
+        :param context: A browser context created with `_new_context`
         :param url: Target url.
         :return: A `Response` object that is the same as `Adaptor` object except it has these added attributes: `status`, `reason`, `cookies`, `headers`, and `request_headers`
         """
@@ -178,12 +293,17 @@ class CamoufoxEngine:
             if finished_response.request.resource_type == "document" and finished_response.request.is_navigation_request():
                 final_response = finished_response
 
-        with Camoufox(**self._get_camoufox_options()) as browser:
-            context = browser.new_context()
-            page = context.new_page()
+        page = context.new_page()
+        try:
             page.set_default_navigation_timeout(self.timeout)
             page.set_default_timeout(self.timeout)
             page.on("response", handle_response)
+            capture = NetworkCapture(self.capture_rules) if self.capture_rules else None
+            if capture is not None:
+                page.on("response", capture.handle_response)
+            api_headers = {}
+            if self.handoff_api_pattern is not None:
+                page.on("request", self._api_headers_catcher(api_headers))
 
             if self.disable_resources:
                 page.route("**/*", intercept_route)
@@ -191,16 +311,21 @@ class CamoufoxEngine:
             if self.extra_headers:
                 page.set_extra_http_headers(self.extra_headers)
 
-            first_response = 40(url, referer=referer)
+            first_response = page.goto(url, referer=referer)
             page.wait_for_load_state(state="domcontentloaded")
 
             if self.network_idle:
                 page.wait_for_load_state('networkidle')
 
-            if self.page_action is not None:
+            # A valid restored state means the page is already warmed up
+            reused_state = restored and is_restored_state_valid(self.storage_state_probe, page)
+            # A failed warm-up isn't saved as the state to start the next requests with
+            page_action_failed = False
+            if self.page_action is not None and not reused_state:
                 try:
                     page = self.page_action(page)
                 except Exception as e:
+                    page_action_failed = True
                     log.error(f"Error executing page_action: {e}")
 
             if self.wait_selector and type(self.wait_selector) is str:
@@ -226,13 +351,23 @@ class CamoufoxEngine:
             # PlayWright API sometimes give empty status text for some reason!
             status_text = final_response.status_text or StatusText.get(final_response.status)
 
+            page_results = None
+            if self.page_requests:
+                try:
+                    page_results = fetch_in_page(page, self.page_requests, concurrency=self.page_requests_concurrency, timeout=self.timeout)
+                except Exception as e:
+                    log.error(f"Error doing the page requests: {e}")
+
             history = self._process_response_history(first_response)
             try:
                 page_content = page.content()
             except Exception as e:
                 log.error(f"Error getting page content: {e}")
                 page_content = ""
+            captured = capture.collect() if capture is not None else None
 
+            cookies = page.context.cookies()
+            request_headers = first_response.request.all_headers()
             response = Response(
                 url=page.url,
                 text=page_content,
@@ -240,20 +375,60 @@ class CamoufoxEngine:
                 status=final_response.status,
                 reason=status_text,
                 encoding=encoding,
-                cookies={cookie['name']: cookie['value'] for cookie in page.context.cookies()},
+                cookies={cookie['name']: cookie['value'] for cookie in cookies},
                 headers=first_response.all_headers(),
-                request_headers=first_response.request.all_headers(),
+                request_headers=request_headers,
                 history=history,
+                captured=captured,
+                page_results=page_results,
                 **self.adaptor_arguments
             )
-            page.close()
-            context.close()
+            if self.storage_state_cache is not None and not reused_state and not page_action_failed and final_response.status < 400:
+                save_page_state(self.storage_state_cache, self.storage_state_label, page)
+            if self.handoff:
+                refresher = self._refresh_session_handle_in_thread
+                response.session_handle = SessionHandle.from_browser(cookies, request_headers, api_headers, refresher=partial(refresher, url))
+        finally:
+            try:
+                page.close()
+            except Exception as e:
+                log.debug(f"Error closing the page: {e}")
 
         return response
 
-    async def async_fetch(self, url: str) -> Response:
-        """Opens up the browser and do your request based on your chosen options.
+    def _fetch_with_browser(self, browser, url: str) -> Response:
+        """Do your request in a fresh context of an already launched browser then close that context.
+
+        :param browser: A launched Camoufox browser
+        :param url: Target url.
+        :return: A `Response` object that is the same as `Adaptor` object except it has these added attributes: `status`, `reason`, `cookies`, `headers`, and `request_headers`
+        """
+        saved_state = self.storage_state_cache.load(self.storage_state_label) if self.storage_state_cache is not None else None
+        context = self._new_context(browser, saved_state)
+        try:
+            return self._fetch_with_context(context, url, restored=saved_state is not None)
+        finally:
+            try:
+                context.close()
+            except Exception as e:
+                # The browser itself most likely crashed or got closed, the caller will deal with that
+                log.debug(f"Error closing the browser context: {e}")
+
+    async def _async_new_context(self, browser, saved_state: Optional[Dict] = None):
+        """Async version of `_new_context`"""
+        if saved_state is None:
+            return await browser.new_context()
+
+        context = await browser.new_context(storage_state=saved_state['storage_state'])
+        session_storage_script = StorageStateCache.session_storage_script(saved_state)
+        if session_storage_script:
+            await context.add_init_script(script=session_storage_script)
+        return context
+
+    async def _async_fetch_with_context(self, context, url: str, restored: bool = False) -> Response:
+        """Async version of `_fetch_with_context`
 
+        :param context: A browser context created with `_async_new_context`
         :param url: Target url.
         :return: A `Response` object that is the same as `Adaptor` object except it has these added attributes: `status`, `reason`, `cookies`, `headers`, and `request_headers`
         """
@@ -265,12 +440,17 @@ class CamoufoxEngine:
             if finished_response.request.resource_type == "document" and finished_response.request.is_navigation_request():
                 final_response = finished_response
 
-        async with AsyncCamoufox(**self._get_camoufox_options()) as browser:
-            context = await browser.new_context()
-            page = await context.new_page()
+        page = await context.new_page()
+        try:
             page.set_default_navigation_timeout(self.timeout)
             page.set_default_timeout(self.timeout)
             page.on("response", handle_response)
+            capture = NetworkCapture(self.capture_rules) if self.capture_rules else None
+            if capture is not None:
+                page.on("response", capture.handle_response)
+            api_headers = {}
+            if self.handoff_api_pattern is not None:
+                page.on("request", self._api_headers_catcher(api_headers))
 
             if self.disable_resources:
                 await page.route("**/*", async_intercept_route)
@@ -284,10 +464,15 @@ class CamoufoxEngine:
             if self.network_idle:
                 await page.wait_for_load_state('networkidle')
 
-            if self.page_action is not None:
+            # A valid restored state means the page is already warmed up
+            reused_state = restored and await async_is_restored_state_valid(self.storage_state_probe, page)
+            # A failed warm-up isn't saved as the state to start the next requests with
+            page_action_failed = False
+            if self.page_action is not None and not reused_state:
                 try:
                     page = await self.page_action(page)
                 except Exception as e:
+                    page_action_failed = True
                     log.error(f"Error executing async page_action: {e}")
 
             if self.wait_selector and type(self.wait_selector) is str:
@@ -313,13 +498,23 @@ class CamoufoxEngine:
             # PlayWright API sometimes give empty status text for some reason!
             status_text = final_response.status_text or StatusText.get(final_response.status)
 
+            page_results = None
+            if self.page_requests:
+                try:
+                    page_results = await async_fetch_in_page(page, self.page_requests, concurrency=self.page_requests_concurrency, timeout=self.timeout)
+                except Exception as e:
+                    log.error(f"Error doing the page requests: {e}")
+
             history = await self._async_process_response_history(first_response)
             try:
                 page_content = await page.content()
             except Exception as e:
                 log.error(f"Error getting page content in async: {e}")
                 page_content = ""
+            captured = await capture.async_collect() if capture is not None else None
 
+            cookies = await page.context.cookies()
+            request_headers = await first_response.request.all_headers()
             response = Response(
                 url=page.url,
                 text=page_content,
@@ -327,13 +522,67 @@ class CamoufoxEngine:
                 status=final_response.status,
                 reason=status_text,
                 encoding=encoding,
-                cookies={cookie['name']: cookie['value'] for cookie in await page.context.cookies()},
+                cookies={cookie['name']: cookie['value'] for cookie in cookies},
                 headers=await first_response.all_headers(),
-                request_headers=await first_response.request.all_headers(),
+                request_headers=request_headers,
                 history=history,
+                captured=captured,
+                page_results=page_results,
                 **self.adaptor_arguments
             )
-            await page.close()
-            await context.close()
+            if self.storage_state_cache is not None and not reused_state and not page_action_failed and final_response.status < 400:
+                await async_save_page_state(self.storage_state_cache, self.storage_state_label, page)
+            if self.handoff:
+                refresher = self._refresh_session_handle
+                response.session_handle = SessionHandle.from_browser(cookies, request_headers, api_headers, refresher=partial(refresher, url))
+        finally:
+            try:
+                await page.close()
+            except Exception as e:
+                log.debug(f"Error closing the page: {e}")
 
         return response
+
+    async def _async_fetch_with_browser(self, browser, url: str) -> Response:
+        """Async version of `_fetch_with_browser`
+
+        :param browser: A launched Camoufox browser
+        :param url: Target url.
+        :return: A `Response` object that is the same as `Adaptor` object except it has these added attributes: `status`, `reason`, `cookies`, `headers`, and `request_headers`
+        """
+        saved_state = self.storage_state_cache.load(self.storage_state_label) if self.storage_state_cache is not None else None
+        context = await self._async_new_context(browser, saved_state)
+        try:
+            return await self._async_fetch_with_context(context, url, restored=saved_state is not None)
+        finally:
+            try:
+                await context.close()
+            except Exception as e:
+                # The browser itself most likely crashed or got closed, the caller will deal with that
+                log.debug(f"Error closing the browser context: {e}")
+
+    def fetch(self, url: str) -> Response:
+        """Opens up the browser and do your request based on your chosen options.
+
+        :param url: Target url.
+        :return: A `Response` object that is the same as `Adaptor` object except it has these added attributes: `status`, `reason`, `cookies`, `headers`, and `request_headers`
+        """
+        with self._playwright_manager() as playwright:
+            browser = self._launch_browser(playwright)
+            try:
+                return self._fetch_with_browser(browser, url)
+            finally:
+                browser.close()
+
+    async def async_fetch(self, url: str) -> Response:
+        """Opens up the browser and do your request based on your chosen options.
+
+        :param url: Target url.
+        :return: A `Response` object that is the same as `Adaptor` object except it has these added attributes: `status`, `reason`, `cookies`, `headers`, and `request_headers`
+        """
+        async with self._async_playwright_manager() as playwright:
+            browser = await self._async_launch_browser(playwright)
+            try:
+                return await self._async_fetch_with_browser(browser, url)
+            finally:
+                await browser.close()
@@ -0,0 +1,178 @@
+"""
+Continuing a browser session with plain HTTP requests, the browser only gets used to get through protections then `httpx` does the rest
+"""
+import asyncio
+import re
+import time
+
+import httpx
+from httpx._models import Response as httpxResponse
+
+from scrapling.core._types import (Any, Awaitable, Callable, Dict, Iterable,
+                                   List, Optional, Pattern, Union)
+from scrapling.core.utils import log
+from scrapling.engines.static import AsyncFetcherSession
+
+# Headers that belong to a specific request or get set by httpx itself so they are never carried over from the browser
+_NOT_CARRIED_HEADERS = frozenset({
+    'cookie', 'host', 'content-length', 'content-type', 'referer', 'origin', 'connection', 'transfer-encoding'
+})
+# The headers of the page's document request that should be kept for the requests done after it
+_DOCUMENT_HEADERS = ('user-agent', 'accept-language')
+
+
+class SessionHandle:
+    """Everything needed to continue a browser session with plain HTTP requests: its cookies, its user agent, and the headers it sent.
+
+    You get it from the `session_handle` attribute of the response of a `StealthyFetcher` fetch done with `handoff` enabled.
+
+    >>> page = await StealthyFetcher.async_fetch('https://example.com', handoff=True)
+    >>> async with page.session_handle.async_session() as session:
+    ...     api_response = await session.get('https://example.com/api/items')
+    """
+
+    def __init__(self, cookies: List[Dict], headers: Dict[str, str], refresher: Optional[Callable[[], Awaitable['SessionHandle']]] = None):
+        """
+        :param cookies: The browser context's cookies as returned by playwright, with their `domain`, `path`, and `expires` keys.
+        :param headers: The headers to send with every request, the user agent must be one of them.
+        :param refresher: An async function that does the browser part again and returns a new `SessionHandle`.
+        """
+        self.cookies = cookies
+        self.headers = headers
+        self.refresher = refresher
+        self.created_at = time.time()
+        self.refreshes_count = 0
+
+    @classmethod
+    def from_browser(cls, cookies: List[Dict], document_headers: Dict[str, str], api_headers: Optional[Dict[str, str]] = None, **kwargs: Any) -> 'SessionHandle':
+        """Build a handle from what was captured in a browser page
+
+        :param cookies: The browser context's cookies as returned by playwright.
+        :param document_headers: The headers of the page's document request.
+        :param api_headers: The headers of the page's matching XHR/fetch requests, they take priority over the document's.
+        """
+        headers = {key.lower(): value for key, value in document_headers.items() if key.lower() in _DOCUMENT_HEADERS}
+        for key, value in (api_headers or {}).items():
+            key = key.lower()
+            if key not in _NOT_CARRIED_HEADERS and not key.startswith(':'):
+                headers[key] = value
+
+        return cls(cookies, headers, **kwargs)
+
+    @property
+    def user_agent(self) -> Optional[str]:
+        return self.headers.get('user-agent')
+
+    @property
+    def expires_at(self) -> Optional[float]:
+        """The timestamp of the first cookie to expire or `None` if all cookies last for the whole session"""
+        expiries = [cookie['expires'] for cookie in self.cookies if (cookie.get('expires') or -1) > 0]
+        return min(expiries) if expiries else None
+
+    def is_expired(self, margin: float = 0) -> bool:
+        """Check if any of the cookies expired or will expire in the next `margin` seconds"""
+        expires_at = self.expires_at
+        return expires_at is not None and time.time() + margin >= expires_at
+
+    def httpx_cookies(self) -> httpx.Cookies:
+        """The cookies in a `httpx.Cookies` jar with their domains and paths so they are only sent where the browser would send them"""
+        jar = httpx.Cookies()
+        for cookie in self.cookies:
+            jar.set(cookie['name'], cookie['value'], domain=cookie.get('domain', ''), path=cookie.get('path') or '/')
+        return jar
+
+    def update(self, other: 'SessionHandle') -> None:
+        """Take the cookies and headers of a newer handle of the same session"""
+        self.cookies, self.headers = other.cookies, other.headers
+        self.created_at = other.created_at
+        self.refreshes_count += 1
+
+    async def refresh(self) -> 'SessionHandle':
+        """Do the browser part again and take its new cookies and headers"""
+        if self.refresher is None:
+            raise RuntimeError('This session handle has no way to be refreshed')
+
+        log.info('Refreshing the session handle through the browser')
+        self.update(await self.refresher())
+        return self
+
+    def async_session(self, refresh_on: Iterable[int] = (403,), expiry_margin: float = 30, **kwargs: Any) -> 'AsyncHandoffSession':
+        """Create an `AsyncFetcherSession` that continues this browser session, check `AsyncHandoffSession` for the arguments"""
+        return AsyncHandoffSession(self, refresh_on=refresh_on, expiry_margin=expiry_margin, **kwargs)
+
+
+class AsyncHandoffSession(AsyncFetcherSession):
+    """An `AsyncFetcherSession` that sends the cookies and headers of a browser session and refreshes them through the browser when needed.
+
+    The handle gets refreshed before a request if any of its cookies expired, or after a request that got one of the `refresh_on`
+    status codes then that request gets retried once with the new cookies. Concurrent requests that need a refresh share the same one.
+    """
+
+    def __init__(self, handle: SessionHandle, refresh_on: Iterable[int] = (403,), expiry_margin: float = 30, stealthy_headers: bool = False, **kwargs: Any):
+        """
+        :param handle: The `SessionHandle` of the browser session to continue.
+        :param refresh_on: The status codes that mean the session isn't valid anymore. The default is 403 only.
+        :param expiry_margin: Refresh the handle this number of seconds before its cookies expire. The default is 30 seconds.
+        :param stealthy_headers: Disabled by default since the generated headers would contradict the browser's user agent.
+        :param kwargs: The rest of `AsyncFetcherSession` arguments.
+        """
+        self.__own_headers = dict(kwargs.get('headers') or {})
+        kwargs['cookies'] = handle.httpx_cookies()
+        kwargs['headers'] = self.__handle_headers(handle.headers, self.__own_headers)
+        super().__init__(stealthy_headers=stealthy_headers, **kwargs)
+        self.handle = handle
+        self.refresh_on = frozenset(refresh_on)
+        self.expiry_margin = expiry_margin
+        self.__handle_version = handle.refreshes_count
+        self.__refresh_lock: Optional[asyncio.Lock] = None
+
+    async def __refresh(self, seen_version: int) -> None:
+        """Refresh the handle unless another request already did since `seen_version` then load its cookies and headers"""
+        if self.__refresh_lock is None:
+            self.__refresh_lock = asyncio.Lock()
+
+        async with self.__refresh_lock:
+            if self.handle.refreshes_count == seen_version:
+                await self.handle.refresh()
+            if self.__handle_version != self.handle.refreshes_count:
+                self.__handle_version = self.handle.refreshes_count
+                # Updated instead of replaced so cookies set by the responses since then are kept
+                self.client.cookies.update(self.handle.httpx_cookies())
+                # Rebuilt instead of updated so headers the new handle doesn't have anymore aren't sent with it
+                self.headers = self.__handle_headers(self.handle.headers, self.__own_headers)
+
+    @staticmethod
+    def __handle_headers(handle_headers: Dict[str, str], headers: Dict[str, str]) -> Dict[str, str]:
+        """Merge the headers of a handle with other headers that take priority over them"""
+        merged = httpx.Headers(handle_headers)
+        merged.update(headers)
+        return dict(merged)
+
+    async def _send(self, method: str, url: str, **kwargs: Any) -> httpxResponse:
+        # A handle that expires again right after its refresh is used as it is instead of refreshing it with every request
+        recently_refreshed = time.time() - self.handle.created_at < self.expiry_margin
+        if self.handle.refresher is not None and not recently_refreshed and self.handle.is_expired(self.expiry_margin):
+            await self.__refresh(self.handle.refreshes_count)
+
+        seen_version, seen_headers = self.handle.refreshes_count, self.handle.headers
+        response = await super()._send(method, url, **kwargs)
+        if response.status_code in self.refresh_on and self.handle.refresher is not None:
+            log.warning(f'Got status {response.status_code} from {url}, retrying it with a refreshed session')
+            await response.aclose()
+            await self.__refresh(seen_version)
+            # The request's headers were built with the old handle so the ones that came from it are dropped before adding the new ones
+            headers, own_headers = httpx.Headers(kwargs.get('headers') or {}), httpx.Headers(self.__own_headers)
+            for key, value in seen_headers.items():
+                if key not in own_headers and headers.get(key) == value:
+                    del headers[key]
+            kwargs['headers'] = self.__handle_headers(self.handle.headers, dict(headers))
+            response = await super()._send(method, url, **kwargs)
+
+        return response
+
+
+def compile_api_pattern(pattern: Union[bool, str, Pattern, None]) -> Optional[Pattern]:
+    """Return the compiled pattern of API requests URLs whose headers should be captured or `None` to capture none"""
+    if pattern is None or isinstance(pattern, bool):
+        return None
+    return re.compile(pattern) if isinstance(pattern, str) else pattern
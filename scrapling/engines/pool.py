@@ -0,0 +1,652 @@
+"""
+Long-lived pools of browsers so many requests can be done without launching a new browser for each one of them
+"""
+import asyncio
+import os
+import time
+from collections import deque
+
+from scrapling.core._types import Any, Dict, Iterable, Optional, Set, Tuple
+from scrapling.core.utils import log
+from scrapling.engines.toolbelt import Response, check_type_validity
+
+try:
+    import psutil
+except ImportError:
+    ALLOW_PSUTIL = False
+else:
+    ALLOW_PSUTIL = True
+
+
+def _proc_parents() -> Dict[int, int]:
+    """The parent of each running process from `/proc` for when psutil isn't installed"""
+    parents = {}
+    for entry in os.listdir('/proc'):
+        if entry.isdigit():
+            try:
+                with open(f'/proc/{entry}/stat') as stat_file:
+                    # The process name is between parentheses and can contain spaces
+                    parents[int(entry)] = int(stat_file.read().rsplit(')', 1)[1].split()[1])
+            except (OSError, IndexError, ValueError):
+                continue
+    return parents
+
+
+def _proc_descendants(root_pids: Iterable[int]) -> Set[int]:
+    parents = _proc_parents()
+    descendants, pending = set(), list(root_pids)
+    while pending:
+        parent = pending.pop()
+        for pid, ppid in parents.items():
+            if ppid == parent and pid not in descendants:
+                descendants.add(pid)
+                pending.append(pid)
+    return descendants
+
+
+def can_measure_rss() -> bool:
+    """Whether the memory of processes can be measured on this system, it needs either `psutil` or `/proc`"""
+    return ALLOW_PSUTIL or os.path.isdir('/proc')
+
+
+def child_pids() -> Set[int]:
+    """The IDs of all the processes started by this process like playwright's driver and its browsers"""
+    if ALLOW_PSUTIL:
+        return {child.pid for child in psutil.Process().children(recursive=True)}
+    if os.path.isdir('/proc'):
+        return _proc_descendants([os.getpid()])
+    return set()
+
+
+def new_root_pids(before: Set[int]) -> Tuple[int, ...]:
+    """The IDs of the processes started since `child_pids` returned `before`, without the ones started by them.
+    When one browser got launched in between, they are the processes of that browser."""
+    started = child_pids() - before
+    if ALLOW_PSUTIL:
+        roots = []
+        for pid in started:
+            try:
+                if psutil.Process(pid).ppid() not in started:
+                    roots.append(pid)
+            except psutil.Error:
+                continue
+        return tuple(roots)
+
+    parents = _proc_parents()
+    return tuple(pid for pid in started if parents.get(pid) not in started)
+
+
+def process_tree_rss(root_pids: Iterable[int]) -> Optional[float]:
+    """The total resident memory in megabytes of these processes and all the processes started by them,
+    `None` if it can't be measured on this system"""
+    root_pids = tuple(root_pids)
+    if ALLOW_PSUTIL:
+        processes = []
+        for pid in root_pids:
+            try:
+                process = psutil.Process(pid)
+                processes.append(process)
+                processes.extend(process.children(recursive=True))
+            except psutil.Error:
+                continue
+
+        total = 0
+        for process in processes:
+            try:
+                total += process.memory_info().rss
+            except psutil.Error:
+                continue
+        return total / 1048576
+
+    if not os.path.isdir('/proc'):
+        return None
+    total, page_size = 0, os.sysconf('SC_PAGE_SIZE')
+    for pid in set(root_pids) | _proc_descendants(root_pids):
+        try:
+            with open(f'/proc/{pid}/statm') as statm_file:
+                total += int(statm_file.read().split()[1]) * page_size
+        except (OSError, IndexError, ValueError):
+            continue
+    return total / 1048576
+
+
+class RecyclePolicy:
+    """When a long-lived browser context gets closed and replaced with a fresh one, everything is disabled by default.
+
+    >>> RecyclePolicy(max_requests=200, max_age=600, max_rss=4096, recycle_on=(403, 429))
+    """
+
+    def __init__(
+            self, max_requests: Optional[int] = None, max_age: Optional[float] = None, max_rss: Optional[float] = None,
+            recycle_on: Iterable[int] = (), rss_check_interval: float = 10
+    ):
+        """
+        :param max_requests: The number of requests a context serves before it gets replaced.
+        :param max_age: The number of seconds a context is used for before it gets replaced.
+        :param max_rss: The memory in megabytes that a browser's processes can use before the whole browser gets replaced with a new one,
+            since closing contexts barely lowers the memory of the browser. Its contexts are replaced with contexts of the new browser as they finish their requests.
+            It needs either `psutil` installed or a system with `/proc` like Linux, otherwise it's ignored.
+        :param recycle_on: Status codes that mean the context got flagged like 403 and 429, the context that got them is replaced right away.
+        :param rss_check_interval: The minimum number of seconds between two memory checks of the same browser since each check goes through its processes. The default is 10 seconds.
+        """
+        self.max_requests = check_type_validity(max_requests, [int, type(None)], None, param_name='max_requests')
+        self.max_age = check_type_validity(max_age, [int, float, type(None)], None, param_name='max_age')
+        self.max_rss = check_type_validity(max_rss, [int, float, type(None)], None, param_name='max_rss')
+        self.recycle_on = frozenset(recycle_on or ())
+        self.rss_check_interval = rss_check_interval
+        if self.max_rss is not None and not can_measure_rss():
+            log.error('[Ignored] Argument "max_rss" needs `psutil` installed on this system')
+            self.max_rss = None
+
+    def recycle_reason(self, slot: '_ContextSlot', status: Optional[int] = None) -> Optional[str]:
+        """Return why this context should be replaced or `None` if it's still good"""
+        if status is not None and status in self.recycle_on:
+            return f'got status {status}'
+        if self.max_requests and slot.requests_count >= self.max_requests:
+            return f'served {slot.requests_count} requests'
+        if self.max_age and time.monotonic() - slot.created_at >= self.max_age:
+            return f'is older than {self.max_age} seconds'
+        return None
+
+    def browser_recycle_reason(self, slot: '_BrowserSlot') -> Optional[str]:
+        """Return why this browser should be replaced or `None` if it's still good, its memory is measured once every `rss_check_interval` seconds"""
+        if not self.max_rss or not slot.pids or time.monotonic() - slot.rss_checked_at < self.rss_check_interval:
+            return None
+        slot.rss_checked_at = time.monotonic()
+        rss = process_tree_rss(slot.pids)
+        if rss is not None and rss >= self.max_rss:
+            return f'its processes use {rss:.0f}MB of memory'
+        return None
+
+
+class _BrowserSlot:
+    """A launched browser, the number of requests it served so far, and the number of pages open in it right now"""
+    __slots__ = ('browser', 'requests_count', 'open_pages', 'retiring', 'pids', 'contexts_count', 'rss_checked_at')
+
+    def __init__(self, browser: Any, pids: Tuple[int, ...] = ()):
+        self.browser = browser
+        self.requests_count = 0
+        self.open_pages = 0
+        # A retiring browser doesn't take new pages and gets replaced once its open pages are done
+        self.retiring = False
+        # The IDs of the browser's own processes, only known if they were needed to measure its memory
+        self.pids = pids
+        self.contexts_count = 0
+        self.rss_checked_at = time.monotonic()
+
+    def is_alive(self) -> bool:
+        try:
+            return self.browser.is_connected()
+        except Exception:
+            return False
+
+
+class BrowserPool:
+    """Launches `pool_size` browsers once through the given engine then uses them in round-robin for all requests done with `fetch`.
+
+    Each request gets its own fresh browser context that gets closed after the request, so requests don't share cookies/storage.
+    A browser gets closed and replaced with a new one after serving `max_requests` requests or if it crashed/disconnected.
+
+    >>> with StealthyFetcher.session(pool_size=2, max_requests=100, headless=True) as session:
+    ...     page = session.fetch('https://example.com')
+    """
+
+    def __init__(self, engine: Any, pool_size: int = 1, max_requests: Optional[int] = None):
+        """
+        :param engine: An engine instance that implements `_playwright_manager`, `_launch_browser`, and `_fetch_with_browser` like `CamoufoxEngine`.
+        :param pool_size: The number of browsers to launch and keep open. The default is 1 browser.
+        :param max_requests: The number of requests a browser serves before it gets replaced by a new one. The default is `None` which means never.
+        """
+        self.engine = engine
+        self.pool_size = max(check_type_validity(pool_size, [int], 1, param_name='pool_size'), 1)
+        self.max_requests = check_type_validity(max_requests, [int, type(None)], None, param_name='max_requests')
+        self._playwright = None
+        self._slots = deque()
+
+    def start(self) -> 'BrowserPool':
+        """Start playwright and launch all the browsers of the pool"""
+        if self._playwright is None:
+            self._playwright = self.engine._playwright_manager().start()
+            for _ in range(self.pool_size):
+                self._slots.append(self.__launch())
+        return self
+
+    def __launch(self) -> _BrowserSlot:
+        log.debug('Launching a new browser for the pool')
+        return _BrowserSlot(self.engine._launch_browser(self._playwright))
+
+    @staticmethod
+    def __close_browser(slot: _BrowserSlot) -> None:
+        try:
+            slot.browser.close()
+        except Exception as e:
+            log.debug(f"Error closing pooled browser: {e}")
+
+    def __recycle(self, slot: _BrowserSlot) -> _BrowserSlot:
+        """Close the browser of this slot and return a new slot with a freshly launched browser"""
+        self.__close_browser(slot)
+        return self.__launch()
+
+    def fetch(self, url: str) -> Response:
+        """Do your request with one of the pool's browsers based on the options the pool was created with.
+
+        :param url: Target url.
+        :return: A `Response` object that is the same as `Adaptor` object except it has these added attributes: `status`, `reason`, `cookies`, `headers`, and `request_headers`
+        """
+        if self._playwright is None:
+            raise RuntimeError('The browser pool is not started, use it as a context manager or call `start()` first')
+
+        slot = self._slots.popleft()
+        try:
+            if not slot.is_alive():
+                log.warning('A pooled browser was found disconnected, replacing it with a new one')
+                slot = self.__recycle(slot)
+
+            slot.requests_count += 1
+            return self.engine._fetch_with_browser(slot.browser, url)
+        finally:
+            if not slot.is_alive() or (self.max_requests and slot.requests_count >= self.max_requests):
+                try:
+                    slot = self.__recycle(slot)
+                except Exception as e:
+                    # The dead slot goes back anyway and another launch will be attempted with the next request
+                    log.error(f"Error replacing a pooled browser: {e}")
+            self._slots.append(slot)
+
+    def close(self) -> None:
+        """Close all the browsers of the pool then stop playwright"""
+        while self._slots:
+            self.__close_browser(self._slots.popleft())
+
+        if self._playwright is not None:
+            self._playwright.stop()
+            self._playwright = None
+
+    def __enter__(self) -> 'BrowserPool':
+        return self.start()
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+
+class AsyncBrowserPool:
+    """Async version of `BrowserPool`, each browser serves up to `tabs_per_browser` requests concurrently in their own pages
+    and the rest of the requests wait in a queue for a free page.
+
+    Browsers that need to be replaced stop taking new pages then get replaced in the background once their open pages are done,
+    so no request waits for a new launch.
+
+    >>> async with StealthyFetcher.async_session(pool_size=2, tabs_per_browser=20, max_requests=1000) as session:
+    ...     pages = await asyncio.gather(*[session.fetch(url) for url in urls])
+    """
+
+    def __init__(self, engine: Any, pool_size: int = 1, max_requests: Optional[int] = None, tabs_per_browser: int = 1):
+        """
+        :param engine: An engine instance that implements `_async_playwright_manager`, `_async_launch_browser`, and `_async_fetch_with_browser` like `CamoufoxEngine`.
+        :param pool_size: The number of browsers to launch and keep open. The default is 1 browser.
+        :param max_requests: The number of requests a browser serves before it gets replaced by a new one. The default is `None` which means never.
+        :param tabs_per_browser: The number of pages each browser has open at the same time, each page in its own context. The default is 1 page.
+        """
+        self.engine = engine
+        self.pool_size = max(check_type_validity(pool_size, [int], 1, param_name='pool_size'), 1)
+        self.max_requests = check_type_validity(max_requests, [int, type(None)], None, param_name='max_requests')
+        self.tabs_per_browser = max(check_type_validity(tabs_per_browser, [int], 1, param_name='tabs_per_browser'), 1)
+        self._playwright = None
+        # Holds a browser slot once for each of its free pages
+        self._free_pages: Optional[asyncio.Queue] = None
+        self._browsers = set()
+        self._background_tasks = set()
+
+    async def start(self) -> 'AsyncBrowserPool':
+        """Start playwright and launch all the browsers of the pool concurrently"""
+        if self._playwright is None:
+            self._playwright = await self.engine._async_playwright_manager().start()
+            self._free_pages = asyncio.Queue()
+            for slot in await asyncio.gather(*[self.__launch() for _ in range(self.pool_size)]):
+                self.__add(slot)
+        return self
+
+    async def __launch(self) -> _BrowserSlot:
+        log.debug('Launching a new browser for the pool')
+        return _BrowserSlot(await self.engine._async_launch_browser(self._playwright))
+
+    def __add(self, slot: _BrowserSlot) -> None:
+        self._browsers.add(slot)
+        for _ in range(self.tabs_per_browser):
+            self._free_pages.put_nowait(slot)
+
+    @staticmethod
+    async def __close_browser(slot: _BrowserSlot) -> None:
+        try:
+            await slot.browser.close()
+        except Exception as e:
+            log.debug(f"Error closing pooled browser: {e}")
+
+    def __should_retire(self, slot: _BrowserSlot) -> bool:
+        return slot.retiring or not slot.is_alive() or bool(self.max_requests and slot.requests_count >= self.max_requests)
+
+    def __retire(self, slot: _BrowserSlot) -> None:
+        """Stop giving pages of this browser then replace it in the background once its last open page is done"""
+        slot.retiring = True
+        if slot.open_pages == 0 and slot in self._browsers:
+            self._browsers.discard(slot)
+            task = asyncio.ensure_future(self.__replace_in_background(slot))
+            self._background_tasks.add(task)
+            task.add_done_callback(self._background_tasks.discard)
+
+    async def __replace_in_background(self, slot: _BrowserSlot) -> None:
+        await self.__close_browser(slot)
+        try:
+            slot = await self.__launch()
+        except Exception as e:
+            # The dead slot goes back anyway and another launch will be attempted with the next request
+            log.error(f"Error replacing a pooled browser: {e}")
+            slot.retiring = False
+        self.__add(slot)
+
+    async def __acquire_page(self) -> _BrowserSlot:
+        while True:
+            slot = await self._free_pages.get()
+            if slot not in self._browsers:
+                # A leftover free page of a browser that was replaced
+                continue
+            if self.__should_retire(slot):
+                if not slot.retiring and not slot.is_alive():
+                    log.warning('A pooled browser was found disconnected, replacing it with a new one')
+                self.__retire(slot)
+                continue
+            return slot
+
+    async def fetch(self, url: str) -> Response:
+        """Do your request in a new page of the first browser of the pool with a free page based on the options the pool was created with.
+
+        :param url: Target url.
+        :return: A `Response` object that is the same as `Adaptor` object except it has these added attributes: `status`, `reason`, `cookies`, `headers`, and `request_headers`
+        """
+        if self._playwright is None:
+            raise RuntimeError('The browser pool is not started, use it as an async context manager or call `start()` first')
+
+        slot = await self.__acquire_page()
+        slot.requests_count += 1
+        slot.open_pages += 1
+        try:
+            return await self.engine._async_fetch_with_browser(slot.browser, url)
+        finally:
+            slot.open_pages -= 1
+            if self.__should_retire(slot):
+                self.__retire(slot)
+            else:
+                self._free_pages.put_nowait(slot)
+
+    async def close(self) -> None:
+        """Wait for browsers being replaced, close all the browsers of the pool, then stop playwright"""
+        if self._background_tasks:
+            await asyncio.gather(*self._background_tasks, return_exceptions=True)
+
+        while self._browsers:
+            await self.__close_browser(self._browsers.pop())
+        self._free_pages = None
+
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    async def __aenter__(self) -> 'AsyncBrowserPool':
+        return await self.start()
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
+
+
+class _ContextSlot:
+    """A long-lived browser context, the browser it belongs to, and the number of requests it served since it was put to use.
+    `restored` is set when the context was created with a saved storage state that its first request should check."""
+    __slots__ = ('context', 'browser', 'created_at', 'requests_count', 'restored')
+
+    def __init__(self, context: Any, browser: _BrowserSlot, restored: bool = False):
+        self.context = context
+        self.browser = browser
+        self.created_at = time.monotonic()
+        self.requests_count = 0
+        self.restored = restored
+
+
+class AsyncContextPool:
+    """Keeps `pool_size` browser contexts open in a single browser and reuses them for all requests, so cookies and storage
+    carry over between requests like a real user's session. Up to `pool_size` requests run concurrently, one per context.
+
+    Contexts get replaced based on the `RecyclePolicy`. Replacements are taken from `warm_contexts` spare contexts created
+    ahead of time, then new spares are created in the background, so a request never waits for a new context.
+    A browser that uses more memory than the policy allows gets replaced with a new one the same way, one context at a time.
+    If the engine has a `storage_state_cache`, new contexts start with its saved state and their first request checks it.
+
+    >>> policy = RecyclePolicy(max_requests=100, max_age=900, recycle_on=(403, 429))
+    >>> async with StealthyFetcher.async_persistent_session(pool_size=4, policy=policy) as session:
+    ...     pages = await asyncio.gather(*[session.fetch(url) for url in urls])
+    """
+
+    def __init__(self, engine: Any, pool_size: int = 1, policy: Optional[RecyclePolicy] = None, warm_contexts: int = 1):
+        """
+        :param engine: An engine instance that implements `_async_playwright_manager`, `_async_launch_browser`, `_async_new_context`,
+            and `_async_fetch_with_context` like `CamoufoxEngine`.
+        :param pool_size: The number of contexts used at the same time. The default is 1 context.
+        :param policy: A `RecyclePolicy` of when contexts and the browser get replaced. The default is never unless the browser crashed.
+        :param warm_contexts: The number of spare contexts kept ready to replace recycled ones. The default is 1 context.
+        """
+        self.engine = engine
+        self.pool_size = max(check_type_validity(pool_size, [int], 1, param_name='pool_size'), 1)
+        self.policy = policy or RecyclePolicy()
+        self.warm_contexts = max(check_type_validity(warm_contexts, [int], 1, param_name='warm_contexts'), 0)
+        self.recycles_count = 0
+        self._playwright = None
+        # The browser new contexts are created in, and all the browsers that are still open including the retiring ones
+        self._browser: Optional[_BrowserSlot] = None
+        self._browsers = set()
+        self._browser_lock: Optional[asyncio.Lock] = None
+        self._contexts: Optional[asyncio.Queue] = None
+        self._warm = deque()
+        self._background_tasks = set()
+
+    async def start(self) -> 'AsyncContextPool':
+        """Start playwright, launch the browser, and create all the contexts concurrently"""
+        if self._playwright is None:
+            self._playwright = await self.engine._async_playwright_manager().start()
+            self._browser = await self.__launch()
+            self._browser_lock = asyncio.Lock()
+            self._contexts = asyncio.Queue()
+            slots = await asyncio.gather(*[self.__new_slot() for _ in range(self.pool_size + self.warm_contexts)])
+            for slot in slots[:self.pool_size]:
+                self._contexts.put_nowait(slot)
+            self._warm.extend(slots[self.pool_size:])
+        return self
+
+    async def __launch(self) -> _BrowserSlot:
+        """Launch a browser and find its processes if its memory will be measured, launches are never concurrent so the new processes are the browser's"""
+        if not self.policy.max_rss:
+            slot = _BrowserSlot(await self.engine._async_launch_browser(self._playwright))
+        else:
+            before = child_pids()
+            browser = await self.engine._async_launch_browser(self._playwright)
+            slot = _BrowserSlot(browser, new_root_pids(before))
+        self._browsers.add(slot)
+        return slot
+
+    def __is_usable(self, browser: _BrowserSlot) -> bool:
+        return not browser.retiring and browser.is_alive()
+
+    async def __new_slot(self) -> _ContextSlot:
+        if not self.__is_usable(self._browser):
+            async with self._browser_lock:
+                # Another request could've relaunched it while this one was waiting
+                if not self.__is_usable(self._browser):
+                    if not self._browser.retiring:
+                        log.warning('The browser of the pool was found disconnected, launching a new one')
+                        self.__retire_browser(self._browser)
+                    self._browser = await self.__launch()
+
+        browser = self._browser
+        browser.contexts_count += 1
+        try:
+            storage_state_cache = self.engine.storage_state_cache
+            saved_state = storage_state_cache.load(self.engine.storage_state_label) if storage_state_cache is not None else None
+            context = await self.engine._async_new_context(browser.browser, saved_state)
+            return _ContextSlot(context, browser, restored=saved_state is not None)
+        except Exception:
+            self.__release(browser)
+            raise
+
+    def __retire_browser(self, browser: _BrowserSlot) -> None:
+        """Stop creating contexts in this browser, its contexts get replaced as they come back then it's closed after the last one"""
+        browser.retiring = True
+        stale = [slot for slot in self._warm if slot.browser is browser]
+        self._warm = deque(slot for slot in self._warm if slot.browser is not browser)
+        for slot in stale:
+            self.__in_background(self.__close_context(slot))
+            self.__in_background(self.__add_warm())
+
+        # The idle contexts of the browser are replaced right away and the busy ones once their requests are done
+        idle = []
+        while not self._contexts.empty():
+            idle.append(self._contexts.get_nowait())
+        for slot in idle:
+            if slot.browser is browser:
+                self.__recycle(slot, 'belongs to a browser being replaced')
+            else:
+                self._contexts.put_nowait(slot)
+        self.__release(browser, closed_context=False)
+
+    def __release(self, browser: _BrowserSlot, closed_context: bool = True) -> None:
+        """Count a closed context of this browser and close the browser if it's retiring and that was its last context"""
+        if closed_context:
+            browser.contexts_count -= 1
+        if browser.retiring and browser.contexts_count <= 0 and browser in self._browsers:
+            self._browsers.discard(browser)
+            self.__in_background(self.__close_browser(browser))
+
+    @staticmethod
+    async def __close_browser(browser: _BrowserSlot) -> None:
+        try:
+            await browser.browser.close()
+        except Exception as e:
+            log.debug(f"Error closing the pool's browser: {e}")
+
+    async def __close_context(self, slot: _ContextSlot) -> None:
+        try:
+            await slot.context.close()
+        except Exception as e:
+            log.debug(f"Error closing pooled context: {e}")
+        self.__release(slot.browser)
+
+    def __in_background(self, coroutine: Any) -> None:
+        task = asyncio.ensure_future(coroutine)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    async def __add_warm(self) -> None:
+        try:
+            self._warm.append(await self.__new_slot())
+        except Exception as e:
+            log.error(f"Error creating a warm context: {e}")
+
+    async def __add_replacement(self) -> None:
+        while True:
+            try:
+                self._contexts.put_nowait(await self.__new_slot())
+                return
+            except Exception as e:
+                log.error(f"Error creating a replacement context, retrying: {e}")
+                await asyncio.sleep(1)
+
+    def __recycle(self, slot: _ContextSlot, reason: str) -> None:
+        """Put a warm context in the place of this one, then close it and prepare a new warm context in the background"""
+        log.info(f'Recycling a browser context because it {reason}')
+        self.recycles_count += 1
+        self.__in_background(self.__close_context(slot))
+
+        warm = None
+        while self._warm and warm is None:
+            candidate = self._warm.popleft()
+            if self.__is_usable(candidate.browser):
+                warm = candidate
+            else:
+                # The warm contexts of a browser that died or is being replaced
+                self.__in_background(self.__close_context(candidate))
+
+        if warm is not None:
+            warm.created_at = time.monotonic()
+            self._contexts.put_nowait(warm)
+            self.__in_background(self.__add_warm())
+        else:
+            # No warm context is ready so the next request waits for this one or another context to be free
+            self.__in_background(self.__add_replacement())
+
+    @staticmethod
+    def __browser_reason(slot: _ContextSlot) -> Optional[str]:
+        if not slot.browser.is_alive():
+            return 'belongs to a disconnected browser'
+        if slot.browser.retiring:
+            return 'belongs to a browser being replaced'
+        return None
+
+    async def fetch(self, url: str) -> Response:
+        """Do your request in a new page of the first free context based on the options the pool was created with.
+
+        :param url: Target url.
+        :return: A `Response` object that is the same as `Adaptor` object except it has these added attributes: `status`, `reason`, `cookies`, `headers`, and `request_headers`
+        """
+        if self._playwright is None:
+            raise RuntimeError('The context pool is not started, use it as an async context manager or call `start()` first')
+
+        while True:
+            slot = await self._contexts.get()
+            reason = self.__browser_reason(slot) or self.policy.recycle_reason(slot)
+            if reason is None:
+                break
+            self.__recycle(slot, reason)
+
+        status = None
+        slot.requests_count += 1
+        # Only the first request checks the restored state, the ones after it continue from where it left the context
+        restored, slot.restored = slot.restored, False
+        try:
+            response = await self.engine._async_fetch_with_context(slot.context, url, restored=restored)
+            status = response.status
+            return response
+        finally:
+            reason = self.__browser_reason(slot)
+            if reason is None:
+                browser_reason = self.policy.browser_recycle_reason(slot.browser)
+                if browser_reason is not None:
+                    log.info(f'Replacing the browser of the pool because {browser_reason}')
+                    self.__retire_browser(slot.browser)
+                    reason = 'belongs to a browser being replaced'
+                else:
+                    reason = self.policy.recycle_reason(slot, status)
+
+            if reason is None:
+                self._contexts.put_nowait(slot)
+            else:
+                self.__recycle(slot, reason)
+
+    async def close(self) -> None:
+        """Stop creating contexts, close the browsers with all their contexts, then stop playwright"""
+        for task in self._background_tasks:
+            task.cancel()
+        if self._background_tasks:
+            await asyncio.gather(*self._background_tasks, return_exceptions=True)
+
+        while self._browsers:
+            await self.__close_browser(self._browsers.pop())
+        self._browser = None
+        self._warm.clear()
+        self._contexts = None
+
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    async def __aenter__(self) -> 'AsyncContextPool':
+        return await self.start()
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
@@ -1,17 +1,25 @@
 import json
 
-from scrapling.core._types import (Callable, Dict, Optional,
+from scrapling.core._types import (Any, Callable, Dict, List, Optional,
                                    SelectorWaitStates, Union)
 from scrapling.core.utils import log, lru_cache
 from scrapling.engines.constants import (DEFAULT_STEALTH_FLAGS,
                                          NSTBROWSER_DEFAULT_QUERY)
-from scrapling.engines.toolbelt import (Response, StatusText,
+from scrapling.engines.toolbelt import (NetworkCapture, Response, StatusText,
+                                        StorageStateCache, async_fetch_in_page,
                                         async_intercept_route,
-                                        check_type_validity, construct_cdp_url,
-                                        construct_proxy_dict,
+                                        async_is_restored_state_valid,
+                                        async_save_page_state,
+                                        check_type_validity,
+                                        compile_capture_rules,
+                                        construct_cdp_url,
+                                        construct_proxy_dict, fetch_in_page,
                                         generate_convincing_referer,
-                                        generate_headers, intercept_route,
-                                        js_bypass_path)
+                                        generate_headers,
+                                        get_storage_state_cache,
+                                        intercept_route,
+                                        is_restored_state_valid,
+                                        js_bypass_path, save_page_state)
 
 
 class PlaywrightEngine:
@@ -36,6 +44,12 @@ class PlaywrightEngine:
             google_search: bool = True,
             extra_headers: Optional[Dict[str, str]] = None,
             proxy: Optional[Union[str, Dict[str, str]]] = None,
+            network_capture: Optional[Any] = None,
+            page_requests: Optional[List[Union[str, Dict]]] = None,
+            page_requests_concurrency: int = 10,
+            storage_state_cache: Optional[Any] = None,
+            storage_state_label: str = 'default',
+            storage_state_probe: Optional[Callable] = None,
             adaptor_arguments: Dict = None
     ):
         """An engine that utilizes PlayWright library, check the `PlayWrightFetcher` class for more documentation.
@@ -62,6 +76,17 @@ class PlaywrightEngine:
         :param extra_headers: A dictionary of extra headers to add to the request. _The referer set by the `google_search` argument takes priority over the referer set here if used together._
         :param proxy: The proxy to be used with requests, it can be a string or a dictionary with the keys 'server', 'username', and 'password' only.
         :param nstbrowser_config: The config you want to send with requests to the NSTBrowser. If left empty, Scrapling defaults to an optimized NSTBrowser's docker browserless config.
+        :param network_capture: Capture the responses of the page's XHR/fetch requests whose URLs match these rules and put them in the `captured` attribute of the response.
+            Takes a regex, a `CaptureRule` for more control, or a list of them. Each captured response has its headers, timing, and body which `json()` parses on demand.
+            Bodies of responses that don't match are never read.
+        :param page_requests: URLs or dictionaries of requests to do from inside the page after it loads, with the browser's TLS fingerprint and cookies.
+            They run in batches of single `evaluate` calls and their results are put in the `page_results` attribute of the response.
+        :param page_requests_concurrency: The number of `page_requests` running at the same time inside the page. The default is 10.
+        :param storage_state_cache: A directory or a `StorageStateCache` to save the cookies, localStorage, and sessionStorage in after a successful request,
+            then the next requests with the same `storage_state_label` start with them restored and skip `page_action` which is treated as the warm-up.
+        :param storage_state_label: The label the state is saved under, like the store or account it was warmed up for. The default is `default`.
+        :param storage_state_probe: A function that takes the `page` with a restored state and returns whether it's still valid, like checking the selected ZIP code.
+            When it returns `False`, `page_action` runs to warm the page up again and the new state replaces the saved one.
         :param adaptor_arguments: The arguments that will be passed in the end while creating the final Adaptor's class.
         """
         self.headless = headless
@@ -75,6 +100,17 @@ class PlaywrightEngine:
         self.google_search = bool(google_search)
         self.extra_headers = extra_headers or {}
         self.proxy = construct_proxy_dict(proxy)
+        self.capture_rules = compile_capture_rules(network_capture)
+        self.page_requests = list(page_requests or [])
+        self.page_requests_concurrency = check_type_validity(page_requests_concurrency, [int], 10, param_name='page_requests_concurrency')
+        self.storage_state_cache = get_storage_state_cache(storage_state_cache)
+        self.storage_state_label = check_type_validity(storage_state_label, [str], 'default', param_name='storage_state_label')
+        self.storage_state_probe = None
+        if storage_state_probe is not None:
+            if callable(storage_state_probe):
+                self.storage_state_probe = storage_state_probe
+            else:
+                log.error('[Ignored] Argument "storage_state_probe" must be callable')
         self.cdp_url = cdp_url
         self.useragent = useragent
         self.timeout = check_type_validity(timeout, [int, float], 30000)
@@ -255,18 +291,64 @@ class PlaywrightEngine:
 
         return history
 
-    def fetch(self, url: str) -> Response:
-        """Opens up the browser and do your request based on your chosen options.
-
-        :param url: Target url.
-        :return: A `Response` object that is the same as `Adaptor` object except it has these added attributes: `status`, `reason`, `cookies`, `headers`, and `request_headers`
-        """
-        from playwright.sync_api import Response as PlaywrightResponse
+    def _playwright_manager(self):
+        """Return the sync playwright context manager that the browsers are launched through"""
         if not self.stealth or self.real_chrome:
             # Because rebrowser_playwright doesn't play well with real browsers
             from playwright.sync_api import sync_playwright
         else:
             from rebrowser_playwright.sync_api import sync_playwright
+        return sync_playwright()
+
+    def _async_playwright_manager(self):
+        """Return the async playwright context manager that the browsers are launched through"""
+        if not self.stealth or self.real_chrome:
+            # Because rebrowser_playwright doesn't play well with real browsers
+            from playwright.async_api import async_playwright
+        else:
+            from rebrowser_playwright.async_api import async_playwright
+        return async_playwright()
+
+    def _launch_browser(self, playwright):
+        """Launch a new browser with the current options, or connect to the CDP URL, on a started playwright instance
+
+        :param playwright: A started sync playwright instance
+        :return: The launched browser
+        """
+        if self.cdp_url:
+            return playwright.chromium.connect_over_cdp(endpoint_url=self._cdp_url_logic())
+        return playwright.chromium.launch(**self.__launch_kwargs())
+
+    async def _async_launch_browser(self, playwright):
+        """Launch a new browser with the current options, or connect to the CDP URL, on a started async playwright instance
+
+        :param playwright: A started async playwright instance
+        :return: The launched browser
+        """
+        if self.cdp_url:
+            return await playwright.chromium.connect_over_cdp(endpoint_url=self._cdp_url_logic())
+        return await playwright.chromium.launch(**self.__launch_kwargs())
+
+    def _new_context(self, browser, saved_state: Optional[Dict] = None):
+        """Create a new context in the browser with the current options and the saved state restored in it"""
+        if saved_state is None:
+            return browser.new_context(**self.__context_kwargs())
+
+        context = browser.new_context(**self.__context_kwargs(), storage_state=saved_state['storage_state'])
+        session_storage_script = StorageStateCache.session_storage_script(saved_state)
+        if session_storage_script:
+            context.add_init_script(script=session_storage_script)
+        return context
+
+    def _fetch_with_context(self, context, url: str, restored: bool = False) -> Response:
+        """Do your request in a new page of an already created browser context then close that page, the context is left open
+        so its cookies and storage are kept for the next requests done with it.
+
+        :param context: A browser context created with `_new_context`
+        :param url: Target url.
+        :return: A `Response` object that is the same as `Adaptor` object except it has these added attributes: `status`, `reason`, `cookies`, `headers`, and `request_headers`
+        """
+        from playwright.sync_api import Response as PlaywrightResponse
 
         final_response = None
         referer = generate_convincing_referer(url) if self.google_search else None
@@ -276,19 +358,14 @@ class PlaywrightEngine:
             if finished_response.request.resource_type == "document" and finished_response.request.is_navigation_request():
                 final_response = finished_response
 
-        with sync_playwright() as p:
-            # Creating the browser
-            if self.cdp_url:
-                cdp_url = self._cdp_url_logic()
-                browser = p.chromium.connect_over_cdp(endpoint_url=cdp_url)
-            else:
-                browser = p.chromium.launch(**self.__launch_kwargs())
-
-            context = browser.new_context(**self.__context_kwargs())
-            page = context.new_page()
+        page = context.new_page()
+        try:
             page.set_default_navigation_timeout(self.timeout)
             page.set_default_timeout(self.timeout)
             page.on("response", handle_response)
+            capture = NetworkCapture(self.capture_rules) if self.capture_rules else None
+            if capture is not None:
+                page.on("response", capture.handle_response)
 
             if self.extra_headers:
                 page.set_extra_http_headers(self.extra_headers)
@@ -306,10 +383,15 @@ class PlaywrightEngine:
             if self.network_idle:
                 page.wait_for_load_state('networkidle')
 
-            if self.page_action is not None:
+            # A valid restored state means the page is already warmed up
+            reused_state = restored and is_restored_state_valid(self.storage_state_probe, page)
+            # A failed warm-up isn't saved as the state to start the next requests with
+            page_action_failed = False
+            if self.page_action is not None and not reused_state:
                 try:
                     page = self.page_action(page)
                 except Exception as e:
+                    page_action_failed = True
                     log.error(f"Error executing page_action: {e}")
 
             if self.wait_selector and type(self.wait_selector) is str:
@@ -335,12 +417,20 @@ class PlaywrightEngine:
             # PlayWright API sometimes give empty status text for some reason!
             status_text = final_response.status_text or StatusText.get(final_response.status)
 
+            page_results = None
+            if self.page_requests:
+                try:
+                    page_results = fetch_in_page(page, self.page_requests, concurrency=self.page_requests_concurrency, timeout=self.timeout)
+                except Exception as e:
+                    log.error(f"Error doing the page requests: {e}")
+
             history = self._process_response_history(first_response)
             try:
                 page_content = page.content()
             except Exception as e:
                 log.error(f"Error getting page content: {e}")
                 page_content = ""
+            captured = capture.collect() if capture is not None else None
 
             response = Response(
                 url=page.url,
@@ -353,24 +443,57 @@ class PlaywrightEngine:
                 headers=first_response.all_headers(),
                 request_headers=first_response.request.all_headers(),
                 history=history,
+                captured=captured,
+                page_results=page_results,
                 **self.adaptor_arguments
             )
-            page.close()
-            context.close()
+            if self.storage_state_cache is not None and not reused_state and not page_action_failed and final_response.status < 400:
+                save_page_state(self.storage_state_cache, self.storage_state_label, page)
+        finally:
+            try:
+                page.close()
+            except Exception as e:
+                log.debug(f"Error closing the page: {e}")
+
         return response
 
-    async def async_fetch(self, url: str) -> Response:
-        """Async version of `fetch`
+    def _fetch_with_browser(self, browser, url: str) -> Response:
+        """Do your request in a fresh context of an already launched browser then close that context.
+
+        :param browser: A launched browser
+        :param url: Target url.
+        :return: A `Response` object that is the same as `Adaptor` object except it has these added attributes: `status`, `reason`, `cookies`, `headers`, and `request_headers`
+        """
+        saved_state = self.storage_state_cache.load(self.storage_state_label) if self.storage_state_cache is not None else None
+        context = self._new_context(browser, saved_state)
+        try:
+            return self._fetch_with_context(context, url, restored=saved_state is not None)
+        finally:
+            try:
+                context.close()
+            except Exception as e:
+                # The browser itself most likely crashed or got closed, the caller will deal with that
+                log.debug(f"Error closing the browser context: {e}")
+
+    async def _async_new_context(self, browser, saved_state: Optional[Dict] = None):
+        """Async version of `_new_context`"""
+        if saved_state is None:
+            return await browser.new_context(**self.__context_kwargs())
+
+        context = await browser.new_context(**self.__context_kwargs(), storage_state=saved_state['storage_state'])
+        session_storage_script = StorageStateCache.session_storage_script(saved_state)
+        if session_storage_script:
+            await context.add_init_script(script=session_storage_script)
+        return context
+
+    async def _async_fetch_with_context(self, context, url: str, restored: bool = False) -> Response:
+        """Async version of `_fetch_with_context`
 
+        :param context: A browser context created with `_async_new_context`
         :param url: Target url.
         :return: A `Response` object that is the same as `Adaptor` object except it has these added attributes: `status`, `reason`, `cookies`, `headers`, and `request_headers`
         """
         from playwright.async_api import Response as PlaywrightResponse
-        if not self.stealth or self.real_chrome:
-            # Because rebrowser_playwright doesn't play well with real browsers
-            from playwright.async_api import async_playwright
-        else:
-            from rebrowser_playwright.async_api import async_playwright
 
         final_response = None
         referer = generate_convincing_referer(url) if self.google_search else None
@@ -380,19 +503,14 @@ class PlaywrightEngine:
             if finished_response.request.resource_type == "document" and finished_response.request.is_navigation_request():
                 final_response = finished_response
 
-        async with async_playwright() as p:
-            # Creating the browser
-            if self.cdp_url:
-                cdp_url = self._cdp_url_logic()
-                browser = await p.chromium.connect_over_cdp(endpoint_url=cdp_url)
-            else:
-                browser = await p.chromium.launch(**self.__launch_kwargs())
-
-            context = await browser.new_context(**self.__context_kwargs())
-            page = await context.new_page()
+        page = await context.new_page()
+        try:
             page.set_default_navigation_timeout(self.timeout)
             page.set_default_timeout(self.timeout)
             page.on("response", handle_response)
+            capture = NetworkCapture(self.capture_rules) if self.capture_rules else None
+            if capture is not None:
+                page.on("response", capture.handle_response)
 
             if self.extra_headers:
                 await page.set_extra_http_headers(self.extra_headers)
@@ -410,10 +528,15 @@ class PlaywrightEngine:
             if self.network_idle:
                 await page.wait_for_load_state('networkidle')
 
-            if self.page_action is not None:
+            # A valid restored state means the page is already warmed up
+            reused_state = restored and await async_is_restored_state_valid(self.storage_state_probe, page)
+            # A failed warm-up isn't saved as the state to start the next requests with
+            page_action_failed = False
+            if self.page_action is not None and not reused_state:
                 try:
                     page = await self.page_action(page)
                 except Exception as e:
+                    page_action_failed = True
                     log.error(f"Error executing async page_action: {e}")
 
             if self.wait_selector and type(self.wait_selector) is str:
@@ -439,12 +562,20 @@ class PlaywrightEngine:
             # PlayWright API sometimes give empty status text for some reason!
             status_text = final_response.status_text or StatusText.get(final_response.status)
 
+            page_results = None
+            if self.page_requests:
+                try:
+                    page_results = await async_fetch_in_page(page, self.page_requests, concurrency=self.page_requests_concurrency, timeout=self.timeout)
+                except Exception as e:
+                    log.error(f"Error doing the page requests: {e}")
+
             history = await self._async_process_response_history(first_response)
             try:
                 page_content = await page.content()
             except Exception as e:
                 log.error(f"Error getting page content in async: {e}")
                 page_content = ""
+            captured = await capture.async_collect() if capture is not None else None
 
             response = Response(
                 url=page.url,
@@ -457,9 +588,52 @@ class PlaywrightEngine:
                 headers=await first_response.all_headers(),
                 request_headers=await first_response.request.all_headers(),
                 history=history,
+                captured=captured,
+                page_results=page_results,
                 **self.adaptor_arguments
             )
-            await page.close()
-            await context.close()
+            if self.storage_state_cache is not None and not reused_state and not page_action_failed and final_response.status < 400:
+                await async_save_page_state(self.storage_state_cache, self.storage_state_label, page)
+        finally:
+            try:
+                await page.close()
+            except Exception as e:
+                log.debug(f"Error closing the page: {e}")
 
         return response
+
+    async def _async_fetch_with_browser(self, browser, url: str) -> Response:
+        """Async version of `_fetch_with_browser`
+
+        :param browser: A launched browser
+        :param url: Target url.
+        :return: A `Response` object that is the same as `Adaptor` object except it has these added attributes: `status`, `reason`, `cookies`, `headers`, and `request_headers`
+        """
+        saved_state = self.storage_state_cache.load(self.storage_state_label) if self.storage_state_cache is not None else None
+        context = await self._async_new_context(browser, saved_state)
+        try:
+            return await self._async_fetch_with_context(context, url, restored=saved_state is not None)
+        finally:
+            try:
+                await context.close()
+            except Exception as e:
+                # The browser itself most likely crashed or got closed, the caller will deal with that
+                log.debug(f"Error closing the browser context: {e}")
+
+    def fetch(self, url: str) -> Response:
+        """Opens up the browser and do your request based on your chosen options.
+
+        :param url: Target url.
+        :return: A `Response` object that is the same as `Adaptor` object except it has these added attributes: `status`, `reason`, `cookies`, `headers`, and `request_headers`
+        """
+        with self._playwright_manager() as p:
+            return self._fetch_with_browser(self._launch_browser(p), url)
+
+    async def async_fetch(self, url: str) -> Response:
+        """Async version of `fetch`
+
+        :param url: Target url.
+        :return: A `Response` object that is the same as `Adaptor` object except it has these added attributes: `status`, `reason`, `cookies`, `headers`, and `request_headers`
+        """
+        async with self._async_playwright_manager() as p:
+            return await self._async_fetch_with_browser(await self._async_launch_browser(p), url)
@@ -1,6 +1,14 @@
+from .capture import (CapturedResponse, CaptureRule, NetworkCapture,
+                      compile_capture_rules)
 from .custom import (BaseFetcher, Response, StatusText, check_if_engine_usable,
                      check_type_validity, get_variable_name)
-from .fingerprints import (generate_convincing_referer, generate_headers,
-                           get_os_name)
+from .fingerprints import (HeaderPool, generate_convincing_referer,
+                           generate_headers, get_os_name, headers_pool)
+from .in_page import PageFetchResult, async_fetch_in_page, fetch_in_page
+from .launch_profiles import LaunchProfiles, get_launch_profiles
 from .navigation import (async_intercept_route, construct_cdp_url,
                          construct_proxy_dict, intercept_route, js_bypass_path)
+from .scheduling import get_request_url, iter_concurrently
+from .storage_state import (StorageStateCache, async_is_restored_state_valid,
+                            async_save_page_state, get_storage_state_cache,
+                            is_restored_state_valid, save_page_state)
@@ -0,0 +1,162 @@
+"""
+Functions related to capturing the API responses a page receives while it loads
+"""
+import asyncio
+import re
+
+import orjson
+
+from scrapling.core._types import (Any, Dict, Iterable, List, Optional,
+                                   Pattern, Tuple, Union)
+from scrapling.core.utils import log
+
+_NOT_LOADED = object()
+
+
+class CaptureRule:
+    """A rule of which responses of the page get captured, they are matched by their URL then their request's type and method"""
+    __slots__ = ('pattern', 'name', 'resource_types', 'methods')
+
+    def __init__(
+            self, pattern: Union[str, Pattern], name: Optional[str] = None, resource_types: Iterable[str] = ('xhr', 'fetch'),
+            methods: Optional[Iterable[str]] = None
+    ):
+        """
+        :param pattern: A regex searched for in the URL of the responses.
+        :param name: A name to find the captured responses of this rule with, the default is the pattern itself.
+        :param resource_types: The playwright resource types of the requests to capture. The default is XHR and fetch requests only.
+        :param methods: The HTTP methods of the requests to capture. The default is `None` which means any method.
+        """
+        self.pattern = re.compile(pattern) if isinstance(pattern, str) else pattern
+        self.name = name or self.pattern.pattern
+        self.resource_types = frozenset(resource_types)
+        self.methods = frozenset(method.upper() for method in methods) if methods else None
+
+    def matches(self, request: Any) -> bool:
+        """Check if the response of this playwright request should be captured, only cheap request properties are used"""
+        if request.resource_type not in self.resource_types:
+            return False
+        if self.methods is not None and request.method not in self.methods:
+            return False
+        return self.pattern.search(request.url) is not None
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({self.pattern.pattern!r}, name={self.name!r})'
+
+
+def compile_capture_rules(rules: Any) -> List[CaptureRule]:
+    """Turn the capture rules given by the user into a list of `CaptureRule`, a rule can be a regex string, a compiled pattern, or a `CaptureRule`"""
+    if not rules:
+        return []
+    if isinstance(rules, (str, re.Pattern, CaptureRule)):
+        rules = [rules]
+
+    compiled = []
+    for rule in rules:
+        if isinstance(rule, CaptureRule):
+            compiled.append(rule)
+        elif isinstance(rule, (str, re.Pattern)):
+            compiled.append(CaptureRule(rule))
+        else:
+            log.error(f'[Ignored] Capture rule {rule!r} must be a regex string, a compiled pattern, or a `CaptureRule`')
+
+    return compiled
+
+
+class CapturedResponse:
+    """A response the page received that matched one of the capture rules"""
+    __slots__ = ('rule', 'url', 'method', 'status', 'headers', 'request_headers', 'timing', 'body', '__json')
+
+    def __init__(self, rule: CaptureRule, url: str, method: str, status: int, headers: Dict[str, str],
+                 request_headers: Dict[str, str], timing: Dict[str, float], body: Optional[bytes]):
+        self.rule = rule
+        self.url = url
+        self.method = method
+        self.status = status
+        self.headers = headers
+        self.request_headers = request_headers
+        self.timing = timing
+        self.body = body
+        self.__json = _NOT_LOADED
+
+    @property
+    def name(self) -> str:
+        return self.rule.name
+
+    @property
+    def text(self) -> str:
+        return self.body.decode('utf-8', errors='replace') if self.body else ''
+
+    @property
+    def elapsed(self) -> Optional[float]:
+        """The time in milliseconds from the start of the request until the end of its response if known"""
+        response_end = (self.timing or {}).get('responseEnd', -1)
+        return response_end if response_end is not None and response_end >= 0 else None
+
+    def json(self) -> Any:
+        """Parse the body as JSON on the first call only, a body that isn't valid JSON returns `None`"""
+        if self.__json is _NOT_LOADED:
+            try:
+                self.__json = orjson.loads(self.body) if self.body else None
+            except orjson.JSONDecodeError:
+                log.debug(f'The captured response of {self.url} is not valid JSON')
+                self.__json = None
+        return self.__json
+
+    def __repr__(self) -> str:
+        return f'<{self.__class__.__name__} [{self.status}] {self.method} {self.url}>'
+
+
+class NetworkCapture:
+    """Watches the responses of a page and keeps the ones that match the rules, their bodies are only read when collected
+    so the bodies of the rest of the responses are never transferred from the browser.
+
+    >>> capture = NetworkCapture(compile_capture_rules(r"/api/products"))
+    >>> page.on("response", capture.handle_response)
+    >>> ...
+    >>> captured = capture.collect()
+    """
+
+    def __init__(self, rules: List[CaptureRule]):
+        self.rules = rules
+        self._matched: List[Tuple[CaptureRule, Any]] = []
+
+    def handle_response(self, response: Any) -> None:
+        """The `response` event handler, it's not a coroutine so it works with both the sync and async APIs"""
+        request = response.request
+        for rule in self.rules:
+            if rule.matches(request):
+                self._matched.append((rule, response))
+                return
+
+    @staticmethod
+    def __captured(rule: CaptureRule, response: Any, body: Optional[bytes]) -> CapturedResponse:
+        request = response.request
+        return CapturedResponse(
+            rule=rule, url=response.url, method=request.method, status=response.status,
+            headers=response.headers, request_headers=request.headers, timing=request.timing, body=body
+        )
+
+    def collect(self) -> List[CapturedResponse]:
+        """Read the bodies of the matched responses with the sync API"""
+        captured = []
+        for rule, response in self._matched:
+            try:
+                body = response.body()
+            except Exception as e:
+                # Like redirect responses or ones evicted by a navigation
+                log.debug(f'Error reading the body of captured response {response.url}: {e}')
+                body = None
+            captured.append(self.__captured(rule, response, body))
+        return captured
+
+    async def async_collect(self) -> List[CapturedResponse]:
+        """Read the bodies of the matched responses with the async API, concurrently"""
+        bodies = await asyncio.gather(*[response.body() for _, response in self._matched], return_exceptions=True)
+        captured = []
+        for (rule, response), body in zip(self._matched, bodies):
+            if isinstance(body, Exception):
+                log.debug(f'Error reading the body of captured response {response.url}: {body}')
+                body = None
+            captured.append(self.__captured(rule, response, body))
+        return captured
@@ -85,7 +85,8 @@ class Response(Adaptor):
     """This class is returned by all engines as a way to unify response type between different libraries."""
 
     def __init__(self, url: str, text: str, body: bytes, status: int, reason: str, cookies: Dict, headers: Dict, request_headers: Dict,
-                 encoding: str = 'utf-8', method: str = 'GET', history: List = None, **adaptor_arguments: Dict):
+                 encoding: str = 'utf-8', method: str = 'GET', history: List = None, captured: List = None, page_results: List = None,
+                 **adaptor_arguments: Dict):
         automatch_domain = adaptor_arguments.pop('automatch_domain', None)
         self.status = status
         self.reason = reason
@@ -93,6 +94,10 @@ class Response(Adaptor):
         self.headers = headers
         self.request_headers = request_headers
         self.history = history or []
+        # The API responses captured by the browser engines' `network_capture` rules
+        self.captured = captured or []
+        # The results of the browser engines' `page_requests`
+        self.page_results = page_results or []
         encoding = ResponseEncoding.get_value(encoding, text)
         super().__init__(text=text, body=body, url=automatch_domain or url, encoding=encoding, **adaptor_arguments)
         # For back-ward compatibility
@@ -113,7 +118,8 @@ class BaseFetcher:
     storage_args: Optional[Dict] = None
     keep_comments: Optional[bool] = False
     automatch_domain: Optional[str] = None
-    parser_keywords: Tuple = ('huge_tree', 'auto_match', 'storage', 'keep_cdata', 'storage_args', 'keep_comments', 'automatch_domain',)  # Left open for the user
+    lazy_parsing: Optional[bool] = False
+    parser_keywords: Tuple = ('huge_tree', 'auto_match', 'storage', 'keep_cdata', 'storage_args', 'keep_comments', 'automatch_domain', 'lazy_parsing',)  # Left open for the user
 
     def __init__(self, *args, **kwargs):
         # For backward-compatibility before 0.2.99
@@ -135,13 +141,14 @@ class BaseFetcher:
             storage=cls.storage,
             storage_args=cls.storage_args,
             automatch_domain=cls.automatch_domain,
+            lazy_parsing=cls.lazy_parsing,
         )
 
     @classmethod
     def configure(cls, **kwargs):
         """Set multiple arguments for the parser at once globally
 
-        :param kwargs: The keywords can be any arguments of the following: huge_tree, keep_comments, keep_cdata, auto_match, storage, storage_args, automatch_domain
+        :param kwargs: The keywords can be any arguments of the following: huge_tree, keep_comments, keep_cdata, auto_match, storage, storage_args, automatch_domain, lazy_parsing
         """
         for key, value in kwargs.items():
             key = key.strip().lower()
@@ -167,7 +174,8 @@ class BaseFetcher:
             keep_cdata=cls.keep_cdata,
             auto_match=cls.auto_match,
             storage=cls.storage,
-            storage_args=cls.storage_args
+            storage_args=cls.storage_args,
+            lazy_parsing=cls.lazy_parsing
         )
         if cls.automatch_domain:
             if type(cls.automatch_domain) is not str:
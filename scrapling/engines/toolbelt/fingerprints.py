@@ -3,13 +3,24 @@ Functions related to generating headers and fingerprints generally
 """
 
 import platform
+import random
+import threading
 
 from browserforge.fingerprints import Fingerprint, FingerprintGenerator
 from browserforge.headers import Browser, HeaderGenerator
 from tldextract import extract
 
-from scrapling.core._types import Dict, Union
-from scrapling.core.utils import lru_cache
+from scrapling.core._types import Any, Dict, List, Literal, Optional, Union
+from scrapling.core.utils import log, lru_cache
+
+from .custom import check_type_validity
+
+# The browsers of the headers used for normal requests that aren't done through browsers so we can take it lightly
+STATIC_HEADERS_BROWSERS = (
+    Browser(name='chrome', min_version=120),
+    Browser(name='firefox', min_version=120),
+    Browser(name='edge', min_version=120),
+)
 
 
 @lru_cache(10, typed=True)
@@ -56,8 +67,152 @@ def generate_suitable_fingerprint() -> Fingerprint:
     ).generate()
 
 
+class _HeaderProfile:
+    """The generator of one (browsers, OS, device) combination and its pre-generated header sets with their remaining uses"""
+    __slots__ = ('generator', 'entries', 'position', 'generation_lock')
+
+    def __init__(self, generator: HeaderGenerator):
+        self.generator = generator
+        self.entries: List[List[Any]] = []
+        self.position = 0
+        self.generation_lock = threading.Lock()
+
+
+class HeaderPool:
+    """Keeps header sets generated ahead of time in batches for each (browsers, OS, device) profile and hands them out in O(1),
+    so generating headers is out of the requests' way. A background thread tops a profile back up when it runs low.
+
+    >>> pool = HeaderPool(size=500)
+    >>> headers = pool.get(browsers=(Browser(name='chrome', min_version=120),), os='windows', device='desktop')
+    """
+
+    def __init__(self, size: int = 100, refill_at: float = 0.5, order: Literal['random', 'round_robin'] = 'random', max_uses: int = 1):
+        """
+        :param size: The number of header sets kept for each profile. The default is 100.
+        :param refill_at: The fraction of `size` left in a profile at which the background thread tops it back up. The default is half.
+        :param order: How the header sets of a profile are handed out, `random` or `round_robin`. The default is `random`.
+        :param max_uses: The number of times each header set is handed out before it's replaced by a new one. The default is 1.
+        """
+        self.size = max(check_type_validity(size, [int], 100, param_name='size'), 1)
+        self.refill_threshold = max(int(self.size * check_type_validity(refill_at, [int, float], 0.5, param_name='refill_at')), 1)
+        if order not in ('random', 'round_robin'):
+            log.error('[Ignored] Argument "order" must be `random` or `round_robin`')
+            order = 'random'
+        self.order = order
+        self.max_uses = max(check_type_validity(max_uses, [int], 1, param_name='max_uses'), 1)
+        self.__profiles: Dict[str, _HeaderProfile] = {}
+        self.__lock = threading.Lock()
+        self.__wake = threading.Event()
+        self.__thread: Optional[threading.Thread] = None
+        self.__closed = False
+
+    @staticmethod
+    def __key(browsers: Any, os: Any, device: Any) -> str:
+        return repr((browsers, os, device))
+
+    def __profile(self, browsers: Any, os: Any, device: Any) -> _HeaderProfile:
+        key = self.__key(browsers, os, device)
+        with self.__lock:
+            profile = self.__profiles.get(key)
+            if profile is None:
+                # `None` means any so it's left to the generator's defaults
+                options = {name: value for name, value in (('os', os), ('device', device)) if value is not None}
+                profile = self.__profiles[key] = _HeaderProfile(HeaderGenerator(browser=browsers, **options))
+            return profile
+
+    def __take(self, profile: _HeaderProfile) -> Optional[Dict]:
+        """Hand out one of the profile's header sets and remove it once it's used `max_uses` times, must be called with the lock held"""
+        entries = profile.entries
+        if not entries:
+            return None
+
+        index = random.randrange(len(entries)) if self.order == 'random' else profile.position % len(entries)
+        entry = entries[index]
+        entry[1] -= 1
+        if entry[1] <= 0:
+            # Swapped with the last one so removing it is O(1)
+            entries[index] = entries[-1]
+            entries.pop()
+            profile.position = index
+        else:
+            profile.position = index + 1
+        return entry[0]
+
+    def __fill(self, profile: _HeaderProfile) -> None:
+        """Generate the missing header sets of the profile in one batch"""
+        with profile.generation_lock:
+            missing = self.size - len(profile.entries)
+            if missing <= 0:
+                return
+            generated = profile.generator.generate_many(missing)
+            with self.__lock:
+                profile.entries.extend([headers, self.max_uses] for headers in generated)
+
+    def __refill_loop(self) -> None:
+        while not self.__closed:
+            self.__wake.wait()
+            self.__wake.clear()
+            for profile in list(self.__profiles.values()):
+                if self.__closed:
+                    return
+                if len(profile.entries) < self.refill_threshold:
+                    try:
+                        self.__fill(profile)
+                    except Exception as e:
+                        log.error(f'Error refilling the header pool: {e}')
+
+    def __request_refill(self) -> None:
+        with self.__lock:
+            if self.__thread is None or not self.__thread.is_alive():
+                self.__thread = threading.Thread(target=self.__refill_loop, name='scrapling-header-pool', daemon=True)
+                self.__thread.start()
+        self.__wake.set()
+
+    def get(self, browsers: Any = STATIC_HEADERS_BROWSERS, os: Any = None, device: Any = 'desktop') -> Dict:
+        """Get a header set of this profile, the returned dictionary is a copy so it's safe to change
+
+        :param browsers: The `Browser` objects or names of the browsers to generate headers of.
+        :param os: The operating system(s) to generate headers of, `None` means any.
+        :param device: The device(s) to generate headers of. The default is `desktop`.
+        """
+        profile = self.__profile(browsers, os, device)
+        with self.__lock:
+            headers = self.__take(profile)
+            running_low = len(profile.entries) < self.refill_threshold
+
+        if headers is None:
+            # The first use of the profile or a burst faster than the refill so this request waits for a batch
+            self.__fill(profile)
+            with self.__lock:
+                headers = self.__take(profile)
+            if headers is None:
+                headers = profile.generator.generate()
+        if running_low and not self.__closed:
+            self.__request_refill()
+        return dict(headers)
+
+    def prefill(self, browsers: Any = STATIC_HEADERS_BROWSERS, os: Any = None, device: Any = 'desktop') -> None:
+        """Generate the header sets of this profile now instead of on its first use, takes the same arguments as `get`"""
+        self.__fill(self.__profile(browsers, os, device))
+
+    def available(self, browsers: Any = STATIC_HEADERS_BROWSERS, os: Any = None, device: Any = 'desktop') -> int:
+        """The number of header sets of this profile that are ready to be handed out"""
+        with self.__lock:
+            profile = self.__profiles.get(self.__key(browsers, os, device))
+            return len(profile.entries) if profile is not None else 0
+
+    def close(self) -> None:
+        """Stop the background thread, the pool still works after that but without the background refill"""
+        self.__closed = True
+        self.__wake.set()
+
+
+# The pool all engines get their generated headers from
+headers_pool = HeaderPool()
+
+
 def generate_headers(browser_mode: bool = False) -> Dict:
-    """Generate real browser-like headers using browserforge's generator
+    """Generate real browser-like headers using browserforge's generator, they are taken from the pre-generated `headers_pool`
 
     :param browser_mode: If enabled, the headers created are used for playwright so it have to match everything
     :return: A dictionary of the generated headers
@@ -65,17 +220,10 @@ def generate_headers(browser_mode: bool = False) -> Dict:
     if browser_mode:
         # In this mode we don't care about anything other than matching the OS and the browser type with the browser we are using
         # So we don't raise any inconsistency red flags while websites fingerprinting us
-        os_name = get_os_name()
-        return HeaderGenerator(
-            browser=[Browser(name='chrome', min_version=130)],
-            os=os_name,  # None is ignored
+        return headers_pool.get(
+            browsers=(Browser(name='chrome', min_version=130),),
+            os=get_os_name(),  # None is ignored
             device='desktop'
-        ).generate()
+        )
     else:
-        # Here it's used for normal requests that aren't done through browsers so we can take it lightly
-        browsers = [
-            Browser(name='chrome', min_version=120),
-            Browser(name='firefox', min_version=120),
-            Browser(name='edge', min_version=120),
-        ]
-        return HeaderGenerator(browser=browsers, device='desktop').generate()
+        return headers_pool.get(browsers=STATIC_HEADERS_BROWSERS, device='desktop')
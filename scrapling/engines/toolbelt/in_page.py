@@ -0,0 +1,151 @@
+"""
+Functions related to doing many requests from inside a browser page so they use the browser's TLS fingerprint and cookies
+"""
+from base64 import b64encode
+from urllib.parse import urlencode
+
+import orjson
+
+from scrapling.core._types import Any, Dict, Iterable, List, Optional, Union
+from scrapling.core.utils import log
+
+from .custom import check_type_validity
+from .scheduling import get_request_url
+
+# Runs a whole batch in one `evaluate` call with `concurrency` workers pulling from the same list of requests.
+# Bodies are returned as text and parsed on the Python side only when needed.
+# Binary request bodies are passed as base64 since only JSON values go through `evaluate`, they are decoded back to bytes here.
+_BATCH_SCRIPT = """
+async ([requests, concurrency, timeout]) => {
+    const controller = new AbortController();
+    const timer = timeout ? setTimeout(() => controller.abort(), timeout) : null;
+    const results = new Array(requests.length);
+    let next = 0;
+    const worker = async () => {
+        while (next < requests.length) {
+            const index = next++;
+            const request = requests[index];
+            try {
+                const body = request.binary ? Uint8Array.from(atob(request.body), (char) => char.charCodeAt(0)) : request.body;
+                const response = await fetch(request.url, {
+                    method: request.method, headers: request.headers, body,
+                    credentials: 'include', signal: controller.signal
+                });
+                const headers = {};
+                response.headers.forEach((value, key) => { headers[key] = value; });
+                results[index] = {url: response.url, status: response.status, headers, text: await response.text(), error: null};
+            } catch (error) {
+                results[index] = {url: request.url, status: 0, headers: {}, text: '', error: String(error)};
+            }
+        }
+    };
+    await Promise.all(Array.from({length: Math.min(concurrency, requests.length)}, worker));
+    if (timer) clearTimeout(timer);
+    return results;
+}
+"""
+_NOT_LOADED = object()
+
+
+class PageFetchResult:
+    """The result of a request done from inside the page, a failed request has the status 0 and its `error`"""
+    __slots__ = ('url', 'status', 'headers', 'text', 'error', '__json')
+
+    def __init__(self, url: str, status: int, headers: Dict[str, str], text: str, error: Optional[str] = None):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.text = text
+        self.error = error
+        self.__json = _NOT_LOADED
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and 200 <= self.status < 400
+
+    def json(self) -> Any:
+        """Parse the body as JSON on the first call only, a body that isn't valid JSON returns `None`"""
+        if self.__json is _NOT_LOADED:
+            try:
+                self.__json = orjson.loads(self.text) if self.text else None
+            except orjson.JSONDecodeError:
+                log.debug(f'The body of {self.url} is not valid JSON')
+                self.__json = None
+        return self.__json
+
+    def __repr__(self) -> str:
+        return f'<{self.__class__.__name__} [{self.status}] {self.url}>'
+
+
+def _set_default_content_type(headers: Dict[str, str], content_type: str) -> None:
+    if not any(name.lower() == 'content-type' for name in headers):
+        headers['content-type'] = content_type
+
+
+def _prepare_request(request: Union[str, Dict]) -> Dict:
+    """Turn a request spec into the arguments of the in-page `fetch`, a dictionary spec takes `method`, `headers`, `data`, and `json` keys.
+    A dictionary `data` is sent as url-encoded form fields."""
+    url = get_request_url(request)
+    if isinstance(request, str):
+        return {'url': url, 'method': 'GET', 'headers': {}, 'body': None, 'binary': False}
+
+    headers = dict(request.get('headers') or {})
+    body, binary = request.get('data'), False
+    if request.get('json') is not None:
+        body = orjson.dumps(request['json']).decode('utf-8')
+        _set_default_content_type(headers, 'application/json')
+    elif isinstance(body, dict):
+        # Form fields like httpx's `data`
+        body = urlencode(body, doseq=True)
+        _set_default_content_type(headers, 'application/x-www-form-urlencoded')
+    elif isinstance(body, bytes):
+        body, binary = b64encode(body).decode('ascii'), True
+    elif body is not None and not isinstance(body, str):
+        log.error(f'[Ignored] The data of the request to {url} must be a string, bytes, or a dictionary of form fields')
+        body = None
+
+    return {'url': url, 'method': (request.get('method') or 'GET').upper(), 'headers': headers, 'body': body, 'binary': binary}
+
+
+def _batches(requests: Iterable[Union[str, Dict]], concurrency: int, batch_size: int, timeout: Optional[float]):
+    concurrency = max(check_type_validity(concurrency, [int], 10, param_name='concurrency'), 1)
+    batch_size = max(check_type_validity(batch_size, [int], 100, param_name='batch_size'), 1)
+    timeout = check_type_validity(timeout, [int, float, type(None)], None, param_name='timeout')
+
+    prepared = [_prepare_request(request) for request in requests]
+    for start in range(0, len(prepared), batch_size):
+        yield [prepared[start:start + batch_size], concurrency, timeout or 0]
+
+
+def _to_results(raw_results: List[Dict]) -> List[PageFetchResult]:
+    return [PageFetchResult(**result) for result in raw_results]
+
+
+def fetch_in_page(page: Any, requests: Iterable[Union[str, Dict]], concurrency: int = 10, batch_size: int = 100,
+                  timeout: Optional[float] = 30000) -> List[PageFetchResult]:
+    """Do the requests from inside the page with its `fetch` so they are sent with the browser's TLS fingerprint and cookies.
+
+    Each batch is a single `evaluate` call so hundreds of requests only cost a few round trips between Python and the browser.
+
+    >>> results = fetch_in_page(page, ['https://example.com/api/items/1', {'url': 'https://example.com/api/search', 'method': 'POST', 'json': {'q': 'x'}}])
+
+    :param page: A sync playwright page, it should already be on the website so the requests are same-origin.
+    :param requests: URL strings or dictionaries with the keys `url`, `method`, `headers`, `data`, and `json`.
+    :param concurrency: The number of requests running at the same time inside the page. The default is 10.
+    :param batch_size: The number of requests sent to the page in each `evaluate` call. The default is 100.
+    :param timeout: The time in milliseconds after which the unfinished requests of a batch are aborted. The default is 30000, `None` means no timeout.
+    :return: A list of `PageFetchResult` in the same order of the requests.
+    """
+    results = []
+    for batch in _batches(requests, concurrency, batch_size, timeout):
+        results.extend(_to_results(page.evaluate(_BATCH_SCRIPT, batch)))
+    return results
+
+
+async def async_fetch_in_page(page: Any, requests: Iterable[Union[str, Dict]], concurrency: int = 10, batch_size: int = 100,
+                              timeout: Optional[float] = 30000) -> List[PageFetchResult]:
+    """Async version of `fetch_in_page` that takes an async playwright page"""
+    results = []
+    for batch in _batches(requests, concurrency, batch_size, timeout):
+        results.extend(_to_results(await page.evaluate(_BATCH_SCRIPT, batch)))
+    return results
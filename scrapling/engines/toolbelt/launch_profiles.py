@@ -0,0 +1,187 @@
+"""
+Functions related to generating Camoufox launch profiles ahead of time so launching a browser only has to pick one of them
+"""
+import hashlib
+import inspect
+import os
+import random
+import threading
+import zlib
+from os import environ
+from pprint import pprint
+
+import orjson
+from camoufox.ip import Proxy, public_ip, valid_ipv4, valid_ipv6
+from camoufox.locale import geoip_allowed, get_geolocation
+from camoufox.pkgman import installed_verstr, launch_path
+from camoufox.utils import get_env_vars, get_target_os, launch_options
+
+from scrapling.core._types import Any, Dict, List, Optional
+from scrapling.core.utils import log
+
+# Options that don't change the generated fingerprint so they are applied when a profile is picked instead
+_PICK_TIME_OPTIONS = frozenset({'proxy', 'geoip', 'headless', 'debug', 'env', 'virtual_display', 'executable_path'})
+# Everything else `launch_options` doesn't know is passed to playwright's `launch` as it is
+_KNOWN_OPTIONS = frozenset(inspect.signature(launch_options).parameters) | {'allow_webgl'}
+# Loaded profile sets shared by all the engines of the process, keyed by their file path
+_loaded_profiles: Dict[str, List[Dict]] = {}
+_loaded_profiles_lock = threading.Lock()
+
+
+def _config_from_env(env: Dict[str, Any]) -> Dict[str, Any]:
+    """Join the `CAMOU_CONFIG_*` chunks `launch_options` split the validated config into"""
+    chunks = sorted((int(key.rsplit('_', 1)[1]), value) for key, value in env.items() if key.startswith('CAMOU_CONFIG_'))
+    return orjson.loads(''.join(value for _, value in chunks))
+
+
+def _randomize_seeds(config: Dict[str, Any]) -> None:
+    """Give each browser launched from the same profile its own values of the cheap random properties"""
+    config['window.history.length'] = random.randrange(1, 6)
+    config['fonts:spacing_seed'] = random.randint(0, 1_073_741_823)
+    config['canvas:aaOffset'] = random.randint(-50, 50)
+
+
+class LaunchProfiles:
+    """Generates complete Camoufox launch profiles (fingerprint, fonts, WebGL, and validated config) ahead of time and saves them
+    compressed in a directory, then each browser launch picks one of them at random instead of generating its own.
+
+    A set of profiles is saved for each combination of the options that change the fingerprint and the installed Camoufox version,
+    so processes with the same options share the same file. The options that don't change it, like the proxy and `geoip`, are applied on pick.
+
+    >>> profiles = LaunchProfiles('~/.scrapling/profiles', size=100)
+    >>> page = StealthyFetcher.fetch(url, launch_profiles=profiles)
+    """
+
+    def __init__(self, directory: str, size: int = 50):
+        """
+        :param directory: The directory the profiles are saved in, it's created if it doesn't exist.
+        :param size: The number of profiles generated for each combination of options. The default is 50.
+        """
+        self.directory = os.path.abspath(os.path.expanduser(directory))
+        self.size = max(size, 1)
+        self.__generation_lock = threading.Lock()
+        self.__camoufox_version: Optional[str] = None
+        os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def _generation_options(options: Dict[str, Any]) -> Dict[str, Any]:
+        """The options profiles are generated with, they are the ones that change the fingerprint"""
+        generation_options = {key: value for key, value in options.items() if key in _KNOWN_OPTIONS and key not in _PICK_TIME_OPTIONS}
+        # The screen constraints only depend on whether the browser is headless and a virtual display counts as headless
+        generation_options['headless'] = options.get('headless') is not False
+        return generation_options
+
+    def _path(self, options: Dict[str, Any]) -> str:
+        # Read once since the profiles are only valid for the Camoufox version they were validated against
+        if self.__camoufox_version is None:
+            self.__camoufox_version = installed_verstr()
+        key = orjson.dumps([self.__camoufox_version, self._generation_options(options)], default=repr, option=orjson.OPT_SORT_KEYS)
+        return os.path.join(self.directory, hashlib.sha1(key).hexdigest() + '.profiles')
+
+    def generate(self, options: Dict[str, Any], size: Optional[int] = None) -> List[Dict]:
+        """Generate a set of profiles for these options and save it, replacing the saved set if there's one
+
+        :param options: The keyword arguments the browser would be launched with through `NewBrowser`.
+        :param size: The number of profiles to generate. The default is the `size` of this instance.
+        """
+        generation_options = self._generation_options(options)
+        profiles = []
+        for _ in range(size or self.size):
+            generated = launch_options(**generation_options)
+            profiles.append({
+                'config': _config_from_env(generated['env']),
+                'firefox_user_prefs': generated['firefox_user_prefs'],
+                'args': generated['args'],
+            })
+
+        path = self._path(options)
+        # Unique for each thread since instances with the same directory don't share a lock
+        temporary_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(temporary_path, 'wb') as profiles_file:
+            profiles_file.write(zlib.compress(orjson.dumps(profiles)))
+        os.replace(temporary_path, path)
+
+        with _loaded_profiles_lock:
+            _loaded_profiles[path] = profiles
+        log.debug(f'Generated {len(profiles)} launch profiles in {path}')
+        return profiles
+
+    def profiles(self, options: Dict[str, Any]) -> List[Dict]:
+        """Return the profiles of these options from memory, or from the disk once per process, or generate them if there are none"""
+        path = self._path(options)
+        profiles = _loaded_profiles.get(path)
+        if profiles is not None:
+            return profiles
+
+        with self.__generation_lock:
+            # Another thread could have loaded or generated them while this one was waiting
+            if path in _loaded_profiles:
+                return _loaded_profiles[path]
+            try:
+                with open(path, 'rb') as profiles_file:
+                    profiles = orjson.loads(zlib.decompress(profiles_file.read()))
+            except FileNotFoundError:
+                return self.generate(options)
+            except (OSError, zlib.error, orjson.JSONDecodeError) as e:
+                log.warning(f'Regenerating the unreadable launch profiles in {path}: {e}')
+                return self.generate(options)
+
+            with _loaded_profiles_lock:
+                _loaded_profiles[path] = profiles
+            return profiles
+
+    def launch_options(self, options: Dict[str, Any], virtual_display: Optional[str] = None) -> Dict[str, Any]:
+        """Pick a random profile of these options and return the keyword arguments of playwright's `firefox.launch` with it
+
+        :param options: The keyword arguments the browser would be launched with through `NewBrowser`.
+        :param virtual_display: The display number of a started virtual display if `headless` is `virtual`.
+        """
+        profile = random.choice(self.profiles(options))
+        config = dict(profile['config'])
+        firefox_user_prefs = dict(profile['firefox_user_prefs'])
+        _randomize_seeds(config)
+
+        proxy, geoip = options.get('proxy'), options.get('geoip')
+        if geoip:
+            geoip_allowed()
+            if geoip is True:
+                geoip = public_ip(Proxy(**proxy).as_string()) if proxy else public_ip()
+
+            if not options.get('block_webrtc'):
+                if valid_ipv4(geoip):
+                    config['webrtc:ipv4'] = geoip
+                    firefox_user_prefs['network.dns.disableIPv6'] = True
+                elif valid_ipv6(geoip):
+                    config['webrtc:ipv6'] = geoip
+            config.update(get_geolocation(geoip).as_config())
+
+        if options.get('debug'):
+            print('[DEBUG] Config:')
+            pprint(config)
+
+        # Like camoufox, the user's environment variables are used instead of the current process' ones
+        env = dict(options.get('env') or environ)
+        if virtual_display:
+            env['DISPLAY'] = virtual_display
+
+        headless = options.get('headless')
+        return {
+            'executable_path': str(options.get('executable_path') or launch_path()),
+            'args': profile['args'],
+            'env': {**get_env_vars(config, get_target_os(config)), **env},
+            'firefox_user_prefs': firefox_user_prefs,
+            'proxy': proxy,
+            'headless': headless is True,
+            **{key: value for key, value in options.items() if key not in _KNOWN_OPTIONS},
+        }
+
+
+def get_launch_profiles(profiles: Any) -> Optional[LaunchProfiles]:
+    """Turn the `launch_profiles` argument of the engine into a `LaunchProfiles`, a string is used as the profiles' directory"""
+    if profiles is None or isinstance(profiles, LaunchProfiles):
+        return profiles
+    if isinstance(profiles, (str, os.PathLike)):
+        return LaunchProfiles(os.fspath(profiles))
+
+    log.error('[Ignored] Argument "launch_profiles" must be a directory path or a `LaunchProfiles`')
+    return None
@@ -0,0 +1,126 @@
+"""
+Functions related to running many requests concurrently with limits
+"""
+import asyncio
+from collections import Counter, deque
+from itertools import count
+from urllib.parse import urlparse
+
+from scrapling.core._types import (Any, AsyncGenerator, Awaitable, Callable,
+                                   Dict, Iterable, Optional, Union)
+from scrapling.core.utils import log
+
+from .custom import check_type_validity
+
+
+def get_request_url(request: Union[str, Dict], url_only: bool = False) -> str:
+    """Return the URL of a request spec which is either the URL itself or a dictionary of arguments with the key `url`
+
+    :param request: The request spec.
+    :param url_only: If enabled, dictionaries with any key other than `url` are rejected for places where per-request arguments aren't supported.
+    """
+    if isinstance(request, str):
+        return request
+    elif isinstance(request, dict) and isinstance(request.get('url'), str):
+        if url_only and len(request) > 1:
+            extra_keys = ', '.join(sorted(str(key) for key in request if key != 'url'))
+            raise TypeError(f'Per-request arguments are not supported here, pass them for all requests instead: {extra_keys}')
+        return request['url']
+
+    raise TypeError(f'A request must be a URL string or a dictionary with the key "url", got {request!r}')
+
+
+async def iter_concurrently(
+        requests: Iterable[Union[str, Dict]], job: Callable[[Union[str, Dict]], Awaitable[Any]], concurrency: int = 10,
+        per_domain: Optional[int] = None, ordered: bool = False, return_exceptions: bool = False
+) -> AsyncGenerator[Any, None]:
+    """Run `job` on each request with at most `concurrency` jobs running at the same time and at most `per_domain` of them on the same domain,
+    then yield the results as they finish.
+
+    Requests are pulled lazily from the iterable so it can be a generator of any size. Requests to a domain that already
+    has `per_domain` running jobs are held back while the ones after them keep going.
+
+    :param requests: An iterable of URL strings or dictionaries of arguments with the key `url`.
+    :param job: An async function that takes a single request and returns its result.
+    :param concurrency: The maximum number of jobs running at the same time. The default is 10.
+    :param per_domain: The maximum number of jobs running at the same time on the same domain. The default is `None` which means no limit.
+    :param ordered: If enabled, results are yielded in the same order of the requests instead of as they finish.
+    :param return_exceptions: If enabled, a failed job yields its exception instead of raising it and stopping everything.
+    :return: An async generator of the results.
+    """
+    concurrency = max(check_type_validity(concurrency, [int], 10, param_name='concurrency'), 1)
+    per_domain = check_type_validity(per_domain, [int, type(None)], None, param_name='per_domain')
+    # How far we read ahead in the requests looking for one of a free domain before waiting
+    max_held_back = concurrency * 4
+
+    requests = iter(requests)
+    exhausted = False
+    held_back = deque()
+    running = {}  # task -> (index, domain)
+    running_per_domain = Counter()
+    finished = {}  # Finished results waiting for their turn in the ordered mode
+    next_index = 0
+    indexes = count()
+
+    def can_start(domain: str) -> bool:
+        return not per_domain or running_per_domain[domain] < per_domain
+
+    def start(index: int, request: Union[str, Dict], domain: str) -> None:
+        running_per_domain[domain] += 1
+        running[asyncio.ensure_future(job(request))] = (index, domain)
+
+    def fill() -> None:
+        nonlocal exhausted
+        # Held back requests have priority over new ones
+        for _ in range(len(held_back)):
+            if len(running) >= concurrency:
+                return
+            index, request, domain = held_back.popleft()
+            if can_start(domain):
+                start(index, request, domain)
+            else:
+                held_back.append((index, request, domain))
+
+        while not exhausted and len(running) < concurrency and len(held_back) < max_held_back:
+            try:
+                request = next(requests)
+            except StopIteration:
+                exhausted = True
+                return
+
+            index, domain = next(indexes), urlparse(get_request_url(request)).hostname or ''
+            if can_start(domain):
+                start(index, request, domain)
+            else:
+                held_back.append((index, request, domain))
+
+    try:
+        fill()
+        while running:
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                index, domain = running.pop(task)
+                running_per_domain[domain] -= 1
+                if task.exception() is not None:
+                    if not return_exceptions:
+                        raise task.exception()
+                    log.debug(f'Request number {index} failed: {task.exception()!r}')
+                    result = task.exception()
+                else:
+                    result = task.result()
+
+                if ordered:
+                    finished[index] = result
+                else:
+                    yield result
+
+            fill()
+            while ordered and next_index in finished:
+                yield finished.pop(next_index)
+                next_index += 1
+    finally:
+        # The consumer stopped early or something failed so nothing should be left running in the background
+        for task in running:
+            task.cancel()
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
@@ -0,0 +1,150 @@
+"""
+Functions related to saving the state of a browser context after warming it up and restoring it in the next sessions
+"""
+import os
+import re
+import threading
+import time
+
+import orjson
+
+from scrapling.core._types import Any, Callable, Dict, Optional
+from scrapling.core.utils import log
+
+# Saves sessionStorage of the current origin since playwright's `storage_state` only has cookies and localStorage
+SESSION_STORAGE_SCRIPT = "() => [window.location.origin, Object.fromEntries(Object.entries(window.sessionStorage))]"
+# Restores the saved sessionStorage of an origin on the pages of that origin before any of their scripts run
+_SESSION_STORAGE_RESTORE_TEMPLATE = """(() => {
+    const items = (%s)[window.location.origin];
+    if (!items) return;
+    for (const [key, value] of Object.entries(items)) {
+        if (window.sessionStorage.getItem(key) === null) window.sessionStorage.setItem(key, value);
+    }
+})();"""
+
+
+class StorageStateCache:
+    """Saves the cookies, localStorage, and sessionStorage of a browser context under a label in a directory,
+    so the next sessions with the same label start already warmed up instead of doing the warm-up again.
+
+    The files are written atomically so many processes can share the same directory.
+
+    >>> cache = StorageStateCache('~/.scrapling/states', max_age=6 * 3600)
+    >>> page = StealthyFetcher.fetch(url, page_action=set_zip_code, storage_state_cache=cache, storage_state_label='store-20001')
+    """
+
+    def __init__(self, directory: str, max_age: Optional[float] = None):
+        """
+        :param directory: The directory the states are saved in, it's created if it doesn't exist.
+        :param max_age: The number of seconds a saved state is used for before a new warm-up is done. The default is `None` which means
+            until one of its cookies expires.
+        """
+        self.directory = os.path.abspath(os.path.expanduser(directory))
+        self.max_age = max_age
+        os.makedirs(self.directory, exist_ok=True)
+
+    def __path(self, label: str) -> str:
+        # Labels are free text so anything that isn't safe in a file name is replaced
+        return os.path.join(self.directory, re.sub(r'[^\w.-]', '_', label) + '.json')
+
+    def load(self, label: str) -> Optional[Dict]:
+        """Return the saved state of this label or `None` if there's none or it expired"""
+        path = self.__path(label)
+        try:
+            with open(path, 'rb') as state_file:
+                state = orjson.loads(state_file.read())
+        except FileNotFoundError:
+            return None
+        except (OSError, orjson.JSONDecodeError) as e:
+            log.warning(f'Ignoring the unreadable saved state of "{label}": {e}')
+            return None
+
+        now = time.time()
+        if self.max_age and now - state.get('saved_at', 0) >= self.max_age:
+            log.debug(f'The saved state of "{label}" is too old')
+            return None
+        if any(0 < (cookie.get('expires') or -1) <= now for cookie in state.get('storage_state', {}).get('cookies', [])):
+            log.debug(f'The saved state of "{label}" has expired cookies')
+            return None
+        return state
+
+    def save(self, label: str, storage_state: Dict, session_storage: Optional[Dict[str, Dict[str, str]]] = None) -> None:
+        """Save the state of a context under this label
+
+        :param label: The label to save the state under.
+        :param storage_state: What playwright's `context.storage_state()` returned.
+        :param session_storage: The sessionStorage items of each origin.
+        """
+        path = self.__path(label)
+        # Unique for each thread so concurrent saves of the same label never write to the same temporary file
+        temporary_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        state = {'saved_at': time.time(), 'storage_state': storage_state, 'session_storage': session_storage or {}}
+        with open(temporary_path, 'wb') as state_file:
+            state_file.write(orjson.dumps(state))
+        os.replace(temporary_path, path)
+        log.debug(f'Saved the state of "{label}"')
+
+    def delete(self, label: str) -> None:
+        """Delete the saved state of this label if there's one"""
+        try:
+            os.remove(self.__path(label))
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def session_storage_script(state: Dict) -> Optional[str]:
+        """The init script that restores the saved sessionStorage of the state or `None` if it has none"""
+        if not state.get('session_storage'):
+            return None
+        return _SESSION_STORAGE_RESTORE_TEMPLATE % orjson.dumps(state['session_storage']).decode('utf-8')
+
+
+def get_storage_state_cache(cache: Any) -> Optional[StorageStateCache]:
+    """Turn the `storage_state_cache` argument of the engines into a `StorageStateCache`, a string is used as the cache's directory"""
+    if cache is None or isinstance(cache, StorageStateCache):
+        return cache
+    if isinstance(cache, (str, os.PathLike)):
+        return StorageStateCache(os.fspath(cache))
+
+    log.error('[Ignored] Argument "storage_state_cache" must be a directory path or a `StorageStateCache`')
+    return None
+
+
+def is_restored_state_valid(probe: Optional[Callable], page: Any) -> bool:
+    """Run the validity probe of a restored state on the sync page, no probe means the state is valid"""
+    if probe is None:
+        return True
+    try:
+        return bool(probe(page))
+    except Exception as e:
+        log.error(f"Error running the storage state probe: {e}")
+        return False
+
+
+async def async_is_restored_state_valid(probe: Optional[Callable], page: Any) -> bool:
+    """Async version of `is_restored_state_valid` where the probe is a coroutine function"""
+    if probe is None:
+        return True
+    try:
+        return bool(await probe(page))
+    except Exception as e:
+        log.error(f"Error running the storage state probe: {e}")
+        return False
+
+
+def save_page_state(cache: StorageStateCache, label: str, page: Any) -> None:
+    """Save the state of the sync page's context with the sessionStorage of the page's origin"""
+    try:
+        origin, items = page.evaluate(SESSION_STORAGE_SCRIPT)
+        cache.save(label, page.context.storage_state(), {origin: items} if items else {})
+    except Exception as e:
+        log.error(f"Error saving the storage state: {e}")
+
+
+async def async_save_page_state(cache: StorageStateCache, label: str, page: Any) -> None:
+    """Async version of `save_page_state`"""
+    try:
+        origin, items = await page.evaluate(SESSION_STORAGE_SCRIPT)
+        cache.save(label, await page.context.storage_state(), {origin: items} if items else {})
+    except Exception as e:
+        log.error(f"Error saving the storage state: {e}")
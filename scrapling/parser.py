@@ -5,6 +5,7 @@ import typing
 from difflib import SequenceMatcher
 from urllib.parse import urljoin
 
+import orjson
 from cssselect import SelectorError, SelectorSyntaxError
 from cssselect import parse as split_selectors
 from lxml import etree, html
@@ -15,9 +16,10 @@ from scrapling.core._types import (Any, Callable, Dict, Generator, Iterable,
 from scrapling.core.custom_types import (AttributesHandler, TextHandler,
                                          TextHandlers)
 from scrapling.core.mixins import SelectorsGeneration
+from scrapling.core.relocation import RelocationIndex, default_scoring_backend
 from scrapling.core.storage_adaptors import (SQLiteStorageSystem,
                                              StorageSystemMixin, _StorageTools)
-from scrapling.core.translator import translator_instance
+from scrapling.core.translator import compile_xpath, translator_instance
 from scrapling.core.utils import (clean_spaces, flatten, html_forbidden,
                                   is_jsonable, log)
 
@@ -26,8 +28,10 @@ class Adaptor(SelectorsGeneration):
     __slots__ = (
         'url', 'encoding', '__auto_match_enabled', '_root', '_storage',
         '__keep_comments', '__huge_tree_enabled', '__attributes', '__text', '__tag',
-        '__keep_cdata'
+        '__keep_cdata', '__lazy_body', '__relocation_index'
     )
+    # Used by `relocate` to score elements, replace it with a `ScoringBackend` instance of your own to change the scoring
+    scoring_backend = default_scoring_backend()
 
     def __init__(
             self,
@@ -42,6 +46,7 @@ class Adaptor(SelectorsGeneration):
             auto_match: Optional[bool] = False,
             storage: Any = SQLiteStorageSystem,
             storage_args: Optional[Dict] = None,
+            lazy_parsing: Optional[bool] = False,
             **kwargs
     ):
         """The main class that works as a wrapper for the HTML input data. Using this class, you can search for elements
@@ -67,11 +72,20 @@ class Adaptor(SelectorsGeneration):
         :param storage: The storage class to be passed for auto-matching functionalities, see ``Docs`` for more info.
         :param storage_args: A dictionary of ``argument->value`` pairs to be passed for the storage class.
             If empty, default values will be used.
+        :param lazy_parsing: If enabled, the HTML tree isn't built until it's needed for the first time (selecting, traversing, etc...)
+            and `json()` loads the raw body directly. Useful for responses of JSON APIs that you will never select elements from.
         """
         if root is None and not body and text is None:
             raise ValueError("Adaptor class needs text, body, or root arguments to work")
 
         self.__text = ''
+        self.__lazy_body = None
+        self.__relocation_index = None
+        self.__keep_comments = keep_comments
+        self.__keep_cdata = keep_cdata
+        self.__huge_tree_enabled = huge_tree
+        self.encoding = encoding
+        self.url = url
         if root is None:
             if text is None:
                 if not body or not isinstance(body, bytes):
@@ -84,14 +98,13 @@ class Adaptor(SelectorsGeneration):
 
                 body = text.strip().replace("\x00", "").encode(encoding) or b"<html/>"
 
-            # https://lxml.de/api/lxml.etree.HTMLParser-class.html
-            parser = html.HTMLParser(
-                recover=True, remove_blank_text=True, remove_comments=(not keep_comments), encoding=encoding,
-                compact=True, huge_tree=huge_tree, default_doctype=True, strip_cdata=(not keep_cdata),
-            )
-            self._root = etree.fromstring(body, parser=parser, base_url=url)
-            if is_jsonable(text or body.decode()):
-                self.__text = TextHandler(text or body.decode())
+            if lazy_parsing:
+                # The tree will be built the first time `_root` is needed, check `__getattr__`
+                self.__lazy_body = body
+            else:
+                self._root = self.__parse(body)
+                if is_jsonable(text or body.decode()):
+                    self.__text = TextHandler(text or body.decode())
 
         else:
             # All html types inherits from HtmlMixin so this to check for all at once
@@ -119,11 +132,6 @@ class Adaptor(SelectorsGeneration):
 
             self._storage = storage(**storage_args)
 
-        self.__keep_comments = keep_comments
-        self.__keep_cdata = keep_cdata
-        self.__huge_tree_enabled = huge_tree
-        self.encoding = encoding
-        self.url = url
         # For selector stuff
         self.__attributes = None
         self.__tag = None
@@ -132,6 +140,23 @@ class Adaptor(SelectorsGeneration):
             key: getattr(self, key) for key in ('status', 'reason', 'cookies', 'history', 'headers', 'request_headers',)
         } if hasattr(self, 'status') else {}
 
+    def __parse(self, body: bytes) -> html.HtmlElement:
+        """Used internally to build the lxml tree of the body with the parsing options of this instance"""
+        # https://lxml.de/api/lxml.etree.HTMLParser-class.html
+        parser = html.HTMLParser(
+            recover=True, remove_blank_text=True, remove_comments=(not self.__keep_comments), encoding=self.encoding,
+            compact=True, huge_tree=self.__huge_tree_enabled, default_doctype=True, strip_cdata=(not self.__keep_cdata),
+        )
+        return etree.fromstring(body, parser=parser, base_url=self.url)
+
+    def __getattr__(self, name: str) -> Any:
+        # This only gets called when normal lookup fails, and `_root` is only missing if parsing was postponed with `lazy_parsing`
+        if name == '_root' and self.__lazy_body is not None:
+            self._root = self.__parse(self.__lazy_body)
+            return self._root
+
+        raise AttributeError(f"'{self.__class__.__name__}' object has no attribute '{name}'")
+
     # Node functionalities, I wanted to move to separate Mixin class but it had slight impact on performance
     @staticmethod
     def _is_text_node(element: Union[html.HtmlElement, etree._ElementUnicodeResult]) -> bool:
@@ -182,7 +207,8 @@ class Adaptor(SelectorsGeneration):
         if self._is_text_node(result[0]):
             return TextHandlers(list(map(self.__content_convertor, result)))
 
-        return Adaptors(list(map(self.__element_convertor, result)))
+        # Elements get converted to `Adaptor` objects only when they are accessed, check `LazyAdaptors`
+        return LazyAdaptors(result, self.__handle_element)
 
     def __getstate__(self) -> Any:
         # lxml don't like it :)
@@ -204,9 +230,13 @@ class Adaptor(SelectorsGeneration):
     def text(self) -> TextHandler:
         """Get text content of the element"""
         if not self.__text:
-            # If you want to escape lxml default behaviour and remove comments like this `<span>CONDITION: <!-- -->Excellent</span>`
-            # before extracting text then keep `keep_comments` set to False while initializing the first class
-            self.__text = TextHandler(self._root.text)
+            if self.__lazy_body is not None and is_jsonable(self.__lazy_body):
+                # Same as what's done on initialization without `lazy_parsing`
+                self.__text = TextHandler(self.__lazy_body.decode())
+            else:
+                # If you want to escape lxml default behaviour and remove comments like this `<span>CONDITION: <!-- -->Excellent</span>`
+                # before extracting text then keep `keep_comments` set to False while initializing the first class
+                self.__text = TextHandler(self._root.text)
         return self.__text
 
     def get_all_text(self, separator: str = "\n", strip: bool = False, ignore_tags: Tuple = ('script', 'style',), valid_values: bool = True) -> TextHandler:
@@ -220,7 +250,7 @@ class Adaptor(SelectorsGeneration):
         :return: A TextHandler
         """
         _all_strings = []
-        for node in self._root.xpath('.//*'):
+        for node in compile_xpath('.//*')(self._root):
             if node.tag not in ignore_tags:
                 text = node.text
                 if text and type(text) is str:
@@ -268,7 +298,7 @@ class Adaptor(SelectorsGeneration):
     @property
     def below_elements(self) -> 'Adaptors[Adaptor]':
         """Return all elements under the current element in the DOM tree"""
-        below = self._root.xpath('.//*')
+        below = compile_xpath('.//*')(self._root)
         return self.__handle_elements(below)
 
     @property
@@ -371,7 +401,6 @@ class Adaptor(SelectorsGeneration):
         :param adaptor_type: If True, the return result will be converted to `Adaptors` object
         :return: List of pure HTML elements that got the highest matching score or 'Adaptors' object
         """
-        score_table = {}
         # Note: `element` will be most likely always be a dictionary at this point.
         if isinstance(element, self.__class__):
             element = element._root
@@ -379,12 +408,14 @@ class Adaptor(SelectorsGeneration):
         if issubclass(type(element), html.HtmlElement):
             element = _StorageTools.element_to_dict(element)
 
-        for node in self._root.xpath('.//*'):
-            # Collect all elements in the page then for each element get the matching score of it against the node.
-            # Hence: the code doesn't stop even if the score was 100%
-            # because there might be another element(s) left in page with the same score
-            score = self.__calculate_similarity_score(element, node)
-            score_table.setdefault(score, []).append(node)
+        if self.__relocation_index is None:
+            self.__relocation_index = RelocationIndex(self._root)
+        index = self.__relocation_index
+        # The debug log shows the top scores, so all elements get scored in that case
+        exhaustive = log.getEffectiveLevel() < 20
+        score_table = self.scoring_backend.score_table(
+            element, index, self.__calculate_similarity_score, percentage, exhaustive
+        )
 
         if score_table:
             highest_probability = max(score_table.keys())
@@ -394,13 +425,33 @@ class Adaptor(SelectorsGeneration):
                     log.debug(f'Highest probability was {highest_probability}%')
                     log.debug('Top 5 best matching elements are: ')
                     for percent in tuple(sorted(score_table.keys(), reverse=True))[:5]:
-                        log.debug(f'{percent} -> {self.__handle_elements(score_table[percent])}')
+                        log.debug(f'{percent} -> {self.__handle_elements(index.nodes_at(score_table[percent]))}')
 
                 if not adaptor_type:
-                    return score_table[highest_probability]
-                return self.__handle_elements(score_table[highest_probability])
+                    return index.nodes_at(score_table[highest_probability])
+                return self.__handle_elements(index.nodes_at(score_table[highest_probability]))
         return []
 
+    def relocate_many(
+            self, identifiers: Iterable[str], percentage: int = 0, adaptor_type: bool = False
+    ) -> Dict[str, Union[List[Union[html.HtmlElement, None]], 'Adaptors']]:
+        """Relocate many saved elements at once, useful when the page structure changes and all saved elements fail together.
+
+        All elements are retrieved from the storage with one query, and the page is indexed once for all of them.
+
+        :param identifiers: The identifiers the elements were saved with.
+        :param percentage: The minimum percentage to accept and not going lower than that. Same as `relocate`.
+        :param adaptor_type: If True, the results will be converted to `Adaptors` objects
+        :return: A dictionary of each identifier and the elements that got the highest matching score for it,
+            identifiers that are not found in the storage get an empty list.
+        """
+        identifiers = list(identifiers)
+        saved_elements = self.retrieve_many(identifiers) or {}
+        return {
+            identifier: self.relocate(saved_elements[identifier], percentage, adaptor_type) if identifier in saved_elements else []
+            for identifier in identifiers
+        }
+
     def css_first(self, selector: str, identifier: str = '',
                   auto_match: bool = False, auto_save: bool = False, percentage: int = 0
                   ) -> Union['Adaptor', 'TextHandler', None]:
@@ -510,7 +561,7 @@ class Adaptor(SelectorsGeneration):
         :return: List as :class:`Adaptors`
         """
         try:
-            elements = self._root.xpath(selector, **kwargs)
+            elements = compile_xpath(selector)(self._root, **kwargs)
 
             if elements:
                 if auto_save:
@@ -748,9 +799,28 @@ class Adaptor(SelectorsGeneration):
             "Can't use Auto-match features while disabled globally, you have to start a new class instance."
         )
 
+    def retrieve_many(self, identifiers: Iterable[str]) -> Optional[Dict[str, Dict]]:
+        """Same as `retrieve` but for many identifiers at once, with one storage query if the storage system supports it
+
+        :param identifiers: The identifiers that will be used to retrieve the elements from the storage.
+        :return: A dictionary of each found identifier and the unique properties of its element
+        """
+        if self.__auto_match_enabled:
+            return self._storage.retrieve_many(identifiers)
+
+        log.critical(
+            "Can't use Auto-match features while disabled globally, you have to start a new class instance."
+        )
+
     # Operations on text functions
     def json(self) -> Dict:
         """Return json response if the response is jsonable otherwise throws error"""
+        if self.__lazy_body is not None:
+            try:
+                return orjson.loads(self.__lazy_body)
+            except orjson.JSONDecodeError:
+                pass
+
         if self.text:
             return self.text.json()
         else:
@@ -878,7 +948,7 @@ class Adaptor(SelectorsGeneration):
             text = text.lower()
 
         # This selector gets all elements with text content
-        for node in self.__handle_elements(self._root.xpath('.//*[normalize-space(text())]')):
+        for node in self.__handle_elements(compile_xpath('.//*[normalize-space(text())]')(self._root)):
             """Check if element matches given text otherwise, traverse the children tree and iterate"""
             node_text = node.text
             if clean_match:
@@ -914,7 +984,7 @@ class Adaptor(SelectorsGeneration):
         results = Adaptors([])
 
         # This selector gets all elements with text content
-        for node in self.__handle_elements(self._root.xpath('.//*[normalize-space(text())]')):
+        for node in self.__handle_elements(compile_xpath('.//*[normalize-space(text())]')(self._root)):
             """Check if element matches given regex otherwise, traverse the children tree and iterate"""
             node_text = node.text
             if node_text.re(query, check_match=True, clean_match=clean_match, case_sensitive=case_sensitive):
@@ -1078,3 +1148,111 @@ class Adaptors(List[Adaptor]):
     def __getstate__(self) -> Any:
         # lxml don't like it :)
         raise TypeError("Can't pickle Adaptors object")
+
+
+class LazyAdaptors(Adaptors):
+    """
+    An :class:`Adaptors` object that holds the raw lxml results and converts each one of them to :class:`Adaptor` only when it's accessed.
+
+    So selecting 10k elements then using `first`, `len()`, slicing, or chaining `css`/`xpath` on them doesn't create 10k objects.
+    Converted items replace the raw ones in the list so each item gets converted only once.
+    """
+    __slots__ = ('_convertor',)
+
+    def __init__(self, items: Iterable = (), convertor: Optional[Callable] = None):
+        """
+        :param items: The raw lxml results, already converted items are accepted too.
+        :param convertor: The function that converts a raw result to `Adaptor`/`TextHandler` object, it's the method `Adaptor.__handle_element` of the source element.
+        """
+        super().__init__(items)
+        self._convertor = convertor
+
+    def __convert(self, index: SupportsIndex) -> Union[Adaptor, TextHandler]:
+        item = list.__getitem__(self, index)
+        if not isinstance(item, (Adaptor, TextHandler)):
+            item = self._convertor(item)
+            list.__setitem__(self, index, item)
+        return item
+
+    def __getitem__(self, pos: Union[SupportsIndex, slice]) -> Union[Adaptor, "LazyAdaptors"]:
+        if isinstance(pos, slice):
+            return self.__class__(list.__getitem__(self, pos), self._convertor)
+        return self.__convert(pos)
+
+    def __iter__(self) -> Generator[Adaptor, None, None]:
+        for index in range(len(self)):
+            yield self.__convert(index)
+
+    def __reversed__(self) -> Generator[Adaptor, None, None]:
+        for index in range(len(self) - 1, -1, -1):
+            yield self.__convert(index)
+
+    def __contains__(self, value: Any) -> bool:
+        return any(item is value or item == value for item in self)
+
+    def __eq__(self, other: Any) -> bool:
+        return list(self) == (list(other) if isinstance(other, list) else other)
+
+    def __ne__(self, other: Any) -> bool:
+        return not self.__eq__(other)
+
+    def __add__(self, other: Any) -> List:
+        if not isinstance(other, list):
+            return NotImplemented
+        return list(self) + list(other)
+
+    def __radd__(self, other: Any) -> List:
+        if not isinstance(other, list):
+            return NotImplemented
+        return list(other) + list(self)
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+    def index(self, value: Any, *args: Any) -> int:
+        return list(self).index(value, *args)
+
+    def count(self, value: Any) -> int:
+        return list(self).count(value)
+
+    def pop(self, index: SupportsIndex = -1) -> Adaptor:
+        item = self.__convert(index)
+        list.pop(self, index)
+        return item
+
+    def copy(self) -> "LazyAdaptors":
+        return self.__class__(list.copy(self), self._convertor)
+
+    def sort(self, *args: Any, **kwargs: Any) -> None:
+        # The sorting key would receive raw items otherwise
+        self[:] = list(self)
+        super().sort(*args, **kwargs)
+
+    def xpath(
+            self, selector: str, identifier: str = '', auto_save: bool = False, percentage: int = 0, **kwargs: Any
+    ) -> "Adaptors[Adaptor]":
+        if auto_save:
+            # Saving needs the `Adaptor` object of each element
+            return super().xpath(selector, identifier, auto_save, percentage, **kwargs)
+
+        try:
+            compiled_selector = compile_xpath(selector)
+            results = []
+            for item in list.__iter__(self):
+                results.extend(compiled_selector(item._root if isinstance(item, Adaptor) else item, **kwargs))
+        except (SelectorError, SelectorSyntaxError, etree.XPathError, etree.XPathEvalError):
+            raise SelectorSyntaxError(f"Invalid XPath selector: {selector}")
+
+        return self.__class__(results, self._convertor)
+
+    def css(self, selector: str, identifier: str = '', auto_save: bool = False, percentage: int = 0) -> "Adaptors[Adaptor]":
+        if auto_save or ',' in selector:
+            # Combined selectors can get split while auto-matching is enabled, so they take the normal path to keep the same order
+            return super().css(selector, identifier, auto_save, percentage)
+
+        try:
+            xpath_selector = translator_instance.css_to_xpath(selector)
+        except (SelectorError, SelectorSyntaxError,):
+            raise SelectorSyntaxError(f"Invalid CSS selector: {selector}")
+
+        return self.xpath(xpath_selector, identifier or selector, auto_save, percentage)
@@ -57,7 +57,7 @@ setup(
         "w3lib",
         "orjson>=3",
         "tldextract",
-        'httpx[brotli,zstd, socks]',
+        'httpx[brotli,zstd,socks,http2]',
         'playwright>=1.49.1',
         'rebrowser-playwright>=1.49.1',
         'camoufox[geoip]>=0.4.11'
@@ -0,0 +1,133 @@
+import os
+import random
+from collections import Counter
+
+import numpy as np
+import orjson
+import pytest
+
+from browserforge import bayesian_network
+from browserforge.bayesian_network import BayesianNetwork
+from browserforge.fingerprints import FingerprintGenerator
+from browserforge.headers import HeaderGenerator
+
+# A small network where `c3` can only come from `a2` which is almost never drawn
+NETWORK = {
+    'nodes': [
+        {
+            'name': 'A',
+            'possibleValues': ['a1', 'a2'],
+            'conditionalProbabilities': {'a1': 0.999, 'a2': 0.001},
+        },
+        {
+            'name': 'B',
+            'parentNames': ['A'],
+            'possibleValues': ['b1', 'b2', 'b3'],
+            'conditionalProbabilities': {'deeper': {'a1': {'b1': 0.6, 'b2': 0.4}, 'a2': {'b3': 1.0}}},
+        },
+        {
+            'name': 'C',
+            'parentNames': ['B'],
+            'possibleValues': ['c1', 'c2', 'c3'],
+            'conditionalProbabilities': {
+                'deeper': {'b1': {'c1': 1.0}, 'b2': {'c1': 0.5, 'c2': 0.5}, 'b3': {'c3': 1.0}}
+            },
+        },
+    ]
+}
+
+
+@pytest.fixture
+def network(tmp_path, monkeypatch):
+    monkeypatch.delenv('BROWSERFORGE_CACHE_DIR', raising=False)
+    random.seed(0)
+    np.random.seed(0)
+    path = tmp_path / 'network.json'
+    path.write_bytes(orjson.dumps(NETWORK))
+    return BayesianNetwork(path)
+
+
+def _frequencies(samples, name):
+    counts = Counter(sample[name] for sample in samples)
+    return {value: count / len(samples) for value, count in counts.items()}
+
+
+@pytest.mark.parametrize('n', [2, 3000])
+def test_unconstrained_marginals(network, n):
+    """Test that the compiled sampler, scalar and vectorized, has the same marginals as the old walker"""
+    samples = []
+    while len(samples) < 3000:
+        samples.extend(network.generate_samples(n))
+    old_samples = [
+        network.recursively_generate_consistent_sample_when_possible({}, {}, 0).copy() for _ in range(3000)
+    ]
+    assert all(sample is not None for sample in samples)
+    for name in ('A', 'B', 'C'):
+        new, old = _frequencies(samples, name), _frequencies(old_samples, name)
+        for value in set(new) | set(old):
+            assert abs(new.get(value, 0) - old.get(value, 0)) < 0.05
+
+
+@pytest.mark.parametrize('n', [1, 50])
+def test_constraints_force_backtracking(network, n):
+    """Test that samples that keep hitting dead ends are completed by backtracking to the rare value that allows them"""
+    samples = network.generate_samples(n, {'C': ['c3']})
+    assert samples == [{'A': 'a2', 'B': 'b3', 'C': 'c3'}] * n
+    assert network.generate_consistent_sample_when_possible({'B': ['b2'], 'C': ['c2']}) == {'A': 'a1', 'B': 'b2', 'C': 'c2'}
+
+
+@pytest.mark.parametrize('n', [1, 50])
+def test_impossible_constraints(network, n):
+    """Test that samples that can't be consistent with the constraints are None instead of raising"""
+    assert network.generate_samples(n, {'A': ['a1'], 'C': ['c3']}) == [None] * n
+    assert network.generate_samples(n, {'C': ['unknown']}) == [None] * n
+
+
+def test_input_values_list(network):
+    """Test that a list of input values gives one sample per dictionary in order and `n` is ignored"""
+    inputs = [{'A': 'a1'}, {'A': 'a2'}, {'B': 'b2'}] * 4
+    samples = network.generate_samples(1, input_values=inputs)
+    assert len(samples) == len(inputs)
+    for sample, values in zip(samples, inputs):
+        assert sample.items() >= values.items()
+    assert all(sample['B'] in ('b1', 'b2') for sample in samples[::3])
+    assert all(sample['B'] == 'b3' and sample['C'] == 'c3' for sample in samples[1::3])
+    assert all(sample['C'] in ('c1', 'c2') for sample in samples[2::3])
+
+    with pytest.raises(ValueError):
+        network.generate_sample({'B': 'unknown'})
+
+
+@pytest.mark.skipif(not hasattr(os, 'getuid'), reason='File owners and modes are POSIX only')
+def test_network_cache(tmp_path, monkeypatch):
+    """Test that the network is cached and that a cache file others can write to isn't loaded"""
+    monkeypatch.setenv('BROWSERFORGE_CACHE_DIR', str(tmp_path / 'cache'))
+    path = tmp_path / 'network.json'
+    path.write_bytes(orjson.dumps(NETWORK))
+    BayesianNetwork(path)
+    cache_path = bayesian_network._cache_path(path)
+    assert cache_path.exists() and not cache_path.stat().st_mode & 0o077
+    assert bayesian_network._read_cache(path) is not None
+    assert BayesianNetwork(path).generate_samples(2, {'C': ['c3']}) == [{'A': 'a2', 'B': 'b3', 'C': 'c3'}] * 2
+
+    cache_path.chmod(0o666)
+    assert bayesian_network._read_cache(path) is None
+
+
+def test_header_generator_many():
+    """Test generating many sets of headers at once with the same options as `generate`"""
+    generator = HeaderGenerator()
+    headers = generator.generate_many(20, browser='firefox', os='windows', locale='de-DE')
+    assert len(headers) == 20
+    assert all('Firefox' in item['User-Agent'] and 'Windows' in item['User-Agent'] for item in headers)
+    assert all(item['Accept-Language'].startswith('de-DE') for item in headers)
+    assert generator.generate_many(0) == []
+
+
+def test_fingerprint_generator_many():
+    """Test generating many fingerprints at once where each one matches its own headers"""
+    fingerprints = FingerprintGenerator().generate_many(10, browser='chrome', os='linux')
+    assert len(fingerprints) == 10
+    for fingerprint in fingerprints:
+        assert 'Chrome' in fingerprint.navigator.userAgent and 'Linux' in fingerprint.navigator.userAgent
+        assert fingerprint.headers['User-Agent'] == fingerprint.navigator.userAgent
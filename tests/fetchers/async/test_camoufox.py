@@ -1,7 +1,10 @@
+import asyncio
+
 import pytest
 import pytest_httpbin
 
 from scrapling import StealthyFetcher
+from scrapling.engines import RecyclePolicy
 
 StealthyFetcher.auto_match = True
 
@@ -95,3 +98,65 @@ class TestStealthyFetcher:
     async def test_infinite_timeout(self, fetcher, urls):
         """Test if infinite timeout breaks the code or not"""
         assert (await fetcher.async_fetch(urls['delayed_url'], timeout=None)).status == 200
+
+    async def test_session(self, fetcher, urls):
+        """Test reusing the same browsers for concurrent requests and recycling them"""
+        async with fetcher.async_session(pool_size=2, max_requests=2) as session:
+            responses = await asyncio.gather(*[
+                session.fetch(urls[key]) for key in ('status_200', 'status_404', 'status_501', 'status_200')
+            ])
+            assert [response.status for response in responses] == [200, 404, 501, 200]
+
+    async def test_fetch_many(self, fetcher, urls):
+        """Test fetching many URLs concurrently through a pool of browsers"""
+        requests = [urls['status_200'], urls['status_404'], urls['status_501']]
+        responses = [response async for response in fetcher.fetch_many(requests, concurrency=2, ordered=True)]
+        assert [response.status for response in responses] == [200, 404, 501]
+
+    async def test_handoff(self, fetcher, urls):
+        """Test continuing the browser session with HTTP requests through the response's session handle"""
+        response = await fetcher.async_fetch(urls['cookies_url'], handoff=True)
+        handle = response.session_handle
+        assert handle.user_agent and any(cookie['name'] == 'test' for cookie in handle.cookies)
+
+        async with handle.async_session() as session:
+            assert (await session.get(urls['basic_url'])).status == 200
+            assert session.cookies.get('test') == 'value'
+
+    async def test_network_capture(self, fetcher, urls):
+        """Test capturing the page's API responses with their JSON"""
+        async def call_api(page):
+            await page.evaluate("url => fetch(url)", urls['basic_url'])
+            await page.wait_for_timeout(500)
+            return page
+
+        response = await fetcher.async_fetch(urls['html_url'], page_action=call_api, network_capture=r'/get$')
+        assert len(response.captured) == 1
+        assert response.captured[0].status == 200 and response.captured[0].json()['url'] == urls['basic_url']
+
+    async def test_page_requests(self, fetcher, urls):
+        """Test doing requests from inside the page in one batch"""
+        response = await fetcher.async_fetch(urls['html_url'], page_requests=[urls['basic_url'], urls['status_404']], page_requests_concurrency=2)
+        assert [result.status for result in response.page_results] == [200, 404]
+        assert response.page_results[0].json()['url'] == urls['basic_url']
+
+    async def test_persistent_session(self, fetcher, urls):
+        """Test that cookies carry over between the requests of a long-lived context until it's recycled"""
+        async with fetcher.async_persistent_session(policy=RecyclePolicy(max_requests=2)) as session:
+            await session.fetch(urls['cookies_url'])
+            assert (await session.fetch(urls['basic_url'])).cookies == {'test': 'value'}
+            assert (await session.fetch(urls['basic_url'])).cookies == {}
+
+    async def test_storage_state_cache(self, fetcher, urls, tmp_path):
+        """Test that a saved state is restored in the next fetch and its warm-up `page_action` is skipped"""
+        actions = []
+
+        async def warm_up(page):
+            actions.append(page.url)
+            return page
+
+        for _ in range(2):
+            response = await fetcher.async_fetch(urls['cookies_url'], page_action=warm_up, storage_state_cache=str(tmp_path))
+            assert response.status == 200
+
+        assert len(actions) == 1
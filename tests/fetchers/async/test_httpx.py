@@ -1,6 +1,9 @@
+import asyncio
+
 import pytest
 import pytest_httpbin
 
+from scrapling.engines import SessionHandle
 from scrapling.fetchers import AsyncFetcher
 
 AsyncFetcher.auto_match = True
@@ -23,7 +26,11 @@ class TestAsyncFetcher:
             'post_url': f'{httpbin.url}/post',
             'put_url': f'{httpbin.url}/put',
             'delete_url': f'{httpbin.url}/delete',
-            'html_url': f'{httpbin.url}/html'
+            'html_url': f'{httpbin.url}/html',
+            'cookies_url': f'{httpbin.url}/cookies/set/test/value',
+            'status_403': f'{httpbin.url}/status/403',
+            'headers_url': f'{httpbin.url}/headers',
+            'cookies_list_url': f'{httpbin.url}/cookies',
         }
 
     async def test_basic_get(self, fetcher, urls):
@@ -83,3 +90,57 @@ class TestAsyncFetcher:
             follow_redirects=True,
             timeout=None
         )).status == 200
+
+    async def test_session(self, fetcher, urls):
+        """Test doing concurrent requests through a session with a shared client and cookie jar"""
+        async with fetcher.session(max_connections_per_host=2) as session:
+            responses = await asyncio.gather(*[session.get(urls['status_200']) for _ in range(4)])
+            assert all(response.status == 200 for response in responses)
+            assert (await session.post(urls['post_url'], data={'key': 'value'})).status == 200
+            assert (await fetcher.put(urls['put_url'], data={'key': 'value'}, session=session)).status == 200
+            assert (await fetcher.delete(urls['delete_url'], session=session)).status == 200
+
+            await session.get(urls['cookies_url'])
+            assert session.cookies.get('test') == 'value'
+
+    async def test_get_many(self, fetcher, urls):
+        """Test doing many requests concurrently with ordered and unordered results"""
+        requests = [urls['status_200'], urls['status_404'], {'url': urls['status_501'], 'stealthy_headers': False}] * 3
+        responses = [response async for response in fetcher.get_many(requests, concurrency=4, per_domain=2, ordered=True)]
+        assert [response.status for response in responses] == [200, 404, 501] * 3
+
+        statuses = [response.status async for response in fetcher.get_many(requests, concurrency=4)]
+        assert sorted(statuses) == sorted([200, 404, 501] * 3)
+
+    async def test_session_handoff(self, urls):
+        """Test continuing a browser session with its cookies and user agent then refreshing it after a 403"""
+        def browser_cookies(value):
+            return [{'name': 'clearance', 'value': value, 'domain': '127.0.0.1', 'path': '/', 'expires': -1}]
+
+        refreshes = []
+
+        async def refresher():
+            refreshes.append(1)
+            return SessionHandle(browser_cookies('new'), {'user-agent': 'Refreshed browser'})
+
+        handle = SessionHandle.from_browser(
+            browser_cookies('old'), {'User-Agent': 'Browser', 'Cookie': 'clearance=old', 'Accept': '*/*'},
+            api_headers={'X-Csrf-Token': 'old'}, refresher=refresher
+        )
+        assert handle.headers == {'user-agent': 'Browser', 'x-csrf-token': 'old'} and not handle.is_expired()
+
+        async with handle.async_session(headers={'X-Client': 'scraper'}) as session:
+            assert (await session.get(urls['headers_url'])).json()['headers']['User-Agent'] == 'Browser'
+            assert (await session.get(urls['cookies_list_url'])).json()['cookies'] == {'clearance': 'old'}
+
+            responses = await asyncio.gather(*[session.get(urls['status_403']) for _ in range(3)])
+            assert len(refreshes) == 1  # Concurrent requests share the same refresh
+            # The retried requests have the headers of the new handle only
+            assert all(
+                response.request_headers['user-agent'] == 'Refreshed browser' and 'x-csrf-token' not in response.request_headers
+                and response.request_headers['x-client'] == 'scraper' for response in responses
+            )
+            headers = (await session.get(urls['headers_url'])).json()['headers']
+            assert headers['User-Agent'] == 'Refreshed browser' and headers['X-Client'] == 'scraper'
+            assert 'X-Csrf-Token' not in headers  # Headers of the old handle aren't kept after a refresh
+            assert (await session.get(urls['cookies_list_url'])).json()['cookies'] == {'clearance': 'new'}
@@ -1,3 +1,5 @@
+import asyncio
+
 import pytest
 import pytest_httpbin
 
@@ -99,3 +101,10 @@ class TestPlayWrightFetcherAsync:
         """Test if infinite timeout breaks the code or not"""
         response = await fetcher.async_fetch(urls['delayed_url'], timeout=None)
         assert response.status == 200
+
+    @pytest.mark.asyncio
+    async def test_tabs_session(self, fetcher, urls):
+        """Test serving many concurrent pages from a single browser"""
+        async with fetcher.async_session(pool_size=1, tabs_per_browser=4, max_requests=6) as session:
+            responses = await asyncio.gather(*[session.fetch(urls['html_url']) for _ in range(8)])
+            assert all(response.status == 200 for response in responses)
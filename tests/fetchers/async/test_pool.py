@@ -0,0 +1,167 @@
+import asyncio
+
+import pytest
+
+from scrapling.engines import AsyncBrowserPool, AsyncContextPool, RecyclePolicy
+from scrapling.engines import pool as pool_module
+
+
+class FakeBrowser:
+    def __init__(self, number):
+        self.number = number
+        self.connected = True
+        self.open_pages = 0
+        self.max_open_pages = 0
+
+    def is_connected(self):
+        return self.connected
+
+    async def close(self):
+        assert self.open_pages == 0, 'A browser got closed while it still had open pages'
+        self.connected = False
+
+
+class FakeContext:
+    def __init__(self, number, browser=None, saved_state=None):
+        self.number = number
+        self.browser = browser
+        self.saved_state = saved_state
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeResponse:
+    def __init__(self, context, status):
+        self.context, self.status = context, status
+
+
+class FakePlaywright:
+    async def stop(self):
+        pass
+
+
+class FakePlaywrightManager:
+    async def start(self):
+        return FakePlaywright()
+
+
+class FakeEngine:
+    """Mimics the engine methods the pool uses, each fetch keeps a page open in the browser for a short time"""
+
+    def __init__(self):
+        self.browsers = []
+        self.contexts = []
+        self.storage_state_cache = None
+        self.storage_state_label = 'default'
+        self.restored_fetches = []
+
+    def _async_playwright_manager(self):
+        return FakePlaywrightManager()
+
+    async def _async_launch_browser(self, playwright):
+        self.browsers.append(FakeBrowser(len(self.browsers)))
+        return self.browsers[-1]
+
+    async def _async_new_context(self, browser, saved_state=None):
+        assert browser.connected
+        self.contexts.append(FakeContext(len(self.contexts), browser, saved_state))
+        return self.contexts[-1]
+
+    async def _async_fetch_with_context(self, context, url, restored=False):
+        assert not context.closed
+        if restored:
+            self.restored_fetches.append(context.number)
+        await asyncio.sleep(0.01)
+        return FakeResponse(context, 403 if url.endswith('/blocked') else 200)
+
+    async def _async_fetch_with_browser(self, browser, url):
+        assert browser.connected
+        browser.open_pages += 1
+        browser.max_open_pages = max(browser.max_open_pages, browser.open_pages)
+        await asyncio.sleep(0.01)
+        browser.open_pages -= 1
+        return browser.number
+
+
+@pytest.mark.asyncio
+async def test_tabs_per_browser():
+    """Test that each browser serves up to `tabs_per_browser` pages at once and gets replaced only after its pages are done"""
+    engine = FakeEngine()
+    async with AsyncBrowserPool(engine, pool_size=2, max_requests=10, tabs_per_browser=4) as pool:
+        results = await asyncio.gather(*[pool.fetch(f'https://example.com/{i}') for i in range(40)])
+
+    assert len(results) == 40
+    assert all(browser.max_open_pages <= 4 for browser in engine.browsers)
+    assert max(browser.max_open_pages for browser in engine.browsers) == 4
+    # Each browser takes at most 10 pages before it gets replaced
+    assert all(results.count(browser.number) <= 10 for browser in engine.browsers)
+    assert len(engine.browsers) >= 4 and not any(browser.connected for browser in engine.browsers)
+
+
+@pytest.mark.asyncio
+async def test_disconnected_browser_replaced():
+    """Test that a disconnected browser stops getting pages and gets replaced"""
+    engine = FakeEngine()
+    async with AsyncBrowserPool(engine, pool_size=1, tabs_per_browser=3) as pool:
+        await pool.fetch('https://example.com')
+        engine.browsers[0].connected = False
+        assert await pool.fetch('https://example.com') == 1
+
+
+@pytest.mark.asyncio
+async def test_context_recycling():
+    """Test that contexts are reused then replaced by warm ones after `max_requests` or a flagged status"""
+    engine = FakeEngine()
+    policy = RecyclePolicy(max_requests=3, recycle_on=(403,))
+    async with AsyncContextPool(engine, pool_size=2, policy=policy, warm_contexts=1) as pool:
+        assert len(engine.contexts) == 3
+        responses = await asyncio.gather(*[pool.fetch(f'https://example.com/{i}') for i in range(6)])
+        # Each context served 3 requests then got replaced
+        assert sorted(response.context.number for response in responses) == [0, 0, 0, 1, 1, 1]
+        assert pool.recycles_count == 2
+
+        blocked = await pool.fetch('https://example.com/blocked')
+        await asyncio.sleep(0.05)
+        assert blocked.context.closed and pool.recycles_count == 3
+        assert (await pool.fetch('https://example.com')).context is not blocked.context
+
+    assert len(engine.browsers) == 1 and not engine.browsers[0].connected
+
+
+@pytest.mark.asyncio
+async def test_browser_replaced_on_memory(monkeypatch):
+    """Test that a browser over `max_rss` gets replaced as a whole and its contexts move to the new browser"""
+    engine = FakeEngine()
+    # Each browser has its own process and only the first one uses too much memory
+    monkeypatch.setattr(pool_module, 'child_pids', lambda: set())
+    monkeypatch.setattr(pool_module, 'new_root_pids', lambda before: (len(engine.browsers),))
+    monkeypatch.setattr(pool_module, 'process_tree_rss', lambda pids: 5000 if pids == (1,) else 100)
+    policy = RecyclePolicy(max_rss=4096, rss_check_interval=0)
+    async with AsyncContextPool(engine, pool_size=2, policy=policy, warm_contexts=1) as pool:
+        await asyncio.gather(*[pool.fetch(f'https://example.com/{i}') for i in range(2)])
+        await asyncio.sleep(0.05)
+        assert len(engine.browsers) == 2 and not engine.browsers[0].connected
+        assert all(context.closed for context in engine.contexts if context.browser is engine.browsers[0])
+
+        responses = await asyncio.gather(*[pool.fetch(f'https://example.com/{i}') for i in range(6)])
+        assert all(response.context.browser is engine.browsers[1] for response in responses)
+        assert len(engine.browsers) == 2
+
+
+@pytest.mark.asyncio
+async def test_contexts_restore_saved_state():
+    """Test that new contexts start with the saved storage state and only their first request checks it"""
+    class FakeStorageStateCache:
+        def load(self, label):
+            return {'label': label, 'storage_state': {'cookies': []}}
+
+    engine = FakeEngine()
+    engine.storage_state_cache, engine.storage_state_label = FakeStorageStateCache(), 'store-1'
+    async with AsyncContextPool(engine, pool_size=1, warm_contexts=0) as pool:
+        for _ in range(3):
+            await pool.fetch('https://example.com')
+
+    assert engine.contexts[0].saved_state['label'] == 'store-1'
+    assert engine.restored_fetches == [0]
@@ -68,3 +68,11 @@ class TestStealthyFetcher:
     def test_infinite_timeout(self, fetcher):
         """Test if infinite timeout breaks the code or not"""
         assert fetcher.fetch(self.delayed_url, timeout=None).status == 200
+
+    def test_session(self, fetcher):
+        """Test reusing the same browsers for multiple requests and recycling them"""
+        with fetcher.session(pool_size=2, max_requests=2) as session:
+            assert session.fetch(self.status_200).status == 200
+            assert session.fetch(self.status_404).status == 404
+            assert session.fetch(self.status_501).status == 501
+            assert session.fetch(self.cookies_url).cookies == {'test': 'value'}
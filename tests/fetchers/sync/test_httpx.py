@@ -24,6 +24,7 @@ class TestFetcher:
         self.put_url = f'{httpbin.url}/put'
         self.delete_url = f'{httpbin.url}/delete'
         self.html_url = f'{httpbin.url}/html'
+        self.cookies_url = f'{httpbin.url}/cookies/set/test/value'
 
     def test_basic_get(self, fetcher):
         """Test doing basic get request with multiple statuses"""
@@ -82,3 +83,14 @@ class TestFetcher:
             follow_redirects=True,
             timeout=None
         ).status == 200
+
+    def test_session(self, fetcher):
+        """Test doing requests through a session with a shared client and cookie jar"""
+        with fetcher.session(max_connections_per_host=2) as session:
+            assert session.get(self.status_200).status == 200
+            assert session.post(self.post_url, data={'key': 'value'}).status == 200
+            assert fetcher.put(self.put_url, data={'key': 'value'}, session=session).status == 200
+            assert fetcher.delete(self.delete_url, session=session).status == 200
+
+            session.get(self.cookies_url)
+            assert session.cookies.get('test') == 'value'
@@ -49,6 +49,23 @@ class TestPlayWrightFetcher:
         """Test if cookies are set after the request"""
         assert fetcher.fetch(self.cookies_url).cookies == {'test': 'value'}
 
+    def test_network_capture(self, fetcher):
+        """Test capturing the page's API responses with their JSON"""
+        def call_api(page):
+            page.evaluate("url => fetch(url)", self.basic_url)
+            page.wait_for_timeout(500)
+            return page
+
+        response = fetcher.fetch(self.html_url, page_action=call_api, network_capture=r'/get$')
+        assert len(response.captured) == 1
+        assert response.captured[0].status == 200 and response.captured[0].json()['url'] == self.basic_url
+
+    def test_page_requests(self, fetcher):
+        """Test doing requests from inside the page in one batch"""
+        response = fetcher.fetch(self.html_url, page_requests=[self.basic_url, self.status_404], page_requests_concurrency=2)
+        assert [result.status for result in response.page_results] == [200, 404]
+        assert response.page_results[0].json()['url'] == self.basic_url
+
     def test_automation(self, fetcher):
         """Test if automation break the code or not"""
 
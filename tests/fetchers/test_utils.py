@@ -1,6 +1,19 @@
+import time
+from base64 import b64decode
+from concurrent.futures import ThreadPoolExecutor
+
+import orjson
 import pytest
 
+from scrapling.engines.toolbelt import launch_profiles
+from scrapling.engines.toolbelt.capture import (CapturedResponse, CaptureRule,
+                                                NetworkCapture,
+                                                compile_capture_rules)
 from scrapling.engines.toolbelt.custom import ResponseEncoding, StatusText
+from scrapling.engines.toolbelt.fingerprints import HeaderPool
+from scrapling.engines.toolbelt.in_page import fetch_in_page
+from scrapling.engines.toolbelt.scheduling import get_request_url
+from scrapling.engines.toolbelt.storage_state import StorageStateCache
 
 
 @pytest.fixture
@@ -95,3 +108,185 @@ def test_parsing_response_status(status_map):
 def test_unknown_status_code():
     """Test handling of an unknown status code"""
     assert StatusText.get(1000) == "Unknown Status Code"
+
+
+class _FakeRequest:
+    def __init__(self, url, resource_type='fetch', method='GET'):
+        self.url, self.resource_type, self.method = url, resource_type, method
+        self.headers, self.timing = {'accept': '*/*'}, {'responseEnd': 12.5}
+
+
+class _FakeResponse:
+    def __init__(self, request, body=b'{"items": [1, 2]}'):
+        self.request, self.url, self.status, self.headers = request, request.url, 200, {}
+        self._body, self.body_reads = body, 0
+
+    def body(self):
+        self.body_reads += 1
+        return self._body
+
+
+def test_request_url():
+    """Test that request specs with per-request arguments are rejected where they aren't supported"""
+    assert get_request_url('https://shop.com') == 'https://shop.com'
+    assert get_request_url({'url': 'https://shop.com'}, url_only=True) == 'https://shop.com'
+    assert get_request_url({'url': 'https://shop.com', 'timeout': 5}) == 'https://shop.com'
+    with pytest.raises(TypeError, match='timeout'):
+        get_request_url({'url': 'https://shop.com', 'timeout': 5}, url_only=True)
+    with pytest.raises(TypeError):
+        get_request_url({'timeout': 5})
+
+
+def test_network_capture():
+    """Test that only the responses matching the capture rules are kept and that only their bodies are read"""
+    rules = compile_capture_rules([r'/api/items', CaptureRule(r'/api/cart', name='cart', methods=['post']), 42])
+    assert [rule.name for rule in rules] == ['/api/items', 'cart']
+
+    capture = NetworkCapture(rules)
+    responses = [
+        _FakeResponse(_FakeRequest('https://shop.com/api/items?page=1')),
+        _FakeResponse(_FakeRequest('https://shop.com/api/items.js', resource_type='script')),
+        _FakeResponse(_FakeRequest('https://shop.com/api/cart', method='GET')),
+        _FakeResponse(_FakeRequest('https://shop.com/api/cart', method='POST'), body=b'not json'),
+    ]
+    for response in responses:
+        capture.handle_response(response)
+
+    captured = capture.collect()
+    assert [response.body_reads for response in responses] == [1, 0, 0, 1]
+    assert [item.name for item in captured] == ['/api/items', 'cart']
+    assert isinstance(captured[0], CapturedResponse) and captured[0].elapsed == 12.5
+    assert captured[0].json() == {'items': [1, 2]} and captured[0].json() is captured[0].json()
+    assert captured[1].json() is None and captured[1].text == 'not json'
+
+
+def test_fetch_in_page_batches():
+    """Test that in-page requests are prepared, sent in batches of single `evaluate` calls, and returned in order"""
+    class FakePage:
+        def __init__(self):
+            self.batches = []
+
+        def evaluate(self, script, arguments):
+            requests, concurrency, timeout = arguments
+            self.batches.append((len(requests), concurrency, timeout))
+            return [
+                {'url': request['url'], 'status': 200, 'headers': {}, 'text': f'{{"method": "{request["method"]}"}}', 'error': None}
+                for request in requests
+            ]
+
+    page = FakePage()
+    requests = [f'https://shop.com/api/items/{i}' for i in range(5)] + [{'url': 'https://shop.com/api/search', 'method': 'post', 'json': {'q': 'x'}}]
+    results = fetch_in_page(page, requests, concurrency=3, batch_size=4, timeout=None)
+    assert page.batches == [(4, 3, 0), (2, 3, 0)]
+    assert [result.url for result in results] == [requests[i] for i in range(5)] + ['https://shop.com/api/search']
+    assert results[-1].json() == {'method': 'POST'} and all(result.ok for result in results)
+
+
+def test_fetch_in_page_form_data():
+    """Test that dictionary data is sent as url-encoded form fields like httpx does"""
+    class FakePage:
+        def evaluate(self, script, arguments):
+            self.requests = arguments[0]
+            return [{'url': request['url'], 'status': 200, 'headers': {}, 'text': '', 'error': None} for request in self.requests]
+
+    page = FakePage()
+    fetch_in_page(page, [
+        {'url': 'https://shop.com/login', 'method': 'POST', 'data': {'user': 'a b', 'tags': ['x', 'y']}},
+        {'url': 'https://shop.com/login', 'method': 'POST', 'data': {'user': 'a'}, 'headers': {'Content-Type': 'text/plain'}},
+        {'url': 'https://shop.com/raw', 'method': 'POST', 'data': b'\x89PNG\xff'},
+    ])
+    assert page.requests[0]['body'] == 'user=a+b&tags=x&tags=y'
+    assert page.requests[0]['headers'] == {'content-type': 'application/x-www-form-urlencoded'}
+    assert page.requests[1]['headers'] == {'Content-Type': 'text/plain'}
+    # Binary data isn't decoded as text, it's passed as base64 for the page to decode
+    assert page.requests[2]['binary'] and b64decode(page.requests[2]['body']) == b'\x89PNG\xff' and page.requests[2]['headers'] == {}
+    assert not page.requests[0]['binary']
+
+
+def test_storage_state_cache(tmp_path):
+    """Test saving and loading states by label and that too old states or states with expired cookies aren't loaded"""
+    cache = StorageStateCache(str(tmp_path))
+    cookies = [{'name': 'zip', 'value': '20001', 'domain': 'shop.com', 'path': '/', 'expires': time.time() + 3600}]
+    cache.save('store/20001', {'cookies': cookies, 'origins': []}, {'https://shop.com': {'cart': '1'}})
+    assert [path.name for path in tmp_path.iterdir()] == ['store_20001.json']
+
+    state = cache.load('store/20001')
+    assert state['storage_state']['cookies'] == cookies
+    assert 'https://shop.com' in cache.session_storage_script(state)
+    assert cache.load('store/20002') is None
+    time.sleep(0.01)
+    assert StorageStateCache(str(tmp_path), max_age=0.001).load('store/20001') is None
+
+    cache.save('expired', {'cookies': [{**cookies[0], 'expires': time.time() - 1}], 'origins': []})
+    assert cache.load('expired') is None
+    assert cache.session_storage_script(cache.load('expired') or {}) is None
+    cache.delete('store/20001')
+    assert cache.load('store/20001') is None
+
+    # Threads saving the same label at once don't share a temporary file
+    with ThreadPoolExecutor(8) as executor:
+        list(executor.map(lambda i: cache.save('shared', {'cookies': [], 'origins': [], 'number': i}), range(64)))
+    assert cache.load('shared')['storage_state']['number'] in range(64)
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['expired.json', 'shared.json']
+
+
+def test_launch_profiles(tmp_path, monkeypatch):
+    """Test that profiles are generated once per options, shared through the disk, and get the pick-time options applied"""
+    generated = []
+
+    def fake_launch_options(**options):
+        generated.append(options)
+        config = {'navigator.userAgent': 'Mozilla/5.0 (X11; Linux x86_64; rv:135.0) Gecko/20100101 Firefox/135.0', 'number': len(generated)}
+        return {'env': {'CAMOU_CONFIG_1': orjson.dumps(config).decode()}, 'firefox_user_prefs': {'pref': 1}, 'args': []}
+
+    monkeypatch.setattr(launch_profiles, 'launch_options', fake_launch_options)
+    monkeypatch.setattr(launch_profiles, 'installed_verstr', lambda: '135.0-beta.1')
+    monkeypatch.setattr(launch_profiles, 'launch_path', lambda: '/camoufox/camoufox-bin')
+    monkeypatch.setattr(launch_profiles, 'get_env_vars', lambda config, target_os: {'CAMOU_CONFIG_1': orjson.dumps(config).decode()})
+    monkeypatch.setattr(launch_profiles, '_loaded_profiles', {})
+
+    options = {'os': 'linux', 'headless': True, 'proxy': {'server': 'http://proxy:8080'}, 'timeout': 5000}
+    profiles = launch_profiles.LaunchProfiles(str(tmp_path), size=3)
+    picked = [profiles.launch_options(options) for _ in range(10)]
+    assert len(generated) == 3 and 'proxy' not in generated[0] and generated[0]['os'] == 'linux'
+    assert picked[0]['proxy'] == options['proxy'] and picked[0]['timeout'] == 5000 and picked[0]['headless'] is True
+    assert picked[0]['executable_path'] == '/camoufox/camoufox-bin' and picked[0]['firefox_user_prefs'] == {'pref': 1}
+    assert {orjson.loads(launch['env']['CAMOU_CONFIG_1'])['number'] for launch in picked} <= {1, 2, 3}
+    # The user's environment variables are passed to the browser with the config
+    env = profiles.launch_options({**options, 'env': {'LANG': 'en_US.UTF-8'}})['env']
+    assert env['LANG'] == 'en_US.UTF-8' and 'CAMOU_CONFIG_1' in env and len(generated) == 3
+
+    # Another process with the same options reads the saved profiles and changing a pick-time option doesn't need new ones
+    monkeypatch.setattr(launch_profiles, '_loaded_profiles', {})
+    launch_profiles.LaunchProfiles(str(tmp_path)).launch_options({**options, 'proxy': None})
+    assert len(generated) == 3
+    launch_profiles.LaunchProfiles(str(tmp_path), size=2).launch_options({**options, 'os': 'windows'})
+    assert len(generated) == 5 and len(list(tmp_path.iterdir())) == 2
+
+
+def test_header_pool():
+    """Test that the pool hands out distinct pre-generated headers and tops itself back up in the background"""
+    # Without the background refill so the count only changes with `get`
+    pool = HeaderPool(size=5, refill_at=0.6)
+    pool.close()
+    headers = [pool.get() for _ in range(3)]
+    assert all(item.get('User-Agent') for item in headers) and headers[0] is not headers[1]
+    assert pool.available() == 2
+
+    pool = HeaderPool(size=5, refill_at=0.6)
+    pool.prefill()
+    for _ in range(3):
+        pool.get()
+    for _ in range(50):
+        if pool.available() == 5:
+            break
+        time.sleep(0.05)
+    assert pool.available() == 5
+
+    # Each header set is handed out twice in order before it's replaced
+    pool = HeaderPool(size=3, order='round_robin', max_uses=2)
+    pool.close()
+    pool.prefill()
+    user_agents = [pool.get()['User-Agent'] for _ in range(6)]
+    assert len(set(user_agents)) <= 3 and all(user_agents.count(agent) % 2 == 0 for agent in user_agents)
+    assert pool.available() == 0
@@ -1,8 +1,13 @@
 import asyncio
+import logging
+import sqlite3
 
 import pytest
 
 from scrapling import Adaptor
+from scrapling.core.relocation import NumpyScoringBackend, PythonScoringBackend
+from scrapling.core.storage_adaptors import SQLiteStorageSystem
+from scrapling.core.utils import log
 
 
 class TestParserAutoMatch:
@@ -109,3 +114,146 @@ class TestParserAutoMatch:
         assert relocated[0].attrib['data-id'] == 'p1'
         assert relocated[0].has_class('new-class')
         assert relocated[0].css('.new-description')[0].text == 'Description 1'
+
+    def test_relocation_matches_exhaustive_scan(self):
+        """Test that skipping elements while relocating gives the same result as scoring all elements"""
+        original_page = Adaptor(
+            '<div class="list">' + ''.join(
+                f'<article class="product" id="p{i}"><h3>Product {i}</h3><p class="description">Description {i}</p></article>'
+                for i in range(50)
+            ) + '</div>'
+        )
+        changed_page = Adaptor(
+            '<div class="new-list"><section>' + ''.join(
+                f'<article class="product new-class" data-id="p{i}"><div><h3>Product {i}</h3><p class="new-description">Description {i}</p></div></article>'
+                for i in range(50)
+            ) + '</section></div>'
+        )
+
+        for selector in ('#p3', '#p25 h3', '#p49 p', 'div.list'):
+            original = original_page.css_first(selector)
+            relocated = changed_page.relocate(original, adaptor_type=False)
+
+            level = log.level
+            log.setLevel(logging.DEBUG)  # All elements get scored while debugging
+            try:
+                expected = changed_page.relocate(original, adaptor_type=False)
+            finally:
+                log.setLevel(level)
+
+            assert relocated == expected
+
+    def test_scoring_backends(self, monkeypatch):
+        """Test that the scoring backends find the same elements"""
+        original_page = Adaptor(
+            '<div class="products"><article class="product" id="p1"><h3>Product 1</h3></article>'
+            '<article class="product" id="p2"><h3>Product 2</h3></article></div>'
+        )
+        changed_page = Adaptor(
+            '<section><div class="products new"><article class="product" data-id="p1"><div><h3>Product 1</h3></div></article>'
+            '<article class="product" data-id="p2"><div><h3>Product 2</h3></div></article></div></section>'
+        )
+
+        for selector in ('#p2', '#p1 h3'):
+            original = original_page.css_first(selector)
+            results = []
+            for backend in (PythonScoringBackend(), NumpyScoringBackend(), NumpyScoringBackend(exact=False)):
+                monkeypatch.setattr(Adaptor, 'scoring_backend', backend)
+                results.append(changed_page.relocate(original, adaptor_type=False))
+
+            assert results[0] == results[1] == results[2]
+            assert len(results[0]) == 1
+
+    def test_relocate_many(self):
+        """Test relocating many saved elements at once"""
+        original_html = '''
+                <div class="container">
+                    <article class="product" id="p1"><h3 class="title">Product 1</h3><p class="price">$10</p></article>
+                    <article class="product" id="p2"><h3 class="title">Product 2</h3><p class="price">$20</p></article>
+                </div>
+                '''
+        changed_html = '''
+                <main class="new-container">
+                    <article class="product" data-id="p1"><div><h3 class="name">Product 1</h3><span class="price">$10</span></div></article>
+                    <article class="product" data-id="p2"><div><h3 class="name">Product 2</h3><span class="price">$20</span></div></article>
+                </main>
+                '''
+        old_page = Adaptor(original_html, url='relocate-many.com', auto_match=True)
+        new_page = Adaptor(changed_html, url='relocate-many.com', auto_match=True)
+        for selector in ('#p1', '#p2 h3', '#p2 .price'):
+            old_page.css(selector, auto_save=True)
+
+        relocated = new_page.relocate_many(['#p1', '#p2 h3', '#p2 .price', 'not saved'], adaptor_type=True)
+        assert list(relocated.keys()) == ['#p1', '#p2 h3', '#p2 .price', 'not saved']
+        assert relocated['#p1'][0].attrib['data-id'] == 'p1'
+        assert relocated['#p2 h3'][0].text == 'Product 2'
+        assert relocated['#p2 .price'][0].text == '$20'
+        assert relocated['not saved'] == []
+
+    def test_write_behind_storage(self, tmp_path):
+        """Test saving elements in write-behind mode"""
+        storage_file = str(tmp_path / 'storage.db')
+        page = Adaptor(
+            '<div><p id="first">First</p><p id="second">Second</p><p id="third">Third</p></div>', auto_match=True,
+            storage_args={'storage_file': storage_file, 'url': 'write-behind.com', 'write_behind': True, 'flush_size': 2, 'flush_interval': 60000}
+        )
+
+        def stored_count():
+            with sqlite3.connect(storage_file) as connection:
+                return connection.execute('SELECT COUNT(*) FROM storage').fetchone()[0]
+
+        page.css('#first', auto_save=True)
+        assert stored_count() == 0
+        assert page.retrieve('#first')['attributes'] == {'id': 'first'}  # Pending elements are retrieved too
+
+        page.css('#second', auto_save=True)
+        assert stored_count() == 2
+
+        page.css('#third', auto_save=True)
+        page.css('#second', auto_save=True)  # Same data so it's not pending again
+        assert len(page._storage._pending) == 1
+        page._storage.close()
+        assert stored_count() == 3
+        SQLiteStorageSystem.cache_clear()
+
+    def test_storage_retrieve_cache(self, tmp_path):
+        """Test that retrieved elements are cached until they are saved again"""
+        storage = SQLiteStorageSystem(str(tmp_path / 'storage.db'), url='retrieve-cache.com')
+        page = Adaptor('<div><p id="first">First</p></div>')
+        element = page.css_first('#first')._root
+
+        storage.save(element, 'first')
+        assert storage.retrieve('first')['attributes'] == {'id': 'first'}
+        assert storage.retrieve('first')['attributes'] == {'id': 'first'}
+        assert storage.cache_stats()['hits'] == 1
+
+        element.set('class', 'new')
+        storage.save(element, 'first')
+        assert storage.retrieve('first')['attributes'] == {'id': 'first', 'class': 'new'}
+        assert storage.retrieve_many(['first', 'not saved']) == {'first': storage.retrieve('first')}
+        storage.close()
+        SQLiteStorageSystem.cache_clear()
+
+    def test_storage_read_during_save(self, tmp_path):
+        """Test that a read which raced a save doesn't make the storage skip saving the old data again"""
+        storage = SQLiteStorageSystem(str(tmp_path / 'storage.db'), url='read-race.com')
+        element = Adaptor('<div><p id="first">First</p></div>').css_first('#first')._root
+        storage.save(element, 'first')
+
+        read = storage._SQLiteStorageSystem__read
+
+        def read_then_save(query, parameters):
+            rows = read(query, parameters)
+            element.set('class', 'new')
+            storage.save(element, 'first')
+            return rows
+
+        storage._SQLiteStorageSystem__read = read_then_save
+        assert storage.retrieve('first')['attributes'] == {'id': 'first'}
+        del storage._SQLiteStorageSystem__read
+
+        del element.attrib['class']
+        storage.save(element, 'first')
+        assert storage.retrieve('first')['attributes'] == {'id': 'first'}
+        storage.close()
+        SQLiteStorageSystem.cache_clear()
@@ -4,7 +4,8 @@ import time
 import pytest
 from cssselect import SelectorError, SelectorSyntaxError
 
-from scrapling import Adaptor
+from scrapling import Adaptor, Adaptors
+from scrapling.core.translator import compile_xpath
 
 
 @pytest.fixture
@@ -285,6 +286,17 @@ class TestJSONAndAttributes:
         assert attr_json == {'jsonable': 'data'}
         assert isinstance(page.css('#products')[0].attrib.json_string, bytes)
 
+    def test_lazy_parsing(self, html_content):
+        """Test postponing the parsing until the tree is needed"""
+        json_page = Adaptor('{"totalProducts": 3, "lastUpdated": "2024-09-22"}', lazy_parsing=True)
+        assert json_page.json()['totalProducts'] == 3
+        assert json_page.text.json()['lastUpdated'] == '2024-09-22'
+
+        lazy_page = Adaptor(html_content, lazy_parsing=True)
+        assert lazy_page.css('.product h3::text') == Adaptor(html_content).css('.product h3::text')
+        with pytest.raises(AttributeError):
+            _ = lazy_page.nonexistent_attribute
+
 
 # Performance Test
 def test_large_html_parsing_performance():
@@ -302,6 +314,31 @@ def test_large_html_parsing_performance():
     assert end_time - start_time < 0.5  # Locally I test on 0.1 but on GitHub actions with browsers and threading sometimes closing adds fractions of seconds
 
 
+def test_compiled_xpath_cache(page):
+    """Test that repeated selectors reuse the same compiled XPath object"""
+    page.css('.product .price')
+    hits = compile_xpath.cache_info().hits
+    page.css('.product').css('.price')
+    assert compile_xpath.cache_info().hits >= hits + 2
+    assert page.xpath_first('//article[@data-id=$product_id]', product_id='2').attrib['data-id'] == '2'
+
+
+def test_lazy_elements_conversion(page):
+    """Test that selected elements get converted only when accessed"""
+    products = page.css('.product')
+    assert len(products) == 3
+    assert isinstance(products, Adaptors)
+    assert products.first is products[0] and products.last is products[-1]
+    assert isinstance(products[1:], Adaptors) and len(products[1:]) == 2
+    assert [product.attrib['data-id'] for product in products] == ['1', '2', '3']
+    assert products.css('.price::text') == page.css('.product .price::text')
+    assert products[1:].css('h3').first.text == 'Product 2'
+    assert products.xpath('.//h3', auto_save=True)[0].text == 'Product 1'
+    combined = [page] + products
+    assert len(combined) == 4 and combined[0] is page and combined[1].attrib['data-id'] == '1'
+    assert [product.attrib['data-id'] for product in (products + [page])[:3]] == ['1', '2', '3']
+
+
 # Selector Generation Test
 def test_selectors_generation(page):
     """Try to create selectors for all elements in the page"""